@@ -1,4 +1,7 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+
+from apps.core.admin import EstimatedCountPaginator
+from apps.reservations.services import ReservationBulkService, ReservationReassignmentService
 from .models import Car
 
 
@@ -8,3 +11,27 @@ class CarAdmin(admin.ModelAdmin):
     list_filter = ['status', 'brand', 'year']
     search_fields = ['registration_number', 'brand', 'model']
     ordering = ['-created_at']
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    actions = ['retire_selected', 'reassign_selected']
+
+    @admin.action(description="Mettre en maintenance et annuler les réservations à venir")
+    def retire_selected(self, request, queryset):
+        cancelled = ReservationBulkService.retire_cars(
+            list(queryset.values_list('id', flat=True)), actor=request.user
+        )
+        self.message_user(
+            request,
+            f"Véhicule(s) en maintenance, {len(cancelled)} réservation(s) annulée(s).",
+            messages.SUCCESS
+        )
+
+    @admin.action(description="Réaffecter les réservations à venir vers des véhicules équivalents")
+    def reassign_selected(self, request, queryset):
+        report = ReservationReassignmentService.reassign(
+            car_ids=list(queryset.values_list('id', flat=True)), actor=request.user
+        )
+        self.message_user(request, f"{len(report['moved'])} réservation(s) réaffectée(s).", messages.SUCCESS)
+        if report['unplaced']:
+            ids = ', '.join(f"#{item['reservation_id']}" for item in report['unplaced'])
+            self.message_user(request, f"Sans véhicule équivalent libre : {ids}", messages.WARNING)
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cars.services import FleetSyncService
+
+
+class Command(BaseCommand):
+    help = 'Synchronise le parc de véhicules depuis un export CSV, JSON ou JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Fichier exporté par le référentiel')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'json', 'jsonl'],
+            help='Format du fichier (déduit de l\'extension par défaut)'
+        )
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Calcule les différences sans rien écrire'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        fmt = options['format'] or path.suffix.lstrip('.').lower()
+
+        try:
+            with path.open(encoding='utf-8', newline='') as stream:
+                report = FleetSyncService.sync(
+                    FleetSyncService.read_rows(stream, fmt),
+                    chunk_size=options['chunk_size'],
+                    dry_run=options['dry_run']
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{report['created']} créé(s), {report['updated']} modifié(s), "
+            f"{report['unchanged']} inchangé(s)"
+        ))
+
+        for error in report['errors']:
+            self.stdout.write(self.style.WARNING(f"Ligne {error['line']}: {error['error']}"))
+
+        for conflict in report['conflicts']:
+            ids = ', '.join(f"#{reservation_id}" for reservation_id in conflict['reservation_ids'])
+            self.stdout.write(self.style.WARNING(
+                f"{conflict['registration_number']} passe en {conflict['status']} "
+                f"avec des réservations à venir : {ids}"
+            ))
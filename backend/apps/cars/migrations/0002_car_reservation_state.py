@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0001_initial'),
+        ('reservations', '0008_reservation_hold_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='car',
+            name='current_reservation',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reservations.reservation', verbose_name='Réservation en cours'),
+        ),
+        migrations.AddField(
+            model_name='car',
+            name='free_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Libre jusqu'au"),
+        ),
+        migrations.AddField(
+            model_name='car',
+            name='next_reservation_start',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Début de la prochaine réservation'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['status', 'current_reservation', 'free_until'], name='cars_status_2f0db7_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0002_car_reservation_state'),
+        ('reservations', '0009_waitlist_entry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['updated_at'], name='cars_updated_346140_idx'),
+        ),
+    ]
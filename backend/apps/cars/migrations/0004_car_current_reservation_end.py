@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:28
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_current_reservation_end(apps, schema_editor):
+    Car = apps.get_model('cars', 'Car')
+    Reservation = apps.get_model('reservations', 'Reservation')
+    Car.objects.filter(current_reservation__isnull=False).update(
+        current_reservation_end=Subquery(
+            Reservation.objects.filter(id=OuterRef('current_reservation_id')).values('end_date')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0003_car_updated_at_index'),
+        ('reservations', '0010_reservation_user_updated_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='car',
+            name='cars_status_2f0db7_idx',
+        ),
+        migrations.AddField(
+            model_name='car',
+            name='current_reservation_end',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Fin de la réservation en cours'),
+        ),
+        migrations.RunPython(fill_current_reservation_end, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['status', 'current_reservation_end', 'next_reservation_start'], name='cars_status_41e511_idx'),
+        ),
+    ]
@@ -17,12 +17,41 @@ class Car(models.Model):
         default=CarStatus.AVAILABLE,
         verbose_name="Statut"
     )
+    # État dénormalisé des réservations, tenu à jour par le service des
+    # réservations et réparé par `manage.py reconcile_car_state`.
+    # Sans contrainte en base : l'archivage supprime des réservations par lots
+    # (puis recalcule l'état des véhicules concernés).
+    current_reservation = models.ForeignKey(
+        'reservations.Reservation',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        db_constraint=False,
+        related_name='+',
+        verbose_name="Réservation en cours"
+    )
+    # Une fois dépassée, la réservation en cours est terminée : le véhicule
+    # est libre sans attendre le prochain recalcul
+    current_reservation_end = models.DateTimeField(
+        null=True, blank=True, verbose_name="Fin de la réservation en cours"
+    )
+    next_reservation_start = models.DateTimeField(
+        null=True, blank=True, verbose_name="Début de la prochaine réservation"
+    )
+    # Fin de la période libre en cours (None : libre sans limite ou occupé)
+    free_until = models.DateTimeField(null=True, blank=True, verbose_name="Libre jusqu'au")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'cars'
         ordering = ['-created_at']
+        indexes = [
+            # Listes « disponible maintenant / libre jusqu'à X »
+            models.Index(fields=['status', 'current_reservation_end', 'next_reservation_start']),
+            # Flux de synchronisation (/api/sync/?since=)
+            models.Index(fields=['updated_at']),
+        ]
         
     def __str__(self):
         return f"{self.brand} {self.model} ({self.registration_number})"
\ No newline at end of file
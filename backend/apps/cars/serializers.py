@@ -1,17 +1,87 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Car
+
+from apps.core.serializers import DynamicFieldsMixin
+from .models import Car, CarStatus
 
 
-class CarSerializer(serializers.ModelSerializer):
+class CarSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     status_display = serializers.SerializerMethodField()
+    is_available = serializers.SerializerMethodField()
 
     class Meta:
         model = Car
         fields = [
             'id', 'registration_number', 'brand', 'model', 'year', 'status',
-            'created_at', 'updated_at', 'status_display'
+            'current_reservation', 'current_reservation_end', 'next_reservation_start', 'free_until',
+            'created_at', 'updated_at', 'status_display', 'is_available'
         ]
-        read_only_fields = ['status', 'created_at', 'updated_at']
+        read_only_fields = [
+            'status', 'current_reservation', 'current_reservation_end', 'next_reservation_start',
+            'free_until', 'created_at', 'updated_at'
+        ]
+        field_dependencies = {
+            'status_display': ['status'],
+            'is_available': ['status', 'current_reservation_end', 'next_reservation_start'],
+        }
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # Réservation d'un autre utilisateur : identifiant réservé au staff
+        request = self.context.get('request')
+        if request is None or not request.user.is_staff:
+            fields.pop('current_reservation', None)
+        return fields
 
     def get_status_display(self, obj):
         return obj.get_status_display()
+
+    def get_is_available(self, obj):
+        """Disponible et libre à l'instant (même règle que ?available=true)."""
+        now = timezone.now()
+        return (
+            obj.status == CarStatus.AVAILABLE
+            and (obj.current_reservation_end is None or obj.current_reservation_end <= now)
+            and (obj.next_reservation_start is None or obj.next_reservation_start > now)
+        )
+
+
+class NextSlotsQuerySerializer(serializers.Serializer):
+    """Paramètres de recherche des prochains créneaux libres."""
+    duration = serializers.DurationField(min_value=timedelta(minutes=1))
+    after = serializers.DateTimeField(required=False)
+    limit = serializers.IntegerField(required=False, default=3, min_value=1, max_value=20)
+
+
+class SlotSerializer(serializers.Serializer):
+    start_date = serializers.DateTimeField()
+    end_date = serializers.DateTimeField()
+    free_until = serializers.DateTimeField(allow_null=True)
+
+
+class AvailabilityItemSerializer(serializers.Serializer):
+    car_id = serializers.IntegerField()
+    start_date = serializers.DateTimeField()
+    end_date = serializers.DateTimeField()
+
+    def validate(self, data):
+        if data['start_date'] >= data['end_date']:
+            raise serializers.ValidationError(
+                "La date de début doit être antérieure à la date de fin."
+            )
+        return data
+
+
+class BulkAvailabilitySerializer(serializers.Serializer):
+    items = AvailabilityItemSerializer(many=True, max_length=500)
+
+
+class AvailabilityResultSerializer(serializers.Serializer):
+    car_id = serializers.IntegerField()
+    start_date = serializers.DateTimeField()
+    end_date = serializers.DateTimeField()
+    available = serializers.BooleanField()
+    conflicting_ids = serializers.ListField(child=serializers.IntegerField())
+    reason = serializers.CharField(required=False)
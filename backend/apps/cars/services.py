@@ -0,0 +1,175 @@
+import csv
+import json
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.cars.models import Car, CarStatus
+from apps.reservations.ical import CalendarFeedService
+from apps.reservations.models import Reservation, ReservationStatus
+from apps.reservations.services import DashboardService
+
+
+class FleetSyncService:
+    """
+    Synchronisation du parc avec le référentiel externe.
+
+    Les lignes sont lues en flux puis comparées par lots aux véhicules
+    existants (clé : registration_number). Seules les créations et les
+    modifications réelles sont écrites, via bulk_create / bulk_update.
+    Les créations sont des upserts : une synchronisation concurrente qui
+    crée la même immatriculation ne provoque pas d'IntegrityError.
+    """
+
+    SYNC_FIELDS = ['brand', 'model', 'year', 'status']
+    BLOCKING_STATUSES = [CarStatus.MAINTENANCE, CarStatus.UNAVAILABLE]
+
+    @staticmethod
+    def read_rows(stream: TextIO, fmt: str) -> Iterator[dict]:
+        """Lit un export CSV, JSON (tableau) ou JSON Lines."""
+        if fmt == 'csv':
+            yield from csv.DictReader(stream)
+        elif fmt == 'jsonl':
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+        elif fmt == 'json':
+            yield from json.load(stream)
+        else:
+            raise ValueError(f"Format non supporté : {fmt}")
+
+    @staticmethod
+    def clean_row(row: dict) -> dict:
+        """Normalise et valide une ligne ; lève ValueError si invalide."""
+        registration_number = str(row.get('registration_number') or '').strip()
+        if not registration_number:
+            raise ValueError("registration_number manquant")
+
+        cleaned = {'registration_number': registration_number}
+        for field in ['brand', 'model']:
+            value = str(row.get(field) or '').strip()
+            if not value:
+                raise ValueError(f"{field} manquant")
+            cleaned[field] = value
+
+        try:
+            cleaned['year'] = int(row.get('year'))
+        except (TypeError, ValueError):
+            raise ValueError("year invalide")
+
+        status = str(row.get('status') or '').strip().upper()
+        if status:
+            if status not in CarStatus.values:
+                raise ValueError(f"status invalide : {status}")
+            cleaned['status'] = status
+
+        return cleaned
+
+    @classmethod
+    def sync(cls, rows: Iterable[dict], chunk_size: int = 500, dry_run: bool = False) -> dict:
+        """
+        Applique les lignes au parc, par lots de `chunk_size`.
+
+        Returns:
+            Rapport : compteurs created/updated/unchanged, erreurs par ligne
+            et véhicules passés en MAINTENANCE/UNAVAILABLE qui ont encore
+            des réservations à venir (conflicts).
+        """
+        report = {'created': 0, 'updated': 0, 'unchanged': 0, 'errors': [], 'conflicts': []}
+        rows = enumerate(rows, start=1)
+
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            cleaned = {}
+            for line, row in chunk:
+                try:
+                    data = cls.clean_row(row)
+                except (ValueError, AttributeError) as e:
+                    report['errors'].append({'line': line, 'error': str(e)})
+                    continue
+                # La dernière occurrence d'une immatriculation l'emporte
+                cleaned[data['registration_number']] = data
+
+            with transaction.atomic():
+                cls._apply_chunk(cleaned, report, dry_run)
+
+        return report
+
+    @classmethod
+    def _apply_chunk(cls, cleaned: dict, report: dict, dry_run: bool) -> None:
+        existing = Car.objects.in_bulk(cleaned.keys(), field_name='registration_number')
+        now = timezone.now()
+        to_create, to_update, blocked = [], [], []
+
+        for registration_number, data in cleaned.items():
+            car = existing.get(registration_number)
+            if car is None:
+                to_create.append(data)
+                continue
+
+            changed = False
+            for field in cls.SYNC_FIELDS:
+                if field in data and getattr(car, field) != data[field]:
+                    if field == 'status' and data[field] in cls.BLOCKING_STATUSES:
+                        blocked.append(car)
+                    setattr(car, field, data[field])
+                    changed = True
+
+            if changed:
+                car.updated_at = now
+                to_update.append(car)
+            else:
+                report['unchanged'] += 1
+
+        report['created'] += len(to_create)
+        report['updated'] += len(to_update)
+        report['conflicts'].extend(cls._future_reservation_conflicts(blocked, now))
+
+        if dry_run or not (to_create or to_update):
+            return
+        # Upsert par groupe de champs fournis : un statut absent de l'export
+        # ne remplace pas celui d'un véhicule créé entre-temps
+        groups = {}
+        for data in to_create:
+            fields = tuple(field for field in cls.SYNC_FIELDS if field in data)
+            groups.setdefault(fields, []).append(Car(**data))
+        for fields, cars in groups.items():
+            Car.objects.bulk_create(
+                cars,
+                update_conflicts=True,
+                unique_fields=['registration_number'],
+                update_fields=[*fields, 'updated_at'],
+            )
+        Car.objects.bulk_update(to_update, cls.SYNC_FIELDS + ['updated_at'])
+
+        # bulk_create / bulk_update sans post_save : invalidation explicite
+        DashboardService.invalidate()
+        CalendarFeedService.invalidate(car_ids=[car.id for car in to_update])
+
+    @staticmethod
+    def _future_reservation_conflicts(cars: list, now) -> list:
+        """Réservations à venir des véhicules devenus indisponibles (une requête)."""
+        if not cars:
+            return []
+
+        reservations = {}
+        for car_id, reservation_id in Reservation.objects.filter(
+            car__in=cars,
+            status__in=[ReservationStatus.CONFIRMED, ReservationStatus.PENDING],
+            end_date__gt=now
+        ).order_by('start_date').values_list('car_id', 'id'):
+            reservations.setdefault(car_id, []).append(reservation_id)
+
+        return [
+            {
+                'registration_number': car.registration_number,
+                'status': car.status,
+                'reservation_ids': reservations[car.id],
+            }
+            for car in cars if car.id in reservations
+        ]
@@ -1,3 +1,410 @@
+from rest_framework.test import APIClient
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from apps.cars.models import CarStatus, Car
+from apps.cars.services import FleetSyncService
+from apps.reservations.ical import CalendarFeedService
+from apps.reservations.models import Reservation, ReservationStatus
+from apps.reservations.services import CarStateService, DashboardService, ReservationService
+
+User = get_user_model()
+
+
+class CarNextSlotsTestCase(TestCase):
+    """Tests de la recherche de créneaux libres."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='slots',
+            email='slots@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.car = Car.objects.create(
+            registration_number='SLT-001',
+            brand='Toyota',
+            model='Hilux',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        self.base = (timezone.now() + timedelta(days=1)).replace(microsecond=0)
+
+        # Occupé : [0h, 2h], [3h, 4h], [8h, 10h]
+        for start, end in [(0, 2), (3, 4), (8, 10)]:
+            ReservationService.create_reservation(
+                user=self.user,
+                car_id=self.car.id,
+                start_date=self.base + timedelta(hours=start),
+                end_date=self.base + timedelta(hours=end)
+            )
+
+    def test_find_next_slots_gap_search(self):
+        """Test: les créneaux trop courts sont ignorés."""
+        slots = ReservationService.find_next_slots(
+            self.car.id, timedelta(hours=2), self.base, limit=2
+        )
+
+        self.assertEqual(slots[0]['start_date'], self.base + timedelta(hours=4))
+        self.assertEqual(slots[0]['free_until'], self.base + timedelta(hours=8))
+        self.assertEqual(slots[1]['start_date'], self.base + timedelta(hours=10))
+        self.assertIsNone(slots[1]['free_until'])
+
+    def test_next_slots_endpoint(self):
+        """Test: endpoint /next_slots/."""
+        response = self.client.get(f'/api/cars/{self.car.id}/next_slots/', {
+            'duration': '01:00:00',
+            'after': self.base.isoformat(),
+            'limit': 1,
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['slots']), 1)
+
+    def test_next_slots_requires_duration(self):
+        """Test: duration obligatoire."""
+        response = self.client.get(f'/api/cars/{self.car.id}/next_slots/')
+        self.assertEqual(response.status_code, 400)
+
+    def test_create_conflict_embeds_suggestions(self):
+        """Test: un conflit peut proposer des créneaux."""
+        response = self.client.post('/api/reservations/?suggest=true', {
+            'car_id': self.car.id,
+            'start_date': self.base.isoformat(),
+            'end_date': (self.base + timedelta(hours=1)).isoformat(),
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data['suggestions'][0]['start_date'],
+            (self.base + timedelta(hours=2)).isoformat().replace('+00:00', 'Z')
+        )
+
+
+class FleetSyncTestCase(TestCase):
+    """Tests de la synchronisation du parc."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = User.objects.create_user(
+            username='fleet',
+            email='fleet@example.com',
+            password='testpass123',
+            is_staff=True
+        )
+        self.client.force_authenticate(user=self.staff)
+
+        self.car = Car.objects.create(
+            registration_number='TG-001-AA',
+            brand='Toyota',
+            model='Hilux',
+            year=2022,
+            status=CarStatus.AVAILABLE
+        )
+        self.unchanged = Car.objects.create(
+            registration_number='TG-002-BB',
+            brand='Ford',
+            model='Ranger',
+            year=2021,
+            status=CarStatus.AVAILABLE
+        )
+        self.reservation = ReservationService.create_reservation(
+            user=self.staff,
+            car_id=self.car.id,
+            start_date=timezone.now() + timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=2)
+        )
+
+    def test_sync_csv_upload(self):
+        """Test: créations, modifications et conflits de statut."""
+        content = (
+            "registration_number,brand,model,year,status\n"
+            "TG-001-AA,Toyota,Hilux,2022,MAINTENANCE\n"
+            "TG-002-BB,Ford,Ranger,2021,AVAILABLE\n"
+            "TG-003-CC,Nissan,Patrol,2024,\n"
+            ",Nissan,Patrol,2024,\n"
+        )
+        upload = SimpleUploadedFile('fleet.csv', content.encode('utf-8'))
+
+        response = self.client.post('/api/cars/sync/', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['unchanged'], 1)
+        self.assertEqual(response.data['errors'][0]['line'], 4)
+        self.assertEqual(
+            response.data['conflicts'][0]['reservation_ids'], [self.reservation.id]
+        )
+        self.car.refresh_from_db()
+        self.assertEqual(self.car.status, CarStatus.MAINTENANCE)
+        self.assertTrue(Car.objects.filter(registration_number='TG-003-CC').exists())
+
+    def test_sync_dry_run_writes_nothing(self):
+        """Test: dry_run ne modifie pas la base."""
+        response = self.client.post('/api/cars/sync/?dry_run=true', [
+            {'registration_number': 'TG-009-ZZ', 'brand': 'Ford', 'model': 'Ranger', 'year': 2023},
+        ], format='json')
+
+        self.assertEqual(response.data['created'], 1)
+        self.assertFalse(Car.objects.filter(registration_number='TG-009-ZZ').exists())
+
+    def test_sync_requires_staff(self):
+        """Test: réservé au staff."""
+        self.staff.is_staff = False
+        self.staff.save()
+        response = self.client.post('/api/cars/sync/', [], format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_sync_invalidates_caches(self):
+        """Test: écritures groupées sans post_save, caches du parc invalidés."""
+        fleet_key = DashboardService.FLEET_VERSION_KEY
+        car_key = CalendarFeedService.version_key('car', self.car.id)
+        cache.set(fleet_key, 1, None)
+        cache.set(car_key, 1, None)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FleetSyncService.sync([
+                {'registration_number': 'TG-001-AA', 'brand': 'Toyota', 'model': 'Hilux', 'year': 2023},
+            ])
+
+        self.assertEqual(cache.get(fleet_key), 2)
+        self.assertEqual(cache.get(car_key), 2)
+
+    def test_sync_concurrent_creation(self):
+        """Test: immatriculation créée par une autre synchronisation entre lecture et écriture."""
+        # Lecture faite avant la création concurrente : le véhicule paraît nouveau
+        with mock.patch.object(type(Car.objects), 'in_bulk', return_value={}):
+            report = FleetSyncService.sync([
+                {'registration_number': 'TG-002-BB', 'brand': 'Ford', 'model': 'Ranger Raptor', 'year': 2021},
+            ])
+
+        self.assertEqual(report['created'], 1)
+        self.unchanged.refresh_from_db()
+        self.assertEqual(self.unchanged.model, 'Ranger Raptor')
+        self.assertEqual(Car.objects.filter(registration_number='TG-002-BB').count(), 1)
+
+
+class BulkAvailabilityTestCase(TestCase):
+    """Tests de la vérification de disponibilité en masse."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='partner',
+            email='partner@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.car = Car.objects.create(
+            registration_number='BLK-001',
+            brand='Toyota',
+            model='Hilux',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        self.maintenance = Car.objects.create(
+            registration_number='BLK-002',
+            brand='Ford',
+            model='Ranger',
+            year=2021,
+            status=CarStatus.MAINTENANCE
+        )
+        self.base = timezone.now() + timedelta(days=1)
+        self.first = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=self.base,
+            end_date=self.base + timedelta(hours=2)
+        )
+        self.second = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=self.base + timedelta(hours=4),
+            end_date=self.base + timedelta(hours=6)
+        )
+
+    def _item(self, car_id, start, end):
+        return {
+            'car_id': car_id,
+            'start_date': (self.base + timedelta(hours=start)).isoformat(),
+            'end_date': (self.base + timedelta(hours=end)).isoformat(),
+        }
+
+    def test_bulk_availability(self):
+        """Test: une réponse par couple, sans requête par item."""
+        items = [
+            self._item(self.car.id, 2, 4),
+            self._item(self.car.id, 1, 5),
+            self._item(self.car.id, 5, 8),
+            self._item(self.maintenance.id, 0, 1),
+            self._item(999999, 0, 1),
+        ]
+
+        response = self.client.post('/api/cars/availability/bulk/', {'items': items}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertTrue(results[0]['available'])
+        self.assertEqual(results[1]['conflicting_ids'], [self.first.id, self.second.id])
+        self.assertEqual(results[2]['conflicting_ids'], [self.second.id])
+        self.assertEqual(results[3]['reason'], 'car_unavailable')
+        self.assertEqual(results[4]['reason'], 'not_found')
+
+    def test_bulk_availability_validates_items(self):
+        """Test: période invalide refusée."""
+        response = self.client.post('/api/cars/availability/bulk/', {
+            'items': [self._item(self.car.id, 3, 1)]
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_availability_uses_two_queries(self):
+        """Test: statuts + intervalles, quel que soit le nombre d'items."""
+        items = [
+            {
+                'car_id': self.car.id,
+                'start_date': self.base + timedelta(hours=hour),
+                'end_date': self.base + timedelta(hours=hour + 1),
+            }
+            for hour in range(50)
+        ]
+
+        with self.assertNumQueries(2):
+            results = ReservationService.bulk_check_availability(items)
+
+        self.assertEqual(
+            [result['available'] for result in results[:7]],
+            [False, False, True, True, False, False, True]
+        )
+
+
+class CarStateTestCase(TestCase):
+    """Tests de l'état dénormalisé (réservation en cours, libre jusqu'à)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='state',
+            email='state@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.car = Car.objects.create(
+            registration_number='STA-001',
+            brand='Toyota',
+            model='Corolla',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        self.start = timezone.now() + timedelta(days=1)
+
+    def listed(self, **params):
+        response = self.client.get('/api/cars/', params)
+        return [car['id'] for car in response.data]
+
+    def test_state_maintained_by_service(self):
+        """Test: réservation puis annulation → état mis à jour dans la transaction"""
+        reservation = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=self.start,
+            end_date=self.start + timedelta(hours=2)
+        )
+        self.car.refresh_from_db()
+        self.assertIsNone(self.car.current_reservation_id)
+        self.assertEqual(self.car.next_reservation_start, self.start)
+        self.assertEqual(self.car.free_until, self.start)
+
+        self.assertEqual(self.listed(available='true'), [self.car.id])
+        self.assertEqual(self.listed(free_until=(self.start - timedelta(hours=1)).isoformat()), [self.car.id])
+        self.assertEqual(self.listed(free_until=(self.start + timedelta(hours=1)).isoformat()), [])
+
+        ReservationService.cancel_reservation(reservation.id)
+        self.car.refresh_from_db()
+        self.assertIsNone(self.car.free_until)
+        self.assertEqual(self.listed(free_until=(self.start + timedelta(days=30)).isoformat()), [self.car.id])
+
+    def test_listing_is_plain_filter(self):
+        """Test: ?available=true ne lit que la table cars"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/cars/', {'available': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('reservations', ' '.join(q['sql'] for q in queries.captured_queries))
+
+        response = self.client.get('/api/cars/', {'free_until': 'demain'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_reconcile_repairs_drift(self):
+        """Test: réservation en cours créée hors service puis réparée par le recalcul"""
+        now = timezone.now()
+        current = Reservation.objects.bulk_create([Reservation(
+            user=self.user,
+            car=self.car,
+            start_date=now - timedelta(hours=1),
+            end_date=now + timedelta(hours=1),
+            status=ReservationStatus.CONFIRMED
+        )])[0]
+        # bulk_create n'envoie pas de signal : l'état est périmé
+        self.assertEqual(self.listed(available='true'), [self.car.id])
+
+        self.assertEqual(CarStateService.reconcile(batch_size=1), 1)
+        self.car.refresh_from_db()
+        self.assertEqual(self.car.current_reservation_id, current.id)
+        self.assertEqual(self.listed(available='true'), [])
+        self.assertFalse(self.client.get(f'/api/cars/{self.car.id}/').data['is_available'])
+        self.assertEqual(CarStateService.reconcile(), 0)
+
+    def test_deleted_reservation_frees_car(self):
+        """Test: suppression directe (admin) → état du véhicule recalculé"""
+        reservation = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=self.start,
+            end_date=self.start + timedelta(hours=2)
+        )
+        Reservation.objects.get(id=reservation.id).delete()
+
+        self.car.refresh_from_db()
+        self.assertIsNone(self.car.next_reservation_start)
+        self.assertEqual(self.listed(free_until=(self.start + timedelta(hours=1)).isoformat()), [self.car.id])
+
+    def test_current_reservation_staff_only(self):
+        """Test: l'identifiant de la réservation en cours n'est exposé qu'au staff"""
+        self.assertNotIn('current_reservation', self.client.get(f'/api/cars/{self.car.id}/').data)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertIn('current_reservation', self.client.get(f'/api/cars/{self.car.id}/').data)
+
+    def test_free_until_elapsed_counts_as_busy(self):
+        """Test: une réservation qui commence rend le véhicule occupé sans écriture"""
+        started = timezone.now() - timedelta(seconds=1)
+        Car.objects.filter(id=self.car.id).update(free_until=started, next_reservation_start=started)
+        self.assertEqual(self.listed(available='true'), [])
+
+    def test_ended_current_counts_as_free(self):
+        """Test: une réservation en cours terminée libère le véhicule avant le recalcul"""
+        now = timezone.now()
+        ended = Reservation.objects.bulk_create([Reservation(
+            user=self.user,
+            car=self.car,
+            start_date=now - timedelta(hours=2),
+            end_date=now - timedelta(minutes=1),
+            status=ReservationStatus.CONFIRMED
+        )])[0]
+        # état tel que laissé par le dernier recalcul, pendant la réservation
+        Car.objects.filter(id=self.car.id).update(
+            current_reservation=ended, current_reservation_end=ended.end_date
+        )
+        self.assertEqual(self.listed(available='true'), [self.car.id])
+        self.assertEqual(self.listed(free_until=(now + timedelta(days=1)).isoformat()), [self.car.id])
+        self.assertTrue(self.client.get(f'/api/cars/{self.car.id}/').data['is_available'])
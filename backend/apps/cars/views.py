@@ -14,13 +14,28 @@
 #     ordering_fields = ['brand', 'model', 'year', 'created_at']
 #     ordering = ['-created_at']
 
-from rest_framework import viewsets, filters
+import io
+from datetime import datetime
+
+from rest_framework import viewsets, filters, serializers
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
 
-from .models import Car, CarStatus
-from .serializers import CarSerializer
+from apps.core.throttling import bucket_throttles
+from apps.reservations.services import (
+    CarStateService, ReservationBulkService, ReservationService
+)
+from apps.reservations.views import calendar_url
+from .models import Car
+from .services import FleetSyncService
+from .serializers import (
+    CarSerializer, NextSlotsQuerySerializer, SlotSerializer,
+    BulkAvailabilitySerializer, AvailabilityResultSerializer
+)
 
 
 class CarViewSet(viewsets.ReadOnlyModelViewSet):
@@ -38,13 +53,29 @@ class CarViewSet(viewsets.ReadOnlyModelViewSet):
     ordering_fields = ['brand', 'model', 'year', 'created_at']
     ordering = ['-created_at']
 
+    def get_throttles(self):
+        if self.action in ('availability', 'bulk_availability', 'next_slots'):
+            return bucket_throttles('availability')
+        return super().get_throttles()
+
     def get_queryset(self):
         queryset = super().get_queryset()
 
-        # Filtre par disponibilité
+        # Filtre par disponibilité : libre maintenant (?available=true) et,
+        # le cas échéant, jusqu'à une date (?free_until=ISO). Filtre indexé
+        # sur l'état dénormalisé du véhicule, sans sous-requête.
         available_only = self.request.query_params.get('available', None)
-        if available_only == 'true':
-            queryset = queryset.filter(status=CarStatus.AVAILABLE)
+        free_until = self.request.query_params.get('free_until', None)
+        if available_only == 'true' or free_until:
+            now = timezone.now()
+            if free_until:
+                until = serializers.DateTimeField().to_internal_value(free_until)
+                queryset = queryset.filter(CarStateService.free_until_q(now, until))
+            else:
+                queryset = queryset.filter(CarStateService.available_now_q(now))
+
+        if self.action == 'list':
+            queryset = CarSerializer.optimize_queryset(queryset, self.request)
 
         return queryset
 
@@ -64,9 +95,6 @@ class CarViewSet(viewsets.ReadOnlyModelViewSet):
                 status=400
             )
 
-        from datetime import datetime
-        from apps.reservations.services import ReservationService
-
         try:
             start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
             end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
@@ -87,4 +115,93 @@ class CarViewSet(viewsets.ReadOnlyModelViewSet):
             return Response(
                 {'error': 'Format de date invalide. Utilisez ISO 8601'},
                 status=400
-            )
\ No newline at end of file
+            )
+
+    @action(detail=False, methods=['post'], url_path='availability/bulk')
+    def bulk_availability(self, request):
+        """
+        Disponibilité de plusieurs couples (véhicule, période) en une requête.
+        Corps : {"items": [{"car_id", "start_date", "end_date"}, ...]} (500 max)
+        """
+        serializer = BulkAvailabilitySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = ReservationService.bulk_check_availability(serializer.validated_data['items'])
+        return Response({'results': AvailabilityResultSerializer(results, many=True).data})
+
+    @action(detail=True, methods=['get'])
+    def next_slots(self, request, pk=None):
+        """
+        Prochains créneaux libres d'une durée donnée.
+        Query params: duration (ex. "02:00:00" ou "P1DT2H"), after (ISO), limit
+        """
+        car = self.get_object()
+        params = NextSlotsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        try:
+            ReservationService.validate_car_availability(car)
+        except DjangoValidationError as e:
+            return Response({'slots': [], 'reason': e.messages[0]})
+
+        slots = ReservationService.find_next_slots(
+            car.id,
+            params.validated_data['duration'],
+            params.validated_data.get('after', timezone.now()),
+            limit=params.validated_data['limit']
+        )
+        return Response({'slots': SlotSerializer(slots, many=True).data})
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAdminUser])
+    def calendar(self, request, pk=None):
+        """Lien d'abonnement iCalendar au planning du véhicule (staff)."""
+        car = self.get_object()
+        return Response({'url': calendar_url(request, 'car', car.id)})
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
+    def retire(self, request, pk=None):
+        """
+        Met le véhicule en maintenance et annule ses réservations non terminées (staff).
+        """
+        car = self.get_object()
+        cancelled = ReservationBulkService.retire_cars([car.id], actor=request.user)
+        car.refresh_from_db(fields=['status'])
+        return Response({
+            'car': self.get_serializer(car).data,
+            'cancelled': len(cancelled),
+            'ids': cancelled,
+        })
+
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[IsAdminUser],
+        parser_classes=[MultiPartParser, JSONParser]
+    )
+    def sync(self, request):
+        """
+        Synchronisation du parc (staff).
+        Corps : fichier `file` (CSV, JSON, JSON Lines) ou liste JSON de véhicules.
+        Query params: dry_run=true
+        """
+        dry_run = request.query_params.get('dry_run') == 'true'
+        upload = request.FILES.get('file')
+
+        try:
+            if upload is not None:
+                fmt = upload.name.rsplit('.', 1)[-1].lower()
+                stream = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+                report = FleetSyncService.sync(
+                    FleetSyncService.read_rows(stream, fmt), dry_run=dry_run
+                )
+            elif isinstance(request.data, list):
+                report = FleetSyncService.sync(request.data, dry_run=dry_run)
+            else:
+                return Response(
+                    {'error': 'Fichier `file` ou liste JSON attendu'},
+                    status=400
+                )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        return Response(report)
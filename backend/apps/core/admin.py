@@ -0,0 +1,108 @@
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator qui évite le COUNT(*) complet sur les grosses tables.
+
+    Sur PostgreSQL, une liste non filtrée utilise l'estimation du planner
+    (pg_class.reltuples) au-delà d'un seuil. Les listes filtrées, ou les
+    autres moteurs, gardent un comptage exact.
+    """
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = self._estimated_count()
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
+
+    def _estimated_count(self):
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [self.object_list.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+
+        # reltuples vaut -1 tant que la table n'a jamais été analysée
+        if row is None or row[0] < 0:
+            return None
+        return row[0]
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Filtre sur une clé étrangère via le widget autocomplete de l'admin.
+
+    Contrairement au RelatedFieldListFilter par défaut, aucune liste de
+    tous les objets liés n'est chargée : seules les options correspondant
+    à la saisie sont récupérées (AJAX), via les search_fields de l'admin
+    du modèle lié.
+    """
+    template = 'admin/core/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f"{field_path}__{field.target_field.name}__exact"
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+        remote_model = field.remote_field.model
+        form_field = forms.ModelChoiceField(
+            queryset=remote_model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+        value = self.used_parameters.get(self.lookup_kwarg)
+        self.rendered_widget = form_field.widget.render(
+            name=self.lookup_kwarg,
+            value=value[-1] if value else None,
+            attrs={
+                'id': f"autocomplete-filter-{field_path}",
+                'class': 'autocomplete-filter',
+                'style': 'width: 100%',
+            },
+        )
+        self.widget_media = form_field.widget.media
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def get_facet_counts(self, pk_attname, filtered_qs):
+        # Pas de facettes : elles nécessiteraient un COUNT par objet lié
+        return {}
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.lookup_kwarg not in self.used_parameters,
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg]),
+            'display': 'Tous',
+        }
+
+
+class AutocompleteFilterMixin:
+    """
+    Ajoute au changelist les médias (select2) nécessaires aux AutocompleteFilter.
+    """
+
+    @property
+    def media(self):
+        media = super().media
+        for list_filter in self.list_filter:
+            if isinstance(list_filter, (list, tuple)) and issubclass(list_filter[1], AutocompleteFilter):
+                field = self.model._meta.get_field(list_filter[0])
+                media += AutocompleteSelect(field, self.admin_site).media
+                media += forms.Media(js=['core/admin/autocomplete_filter.js'])
+                break
+        return media
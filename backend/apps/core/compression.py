@@ -0,0 +1,167 @@
+import re
+import zlib
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+ACCEPT_ENCODING_RE = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+DEFAULTS = {
+    # En dessous, l'en-tête et la latence de compression coûtent plus que le gain
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+    # Réponses en flux : chaque morceau est envoyé aussitôt, compression plus légère
+    'STREAMING_BROTLI_QUALITY': 4,
+    # Formats de l'API et flux iCal uniquement : les pages HTML (admin, API
+    # navigable) portent un jeton CSRF à côté de saisies réfléchies (BREACH)
+    'CONTENT_TYPES': (
+        'application/json', 'application/msgpack', 'application/vnd.carreservation.columns+json',
+        'text/calendar',
+    ),
+    # Réponses contenant des secrets (jetons) : pas de compression (BREACH)
+    'EXCLUDE_PREFIXES': ('/api/auth/',),
+}
+
+
+def compression_option(name: str):
+    return getattr(settings, 'RESPONSE_COMPRESSION', {}).get(name, DEFAULTS[name])
+
+
+def accepted_encodings(header: str) -> dict:
+    """{encodage: q} d'après Accept-Encoding (q=0 exclu)."""
+    encodings = {}
+    for part in header.split(','):
+        match = ACCEPT_ENCODING_RE.match(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        if quality > 0:
+            encodings[match.group(1).lower()] = quality
+    return encodings
+
+
+class GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, streaming: bool = False):
+        # wbits 16 + 15 : en-tête et somme de contrôle gzip
+        self.compressor = zlib.compressobj(compression_option('GZIP_LEVEL'), zlib.DEFLATED, 31)
+
+    def process(self, chunk: bytes) -> bytes:
+        return self.compressor.compress(chunk)
+
+    def flush(self) -> bytes:
+        """Vide le tampon sans clore le flux (réponses en flux)."""
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, streaming: bool = False):
+        import brotli
+
+        quality = compression_option('STREAMING_BROTLI_QUALITY' if streaming else 'BROTLI_QUALITY')
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def process(self, chunk: bytes) -> bytes:
+        return self.compressor.process(chunk)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compression brotli ou gzip des réponses, selon Accept-Encoding.
+
+    - Réponses classiques : compressées au-delà de MIN_SIZE octets et
+      seulement si le résultat est plus petit.
+    - Réponses en flux (synchrones ou asynchrones) : chaque morceau est
+      compressé puis vidé immédiatement, sans attendre la fin du flux.
+    - Seuls les types de CONTENT_TYPES sont compressés : ni HTML (jeton
+      CSRF), ni types déjà compressés (images, archives), ni préfixes exclus.
+    - Brotli est utilisé s'il est installé et accepté, sinon gzip.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.encoders = {'gzip': GzipEncoder}
+        if find_spec('brotli') is not None:
+            self.encoders['br'] = BrotliEncoder
+
+    def choose_encoder(self, request):
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        # À qualité égale, brotli (plus compact) avant gzip
+        candidates = [name for name in ('br', 'gzip') if name in self.encoders and name in accepted]
+        if not candidates:
+            return None
+        return self.encoders[max(candidates, key=lambda name: accepted[name])]
+
+    def should_compress(self, request, response) -> bool:
+        if response.has_header('Content-Encoding') or response.status_code == 206:
+            return False
+        if request.path.startswith(compression_option('EXCLUDE_PREFIXES')):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        return content_type.startswith(compression_option('CONTENT_TYPES'))
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        # Le contenu varie selon l'encodage accepté, même non compressé
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoder_class = self.choose_encoder(request)
+        if encoder_class is None or not self.should_compress(request, response):
+            return response
+
+        if response.streaming:
+            encoder = encoder_class(streaming=True)
+            if response.is_async:
+                response.streaming_content = self.compress_async(response.streaming_content, encoder)
+            else:
+                response.streaming_content = self.compress_stream(response.streaming_content, encoder)
+            del response.headers['Content-Length']
+        else:
+            if len(response.content) < compression_option('MIN_SIZE'):
+                return response
+            encoder = encoder_class()
+            compressed = encoder.process(response.content) + encoder.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # L'ETag forte désigne la représentation non compressée
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoder.name
+        return response
+
+    @staticmethod
+    def compress_stream(chunks, encoder):
+        for chunk in chunks:
+            data = encoder.process(chunk) + encoder.flush()
+            if data:
+                yield data
+        yield encoder.finish()
+
+    @staticmethod
+    async def compress_async(chunks, encoder):
+        async for chunk in chunks:
+            data = encoder.process(chunk) + encoder.flush()
+            if data:
+                yield data
+        yield encoder.finish()
@@ -0,0 +1,131 @@
+import json
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.cars.models import Car, CarStatus
+from apps.cars.serializers import CarSerializer
+from apps.core.compression import BrotliEncoder, GzipEncoder
+from apps.core.renderers import CompactJSONRenderer, MessagePackRenderer
+from apps.reservations.models import Reservation, ReservationStatus
+from apps.reservations.serializers import ReservationSerializer
+
+RENDERERS = {
+    'json': JSONRenderer,
+    'columns': CompactJSONRenderer,
+    'msgpack': MessagePackRenderer,
+}
+ENCODERS = {
+    'identity': None,
+    'gzip': GzipEncoder,
+    'br': BrotliEncoder,
+}
+
+
+def build_payloads(rows: int, cars: int) -> dict:
+    """Listes véhicules et réservations (?expand=car), sans accès à la base."""
+    now = timezone.now()
+    user = get_user_model()(id=1, username='bench', first_name='Ama', last_name='Mensah', email='ama@example.com')
+    fleet = [
+        Car(
+            id=i,
+            registration_number=f'TG-{i:04d}-AB',
+            brand=['Toyota', 'Renault', 'Peugeot'][i % 3],
+            model=['Corolla', 'Clio', '208'][i % 3],
+            year=2018 + i % 6,
+            status=CarStatus.AVAILABLE,
+            free_until=now + timedelta(hours=i),
+            next_reservation_start=now + timedelta(hours=i),
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(1, cars + 1)
+    ]
+    reservations = [
+        Reservation(
+            id=i,
+            user=user,
+            car=fleet[i % cars],
+            start_date=now + timedelta(days=i),
+            end_date=now + timedelta(days=i, hours=3),
+            status=ReservationStatus.CONFIRMED,
+            purpose=f'Mission terrain n°{i}',
+            version=1,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(1, rows + 1)
+    ]
+    return {
+        'cars': CarSerializer(fleet, many=True).data,
+        'reservations': ReservationSerializer(reservations, many=True, context={'expand': {'car'}}).data,
+    }
+
+
+def timed(function, repeat: int):
+    """(résultat, durée médiane en secondes)"""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - started)
+    return result, statistics.median(durations)
+
+
+def benchmark(rows: int = 200, cars: int = 50, repeat: int = 20) -> list:
+    results = []
+    for payload, data in build_payloads(rows, cars).items():
+        for format_name, renderer_class in RENDERERS.items():
+            renderer = renderer_class()
+            body, render_time = timed(lambda: renderer.render(data), repeat)
+            for encoding, encoder_class in ENCODERS.items():
+                compressed, compress_time = body, 0.0
+                if encoder_class is not None:
+                    def compress():
+                        encoder = encoder_class()
+                        return encoder.process(body) + encoder.finish()
+                    compressed, compress_time = timed(compress, repeat)
+                results.append({
+                    'payload': payload,
+                    'format': format_name,
+                    'encoding': encoding,
+                    'bytes': len(compressed),
+                    'render_ms': round(render_time * 1000, 3),
+                    'compress_ms': round(compress_time * 1000, 3),
+                })
+    return results
+
+
+class Command(BaseCommand):
+    help = 'Compare taille et temps d\'encodage des listes (JSON, colonnes, MessagePack ; gzip, brotli)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200, help='Nombre de réservations')
+        parser.add_argument('--cars', type=int, default=50, help='Nombre de véhicules')
+        parser.add_argument('--repeat', type=int, default=20, help='Mesures par combinaison (médiane)')
+        parser.add_argument('--json', action='store_true', help='Résultats au format JSON')
+
+    def handle(self, *args, **options):
+        results = benchmark(options['rows'], options['cars'], options['repeat'])
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        baseline = {
+            item['payload']: item['bytes'] for item in results
+            if item['format'] == 'json' and item['encoding'] == 'identity'
+        }
+        self.stdout.write(
+            f"{'Liste':<14} {'Format':<9} {'Encodage':<9} {'Octets':>9} {'Ratio':>7} {'Rendu':>9} {'Compr.':>9}"
+        )
+        for item in results:
+            self.stdout.write(
+                f"{item['payload']:<14} {item['format']:<9} {item['encoding']:<9} "
+                f"{item['bytes']:>9} {item['bytes'] / baseline[item['payload']]:>6.0%} "
+                f"{item['render_ms']:>7.2f}ms {item['compress_ms']:>7.2f}ms"
+            )
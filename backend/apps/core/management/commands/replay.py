@@ -0,0 +1,65 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cars.models import Car
+from apps.core.replay import TraceReplayer, load_trace
+from apps.reservations.models import Reservation
+
+
+class Command(BaseCommand):
+    help = 'Rejoue une trace enregistrée (TRAFFIC_RECORDER) contre un serveur local'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Fichiers traffic-*.jsonl')
+        parser.add_argument('--base-url', default='http://localhost:8000')
+        parser.add_argument('--speed', type=float, default=1.0, help='Facteur d\'accélération (2 = deux fois plus vite)')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--users',
+            default='kofi,ama,kwame',
+            help='Comptes (seed_data) sur lesquels répartir les acteurs'
+        )
+        parser.add_argument('--password', default='test123')
+        parser.add_argument('--json', action='store_true', help='Rapport au format JSON')
+
+    def handle(self, *args, **options):
+        usernames = [name.strip() for name in options['users'].split(',') if name.strip()]
+        users = list(get_user_model().objects.filter(username__in=usernames).values_list('id', flat=True))
+        if not users:
+            raise CommandError('Aucun des comptes indiqués n\'existe (lancez seed_data).')
+
+        try:
+            records = load_trace(options['paths'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        replayer = TraceReplayer(
+            options['base_url'],
+            credentials=[(name, options['password']) for name in usernames],
+            car_ids=list(Car.objects.order_by('id').values_list('id', flat=True)),
+            reservation_ids=list(
+                Reservation.objects.filter(user_id__in=users).order_by('id').values_list('id', flat=True)
+            ),
+            speed=options['speed'],
+            concurrency=options['concurrency'],
+        )
+        report = replayer.run(records)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{len(records)} requête(s) en {report['elapsed']}s, {report['skipped']} ignorée(s)"
+        )
+        self.stdout.write(
+            f"{'Route':<55} {'N':>6} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err%':>6} {'conf%':>6}"
+        )
+        for route, stats in report['routes'].items():
+            self.stdout.write(
+                f"{route[:55]:<55} {stats['count']:>6} {stats['throughput'] or 0:>8.1f} "
+                f"{stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['p99']:>8.1f} "
+                f"{stats['error_rate'] * 100:>6.1f} {stats['conflict_rate'] * 100:>6.1f}"
+            )
@@ -0,0 +1,64 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from apps.core.startup import by_package, measure_startup
+
+
+class Command(BaseCommand):
+    help = 'Mesure le démarrage à froid : temps d\'import par module et délai jusqu\'à la première requête'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--server',
+            choices=['wsgi', 'asgi', 'both'],
+            default='both'
+        )
+        parser.add_argument(
+            '--path',
+            default='/health/live/',
+            help='Chemin de la première requête'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Nombre de modules affichés (temps cumulé décroissant)'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Rapport complet au format JSON'
+        )
+
+    def handle(self, *args, **options):
+        servers = ['wsgi', 'asgi'] if options['server'] == 'both' else [options['server']]
+        # Imports mesurés sur le premier serveur ; les timings sans -X importtime
+        reports = {server: measure_startup(server, options['path']) for server in servers}
+        imports = measure_startup(servers[0], options['path'], importtime=True)['imports']
+
+        if options['json']:
+            self.stdout.write(json.dumps({'servers': reports, 'imports': imports}, indent=2))
+            return
+
+        self.stdout.write(f"{'Module':<60} {'propre':>9} {'cumulé':>9}")
+        for item in sorted(imports, key=lambda item: item['cumulative'], reverse=True)[:options['top']]:
+            self.stdout.write(
+                f"{item['module'][:60]:<60} {item['self'] * 1000:>7.1f}ms {item['cumulative'] * 1000:>7.1f}ms"
+            )
+
+        self.stdout.write(f"\n{'Paquet':<30} {'propre':>9}")
+        for package, seconds in by_package(imports)[:10]:
+            self.stdout.write(f"{package:<30} {seconds * 1000:>7.1f}ms")
+
+        self.stdout.write('')
+        for server, report in reports.items():
+            self.stdout.write(
+                f"{server.upper()} : chargement {report['load'] * 1000:.0f}ms, "
+                f"première requête {report['first_request'] * 1000:.0f}ms "
+                f"(HTTP {report['status']}), total {report['total'] * 1000:.0f}ms"
+            )
+            if report['lazy_loaded']:
+                self.stdout.write(self.style.WARNING(
+                    f"  Modules chargés au démarrage : {', '.join(report['lazy_loaded'])}"
+                ))
@@ -0,0 +1,213 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, OperationalError, connection
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger('apps.core.slow_queries')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+REPORTING_PREFIXES = ('/api/dashboard/', '/api/reservations/history/', '/calendar/')
+EXEMPT_PREFIXES = ('/health/',)
+
+# Codes PostgreSQL : statement_timeout (57014) et lock_timeout (55P03)
+TIMEOUT_PGCODES = ('57014', '55P03')
+
+
+class DeadlineExceeded(Exception):
+    """Le budget de temps de la requête est épuisé."""
+
+
+def budget_option(request_class: str, name: str):
+    budgets = getattr(settings, 'REQUEST_BUDGETS', {})
+    return budgets.get(request_class, budgets.get('default', {})).get(name)
+
+
+def shedding_option(name: str, request_class: str):
+    return getattr(settings, 'LOAD_SHEDDING', {}).get(name, {}).get(request_class)
+
+
+def request_class(request) -> str:
+    """
+    Classe de la requête :
+    - 'booking' : écritures sur les réservations (prioritaires)
+    - 'reporting' : tableaux de bord, historiques, flux iCalendar
+    - 'default' : le reste
+    """
+    if request.path.startswith('/api/reservations/') and request.method not in SAFE_METHODS:
+        return 'booking'
+    if request.path.startswith(REPORTING_PREFIXES):
+        return 'reporting'
+    return 'default'
+
+
+def is_timeout_error(exc) -> bool:
+    if isinstance(exc, DeadlineExceeded):
+        return True
+    if not isinstance(exc, OperationalError):
+        return False
+    if getattr(exc.__cause__, 'pgcode', None) in TIMEOUT_PGCODES:
+        return True
+    # SQLite : requête interrompue par le progress handler
+    return 'interrupted' in str(exc)
+
+
+def unavailable(message: str, retry_after: int) -> JsonResponse:
+    response = JsonResponse({'error': message}, status=503)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+class QueryBudget:
+    """
+    Execute wrapper appliquant le budget de la requête à la base.
+
+    Au premier accès : statement_timeout / lock_timeout (PostgreSQL) ou
+    busy_timeout et interruption des requêtes au-delà de l'échéance
+    (SQLite). Les réglages passent par la connexion brute pour ne pas
+    ajouter de requête visible ; ils valent pour la session et sont donc
+    rétablis par release() en fin de requête, la connexion pouvant être
+    réutilisée (CONN_MAX_AGE) par d'autres requêtes ou tâches de fond.
+    Les requêtes lentes sont journalisées avec leur plan d'exécution.
+    """
+
+    def __init__(self, deadline: float, lock_timeout: float, slow_query: float):
+        self.deadline = deadline
+        self.lock_timeout = lock_timeout
+        self.slow_query = slow_query
+        self.applied = False
+        self.explaining = False
+        self.db = None
+        self.previous_busy_timeout = None
+
+    def remaining_ms(self) -> int:
+        return max(1, int((self.deadline - time.monotonic()) * 1000))
+
+    def apply(self, db):
+        raw = db.connection
+        timeout = self.remaining_ms()
+        lock_timeout = min(timeout, int(self.lock_timeout * 1000))
+        if db.vendor == 'postgresql':
+            with raw.cursor() as cursor:
+                cursor.execute(
+                    "SELECT set_config('statement_timeout', %s, false), "
+                    "set_config('lock_timeout', %s, false)",
+                    [f'{timeout}ms', f'{lock_timeout}ms']
+                )
+        elif db.vendor == 'sqlite':
+            self.previous_busy_timeout = raw.execute('PRAGMA busy_timeout').fetchone()[0]
+            raw.execute(f'PRAGMA busy_timeout = {lock_timeout}')
+            raw.set_progress_handler(lambda: int(time.monotonic() > self.deadline), 10000)
+        self.db = db
+        self.applied = True
+
+    def release(self):
+        """Rétablit les réglages de session de la connexion."""
+        db, self.db = self.db, None
+        if db is None or db.connection is None:
+            return
+        raw = db.connection
+        try:
+            if db.vendor == 'postgresql':
+                with raw.cursor() as cursor:
+                    cursor.execute('RESET statement_timeout; RESET lock_timeout')
+            elif db.vendor == 'sqlite':
+                raw.set_progress_handler(None, 0)
+                raw.execute(f'PRAGMA busy_timeout = {self.previous_busy_timeout}')
+        except DatabaseError:
+            # Connexion inutilisable (transaction avortée...) : fermée plutôt
+            # que rendue avec l'échéance de cette requête
+            logger.warning("Réglages de session non rétablis, connexion fermée", exc_info=True)
+            db.close()
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            return execute(sql, params, many, context)
+        if time.monotonic() > self.deadline:
+            raise DeadlineExceeded("Budget de temps de la requête épuisé")
+        if not self.applied:
+            self.apply(context['connection'])
+
+        started = time.monotonic()
+        result = execute(sql, params, many, context)
+        duration = time.monotonic() - started
+        if duration >= self.slow_query:
+            self.log_slow_query(context['connection'], sql, params, many, duration)
+        return result
+
+    def log_slow_query(self, db, sql, params, many, duration):
+        plan = ''
+        if not many and sql.lstrip().upper().startswith('SELECT'):
+            prefix = 'EXPLAIN ' if db.vendor == 'postgresql' else 'EXPLAIN QUERY PLAN '
+            self.explaining = True
+            try:
+                with db.cursor() as cursor:
+                    cursor.execute(prefix + sql, params)
+                    plan = '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+            except Exception as e:
+                plan = f"(plan indisponible : {e})"
+            finally:
+                self.explaining = False
+        slow_query_logger.warning(
+            "Requête lente (%.0f ms) : %s\nPlan :\n%s", duration * 1000, sql, plan
+        )
+
+
+class RequestBudgetMiddleware:
+    """
+    Budget de temps et délestage par classe de requête.
+
+    - Délestage (503 + Retry-After) quand le nombre de requêtes en cours
+      dans le processus atteint la limite de la classe. Les workers gunicorn
+      servent plusieurs requêtes à la fois (threads) ; les limites des
+      lectures sont inférieures au nombre de threads, celles des écritures
+      de réservation non : les écritures passent encore quand les lectures
+      sont déjà refusées.
+    - Échéance = budget de la classe ; elle est propagée à la base
+      (QueryBudget) et un dépassement renvoie 503.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.lock = threading.Lock()
+        self.in_flight = 0
+
+    def __call__(self, request):
+        if request.path.startswith(EXEMPT_PREFIXES):
+            return self.get_response(request)
+
+        cls = request_class(request)
+        request.budget_class = cls
+        retry_after = getattr(settings, 'LOAD_SHEDDING', {}).get('RETRY_AFTER', 2)
+
+        max_in_flight = shedding_option('MAX_IN_FLIGHT', cls)
+        with self.lock:
+            if max_in_flight is not None and self.in_flight >= max_in_flight:
+                shed = True
+            else:
+                shed = False
+                self.in_flight += 1
+        if shed:
+            return unavailable("Serveur surchargé, réessayez plus tard.", retry_after)
+
+        budget = QueryBudget(
+            deadline=time.monotonic() + (budget_option(cls, 'TIMEOUT') or 30),
+            lock_timeout=budget_option(cls, 'LOCK_TIMEOUT') or 5,
+            slow_query=getattr(settings, 'SLOW_QUERY_MS', 500) / 1000,
+        )
+        try:
+            with connection.execute_wrapper(budget):
+                return self.get_response(request)
+        finally:
+            budget.release()
+            with self.lock:
+                self.in_flight -= 1
+
+    def process_exception(self, request, exception):
+        if is_timeout_error(exception):
+            logger.warning("Délai dépassé (%s) : %s %s", exception, request.method, request.path)
+            return unavailable("Délai de traitement dépassé, réessayez plus tard.", 1)
+        return None
@@ -0,0 +1,405 @@
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+MODES = ('cprofile', 'sample')
+DUMP_SUFFIXES = {'cprofile': '.prof', 'sample': '.folded'}
+
+DEFAULTS = {
+    'ENABLED': True,
+    'DIRECTORY': None,
+    # Profils par requête conservés (les plus anciens sont supprimés)
+    'MAX_DUMPS': 50,
+    # Période d'échantillonnage d'une requête profilée en mode `sample`
+    'REQUEST_SAMPLE_INTERVAL': 0.001,
+    # Échantillonneur de fond : période par défaut, durée maximale d'activation
+    'SAMPLER_INTERVAL': 0.01,
+    'SAMPLER_MAX_DURATION': 600,
+    # Écriture des piles agrégées de chaque processus, et relecture du fichier de contrôle
+    'SAMPLER_FLUSH_INTERVAL': 5,
+    'CONTROL_CHECK_INTERVAL': 1,
+}
+
+
+def profiling_option(name: str):
+    return getattr(settings, 'PROFILING', {}).get(name, DEFAULTS[name])
+
+
+def profiling_directory() -> Path:
+    return Path(profiling_option('DIRECTORY') or settings.BASE_DIR / 'profiles')
+
+
+def requests_directory() -> Path:
+    return profiling_directory() / 'requests'
+
+
+def sampler_directory() -> Path:
+    return profiling_directory() / 'sampler'
+
+
+def frame_name(frame) -> str:
+    """`module:Classe.méthode` du code exécuté par `frame`."""
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+def fold(frame) -> str:
+    """Pile de `frame`, de la racine à la feuille, au format « folded » (a;b;c)."""
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def write_folded(path: Path, stacks: Counter):
+    """Écrit `pile nombre` par ligne (flamegraph.pl, speedscope) de façon atomique."""
+    temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+    temporary.write_text(
+        ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common()),
+        encoding='utf-8'
+    )
+    os.replace(temporary, path)
+
+
+def read_folded(paths) -> Counter:
+    stacks = Counter()
+    for path in paths:
+        with open(path, encoding='utf-8') as stream:
+            for line in stream:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+    return stacks
+
+
+def staff_user(request):
+    """Utilisateur staff de la requête (session ou jeton JWT), sinon None."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            result = JWTAuthentication().authenticate(request)
+        except APIException:
+            return None
+        user = result[0] if result else None
+    return user if user is not None and user.is_staff else None
+
+
+class StackSampler:
+    """
+    Échantillonne périodiquement, dans un thread séparé, la pile des threads
+    enregistrés et agrège les piles identiques.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.labels = {}
+        self.stacks = Counter()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def watch(self, ident: int, label: str):
+        with self.lock:
+            self.labels[ident] = label
+
+    def unwatch(self, ident: int):
+        with self.lock:
+            self.labels.pop(ident, None)
+
+    def sample(self):
+        frames = sys._current_frames()
+        with self.lock:
+            for ident, label in self.labels.items():
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[f'{label};{fold(frame)}' if label else fold(frame)] += 1
+
+    def snapshot(self) -> Counter:
+        with self.lock:
+            return Counter(self.stacks)
+
+    def tick(self):
+        """Appelé après chaque échantillon (voir BackgroundSampler)."""
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+            self.tick()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='stack-sampler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+
+
+class BackgroundSampler(StackSampler):
+    """
+    Échantillonneur de fond d'un processus : piles des requêtes en cours,
+    préfixées par la vue (`GET:reservation-list;...`), écrites
+    périodiquement dans `sampler/<session>-<pid>.folded`.
+    """
+
+    def __init__(self, session: str, interval: float, until: float):
+        super().__init__(interval)
+        self.session = session
+        self.until = until
+        self.path = sampler_directory() / f'{session}-{os.getpid()}.folded'
+        self.flushed_at = time.monotonic()
+
+    def tick(self):
+        if time.monotonic() - self.flushed_at >= profiling_option('SAMPLER_FLUSH_INTERVAL'):
+            self.flush()
+        if time.time() >= self.until:
+            self.stop_event.set()
+
+    def flush(self):
+        self.flushed_at = time.monotonic()
+        stacks = self.snapshot()
+        if stacks:
+            write_folded(self.path, stacks)
+
+    def run(self):
+        super().run()
+        self.flush()
+
+
+class SamplerControl:
+    """
+    État partagé de l'échantillonneur de fond entre les processus (workers
+    Gunicorn) : fichier `sampler/control.json` relu au plus une fois par
+    CONTROL_CHECK_INTERVAL par chaque processus qui sert des requêtes.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sampler = None
+        self.checked_at = 0.0
+        self.mtime = None
+
+    @staticmethod
+    def path() -> Path:
+        return sampler_directory() / 'control.json'
+
+    @classmethod
+    def read(cls) -> dict:
+        try:
+            return json.loads(cls.path().read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {'enabled': False}
+
+    @classmethod
+    def write(cls, enabled: bool, interval: float = None, duration: float = None) -> dict:
+        """Active (nouvelle session) ou désactive l'échantillonneur de tous les processus."""
+        state = cls.read()
+        if enabled:
+            duration = min(duration or profiling_option('SAMPLER_MAX_DURATION'),
+                           profiling_option('SAMPLER_MAX_DURATION'))
+            state = {
+                'enabled': True,
+                'session': datetime.now(dt_timezone.utc).strftime('%Y%m%dT%H%M%S'),
+                'interval': interval or profiling_option('SAMPLER_INTERVAL'),
+                'until': time.time() + duration,
+            }
+        else:
+            state['enabled'] = False
+        sampler_directory().mkdir(parents=True, exist_ok=True)
+        temporary = cls.path().with_suffix(f'.{os.getpid()}.tmp')
+        temporary.write_text(json.dumps(state), encoding='utf-8')
+        os.replace(temporary, cls.path())
+        return state
+
+    @classmethod
+    def status(cls) -> dict:
+        state = cls.read()
+        if state.get('enabled') and time.time() >= state['until']:
+            state['enabled'] = False
+        return state
+
+    @classmethod
+    def stacks(cls, session: str = None) -> Counter:
+        """Piles agrégées de tous les processus pour la session (la dernière par défaut)."""
+        session = session or cls.read().get('session')
+        if not session:
+            return Counter()
+        return read_folded(sorted(sampler_directory().glob(f'{session}-*.folded')))
+
+    def sync(self):
+        """Démarre ou arrête l'échantillonneur local selon le fichier de contrôle."""
+        now = time.monotonic()
+        if now - self.checked_at < profiling_option('CONTROL_CHECK_INTERVAL'):
+            return self.sampler
+        with self.lock:
+            self.checked_at = now
+            try:
+                mtime = self.path().stat().st_mtime_ns
+            except OSError:
+                mtime = None
+            expired = self.sampler is not None and self.sampler.stop_event.is_set()
+            if mtime == self.mtime and not expired:
+                return self.sampler
+
+            self.mtime = mtime
+            state = self.status()
+            running = self.sampler is not None and not expired
+            if running and state.get('session') == self.sampler.session and state['enabled']:
+                return self.sampler
+            if self.sampler is not None:
+                self.sampler.stop()
+                self.sampler = None
+            if state['enabled']:
+                self.sampler = BackgroundSampler(state['session'], state['interval'], state['until'])
+                self.sampler.start()
+            return self.sampler
+
+
+sampler_control = SamplerControl()
+
+
+def list_dumps() -> list:
+    """Métadonnées des profils par requête, du plus récent au plus ancien."""
+    dumps = []
+    for path in requests_directory().glob('*.json'):
+        try:
+            dumps.append(json.loads(path.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            continue
+    return sorted(dumps, key=lambda dump: dump['created_at'], reverse=True)
+
+
+def dump_path(profile_id: str):
+    """Fichier du profil `profile_id`, ou None."""
+    for suffix in DUMP_SUFFIXES.values():
+        path = requests_directory() / f'{profile_id}{suffix}'
+        if path.exists():
+            return path
+    return None
+
+
+def prune_dumps():
+    for dump in list_dumps()[profiling_option('MAX_DUMPS'):]:
+        for suffix in ('.json', *DUMP_SUFFIXES.values()):
+            (requests_directory() / f"{dump['id']}{suffix}").unlink(missing_ok=True)
+
+
+def stats_text(path: Path, limit: int = 40) -> str:
+    """Résumé pstats d'un profil cProfile (fonctions triées par temps cumulé)."""
+    import io
+    import pstats
+
+    stream = io.StringIO()
+    pstats.Stats(str(path), stream=stream).sort_stats('cumulative').print_stats(limit)
+    return stream.getvalue()
+
+
+class ProfilingMiddleware:
+    """
+    Profilage à la demande, réservé au staff.
+
+    - Requête unique : en-tête `X-Profile: cprofile|sample` (ou paramètre
+      `?_profile=`). `cprofile` produit un fichier pstats (.prof : snakeviz,
+      gprof2dot, flameprof), `sample` des piles échantillonnées au format
+      folded (.folded : flamegraph.pl, speedscope). Le profil est stocké et
+      son adresse renvoyée dans `X-Profile-Url`.
+    - Échantillonneur de fond : activé à chaud via `/api/profiling/sampler/`,
+      piles agrégées par vue pour tous les processus.
+
+    Pour les autres utilisateurs, le drapeau est ignoré.
+    """
+
+    def __init__(self, get_response):
+        if not profiling_option('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    @staticmethod
+    def requested_mode(request):
+        mode = request.headers.get('X-Profile') or request.GET.get('_profile')
+        if not mode:
+            return None
+        mode = mode.lower()
+        return mode if mode in MODES else 'cprofile'
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        sampler = sampler_control.sampler
+        if sampler is not None and request.resolver_match is not None:
+            sampler.watch(threading.get_ident(), f'{request.method}:{request.resolver_match.view_name}')
+        return None
+
+    def __call__(self, request):
+        sampler = sampler_control.sync()
+        mode = self.requested_mode(request)
+        user = staff_user(request) if mode else None
+        try:
+            if user is None:
+                return self.get_response(request)
+            return self.profile(request, mode, user)
+        finally:
+            if sampler is not None:
+                sampler.unwatch(threading.get_ident())
+
+    def profile(self, request, mode, user):
+        profile_id = str(uuid.uuid4())
+        directory = requests_directory()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{profile_id}{DUMP_SUFFIXES[mode]}'
+
+        started = time.perf_counter()
+        if mode == 'cprofile':
+            import cProfile
+
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Un autre outil de profilage est déjà actif sur ce thread
+                return self.get_response(request)
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - started
+            profiler.dump_stats(path)
+        else:
+            sampler = StackSampler(profiling_option('REQUEST_SAMPLE_INTERVAL'))
+            sampler.watch(threading.get_ident(), '')
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                sampler.stop()
+            duration = time.perf_counter() - started
+            write_folded(path, sampler.snapshot())
+
+        match = request.resolver_match
+        metadata = {
+            'id': profile_id,
+            'mode': mode,
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'user_id': user.id,
+            'created_at': datetime.now(dt_timezone.utc).isoformat(),
+        }
+        (directory / f'{profile_id}.json').write_text(json.dumps(metadata), encoding='utf-8')
+        prune_dumps()
+
+        response['X-Profile-Id'] = profile_id
+        response['X-Profile-Url'] = f'/api/profiling/{profile_id}/'
+        return response
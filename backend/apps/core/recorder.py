@@ -0,0 +1,117 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Valeurs jamais enregistrées (identité, secrets, texte libre)
+SENSITIVE_KEYS = {
+    'password', 'token', 'access', 'refresh', 'username', 'email',
+    'first_name', 'last_name', 'phone', 'purpose',
+}
+MAX_BODY_BYTES = 64 * 1024
+
+
+def scrub(data):
+    """Copie de `data` sans les valeurs sensibles (clés conservées)."""
+    if isinstance(data, dict):
+        return {
+            key: None if key in SENSITIVE_KEYS else scrub(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [scrub(item) for item in data]
+    return data
+
+
+def normalize_route(route: str) -> str:
+    """`api/reservations/^(?P<pk>[^/.]+)/cancel/$` -> `api/reservations/<pk>/cancel/`"""
+    route = re.sub(r'\(\?P<(\w+)>[^)]*\)', r'<\1>', route)
+    return route.replace('^', '').replace('$', '')
+
+
+def anonymize_actor(user) -> str:
+    """Identifiant stable mais non réversible de l'utilisateur (ou None)."""
+    if user is None or not user.is_authenticated:
+        return None
+    digest = hashlib.sha256(f"{settings.SECRET_KEY}:{user.pk}".encode())
+    return digest.hexdigest()[:12]
+
+
+class TrafficRecorderMiddleware:
+    """
+    Enregistre des traces anonymisées des requêtes (méthode, route,
+    paramètres, statut, durée) dans un fichier JSON Lines tournant, un
+    fichier par processus. Désactivé sauf si TRAFFIC_RECORDER['ENABLED'].
+
+    Rejouées par `manage.py replay`.
+    """
+
+    def __init__(self, get_response):
+        options = getattr(settings, 'TRAFFIC_RECORDER', {})
+        if not options.get('ENABLED'):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        directory = Path(options.get('DIRECTORY', settings.BASE_DIR / 'traces'))
+        directory.mkdir(parents=True, exist_ok=True)
+
+        handler = RotatingFileHandler(
+            directory / f"traffic-{os.getpid()}.jsonl",
+            maxBytes=options.get('MAX_BYTES', 50 * 1024 * 1024),
+            backupCount=options.get('BACKUP_COUNT', 5),
+            encoding='utf-8',
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self.logger = logging.Logger(f'apps.core.recorder.{os.getpid()}')
+        self.logger.addHandler(handler)
+
+    def read_body(self, request):
+        if request.content_type != 'application/json':
+            return None
+        if int(request.META.get('CONTENT_LENGTH') or 0) > MAX_BODY_BYTES:
+            return None
+        try:
+            return scrub(json.loads(request.body or b'null'))
+        except ValueError:
+            return None
+
+    def __call__(self, request):
+        body = self.read_body(request)
+        started_at = time.time()
+        started = time.monotonic()
+        response = self.get_response(request)
+        duration = time.monotonic() - started
+
+        match = request.resolver_match
+        kwargs = match.kwargs if match else {}
+        path = request.path
+        for key, value in kwargs.items():
+            if key in SENSITIVE_KEYS:
+                path = path.replace(str(value), f'<{key}>')
+
+        record = {
+            'ts': round(started_at, 3),
+            'method': request.method,
+            'route': normalize_route(match.route) if match else None,
+            'path': path,
+            'kwargs': scrub(kwargs),
+            'query': scrub({key: request.GET.getlist(key) for key in request.GET}),
+            'body': body,
+            'actor': anonymize_actor(getattr(request, 'user', None)),
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+        }
+        data = getattr(response, 'data', None)
+        if response.status_code == 201 and isinstance(data, dict) and 'id' in data:
+            record['created_id'] = data['id']
+
+        self.logger.info(json.dumps(record, cls=DjangoJSONEncoder))
+        return response
@@ -0,0 +1,51 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def to_columns(data):
+    """
+    Listes d'objets de mêmes clés -> {"columns": [...], "rows": [[...], ...]},
+    récursivement : chaque clé n'apparaît qu'une fois par liste.
+    """
+    if isinstance(data, dict):
+        return {key: to_columns(value) for key, value in data.items()}
+    if isinstance(data, list):
+        if data and all(isinstance(item, dict) for item in data):
+            columns = list(data[0])
+            if all(len(item) == len(columns) and all(key in item for key in columns) for item in data):
+                return {
+                    'columns': columns,
+                    'rows': [[to_columns(item[key]) for key in columns] for item in data],
+                }
+        return [to_columns(item) for item in data]
+    return data
+
+
+class CompactJSONRenderer(JSONRenderer):
+    """
+    JSON en colonnes (voir `to_columns`) pour les clients mobiles :
+    `Accept: application/vnd.carreservation.columns+json`.
+    """
+    media_type = 'application/vnd.carreservation.columns+json'
+    format = 'columns'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(to_columns(data), accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack (`Accept: application/msgpack`). Dates, décimaux et UUID
+    sont convertis comme en JSON ; msgpack n'est importé qu'au premier rendu.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import msgpack
+
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True)
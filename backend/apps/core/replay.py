@@ -0,0 +1,255 @@
+import json
+import math
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import cycle
+
+LOGIN_ROUTE = 'api/auth/login/'
+SKIPPED_ROUTES = {'api/auth/refresh/'}
+DATE_KEYS = {'start_after', 'end_before', 'after', 'date_from', 'date_to'}
+
+
+def load_trace(paths):
+    """Enregistrements de plusieurs fichiers JSONL, triés par horodatage."""
+    records = []
+    for path in paths:
+        with open(path, encoding='utf-8') as stream:
+            records.extend(json.loads(line) for line in stream if line.strip())
+    return sorted(records, key=lambda record: record['ts'])
+
+
+def percentile(values, rank):
+    """Percentile au rang le plus proche d'une liste triée."""
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, math.ceil(rank / 100 * len(values)) - 1))
+    return values[index]
+
+
+def is_date_key(key):
+    return key in DATE_KEYS or key.endswith('_date')
+
+
+def shift_dates(data, delta):
+    """Décale de `delta` les dates ISO des paramètres (la trace est dans le passé)."""
+    if isinstance(data, dict):
+        return {
+            key: shift_value(value, delta) if is_date_key(key) else shift_dates(value, delta)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [shift_dates(item, delta) for item in data]
+    return data
+
+
+def shift_value(value, delta):
+    if isinstance(value, list):
+        return [shift_value(item, delta) for item in value]
+    if not isinstance(value, str):
+        return value
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return value
+    return (parsed + delta).isoformat()
+
+
+def http_send(base_url, method, path, query, body, token, timeout=30):
+    """Envoie une requête ; retourne (statut, corps)."""
+    url = base_url.rstrip('/') + path
+    if query:
+        url += '?' + urllib.parse.urlencode(query, doseq=True)
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method)
+    if data is not None:
+        request.add_header('Content-Type', 'application/json')
+    if token:
+        request.add_header('Authorization', f'Bearer {token}')
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+class TraceReplayer:
+    """
+    Rejoue une trace du TrafficRecorderMiddleware contre un serveur.
+
+    - Les requêtes partent à leur instant d'origine divisé par `speed`
+      (boucle ouverte) ; la latence est mesurée depuis cet instant prévu,
+      file d'attente côté client comprise.
+    - Les acteurs anonymisés sont répartis sur les comptes `credentials`,
+      les identifiants de véhicules sur `car_ids`, ceux des réservations
+      sur les réservations créées pendant le rejeu (ou `reservation_ids`).
+    - Les dates sont décalées de l'écart entre la trace et le rejeu.
+    """
+
+    def __init__(self, base_url, credentials, car_ids, reservation_ids=(),
+                 speed=1.0, concurrency=8, send=http_send):
+        self.base_url = base_url
+        self.credentials = list(credentials)
+        self.speed = speed
+        self.concurrency = concurrency
+        self.send = send
+        self._lock = threading.Lock()
+        self._car_pool = cycle(car_ids) if car_ids else None
+        self._reservation_pool = cycle(reservation_ids) if reservation_ids else None
+        self._credential_pool = cycle(self.credentials)
+        self._cars = {}
+        self._reservations = {}
+        self._actors = {}
+        self._tokens = {}
+
+    def credential_for(self, actor):
+        with self._lock:
+            if actor not in self._actors:
+                self._actors[actor] = next(self._credential_pool)
+            return self._actors[actor]
+
+    def token_for(self, actor, expired=None):
+        """
+        Jeton d'accès du compte associé à `actor`. `expired` : jeton refusé
+        par le serveur (401), remplacé par une nouvelle connexion.
+        """
+        if actor is None:
+            return None
+        username, password = self.credential_for(actor)
+        with self._lock:
+            if expired is not None and self._tokens.get(username) == expired:
+                del self._tokens[username]
+        if username not in self._tokens:
+            status, body = self.send(
+                self.base_url, 'POST', '/' + LOGIN_ROUTE, None,
+                {'username': username, 'password': password}, None
+            )
+            self._tokens[username] = json.loads(body)['access'] if status == 200 else None
+        return self._tokens[username]
+
+    def map_id(self, mapping, pool, recorded):
+        with self._lock:
+            if recorded not in mapping and pool is not None:
+                mapping[recorded] = next(pool)
+            return mapping.get(recorded, recorded)
+
+    def map_car(self, recorded):
+        return self.map_id(self._cars, self._car_pool, str(recorded))
+
+    def map_reservation(self, recorded):
+        return self.map_id(self._reservations, self._reservation_pool, str(recorded))
+
+    def remap_params(self, data):
+        if not isinstance(data, dict):
+            return data
+        remapped = dict(data)
+        for key in ('car_id', 'car'):
+            if key in remapped and remapped[key] is not None:
+                value = remapped[key]
+                if isinstance(value, list):
+                    remapped[key] = [self.map_car(item) for item in value]
+                else:
+                    remapped[key] = int(self.map_car(value))
+        return remapped
+
+    def build(self, record, delta):
+        """(méthode, chemin, query, corps) à envoyer, ou None si non rejouable."""
+        route = record.get('route') or ''
+        if route in SKIPPED_ROUTES or None in record.get('kwargs', {}).values():
+            return None
+
+        path = record['path']
+        for key, value in record.get('kwargs', {}).items():
+            if route.startswith('api/cars/'):
+                mapped = self.map_car(value)
+            elif route.startswith('api/reservations/'):
+                mapped = self.map_reservation(value)
+            else:
+                continue
+            path = '/'.join(str(mapped) if part == str(value) else part for part in path.split('/'))
+
+        query = shift_dates(self.remap_params(record.get('query') or {}), delta)
+        body = shift_dates(self.remap_params(record.get('body')), delta)
+        if route == LOGIN_ROUTE:
+            username, password = self.credential_for(record.get('actor') or path)
+            body = {'username': username, 'password': password}
+        return record['method'], path, query, body
+
+    def execute(self, record, request, due):
+        method, path, query, body = request
+        try:
+            token = self.token_for(record.get('actor'))
+            status, content = self.send(self.base_url, method, path, query, body, token)
+            if status == 401 and token:
+                # Jeton expiré pendant un long rejeu : reconnexion, puis nouvel envoi
+                token = self.token_for(record.get('actor'), expired=token)
+                status, content = self.send(self.base_url, method, path, query, body, token)
+        except Exception as e:
+            status, content = None, str(e).encode()
+        latency = time.monotonic() - due
+
+        if status == 201 and 'created_id' in record and path.startswith('/api/reservations/'):
+            try:
+                with self._lock:
+                    self._reservations[str(record['created_id'])] = json.loads(content)['id']
+            except (ValueError, KeyError, TypeError):
+                pass
+        return {
+            'route': f"{method} {record.get('route')}",
+            'status': status,
+            'latency': latency,
+            'conflict': status == 409 or (status == 400 and 'Conflit' in content.decode('utf-8', 'replace')),
+        }
+
+    def run(self, records):
+        """Rejoue `records` ; retourne le rapport (voir `report`)."""
+        if not records:
+            return self.report([], 0, 0)
+
+        # Connexions préalables : le coût du login n'entre pas dans les latences
+        for actor in dict.fromkeys(record.get('actor') for record in records):
+            self.token_for(actor)
+
+        origin = records[0]['ts']
+        delta = timedelta(seconds=time.time() - origin)
+        start = time.monotonic()
+        futures, skipped = [], 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for record in records:
+                request = self.build(record, delta)
+                if request is None:
+                    skipped += 1
+                    continue
+                due = start + (record['ts'] - origin) / self.speed
+                time.sleep(max(0.0, due - time.monotonic()))
+                futures.append(executor.submit(self.execute, record, request, due))
+        results = [future.result() for future in futures]
+        return self.report(results, time.monotonic() - start, skipped)
+
+    @staticmethod
+    def report(results, elapsed, skipped):
+        """Débit, percentiles de latence (ms), taux d'erreur et de conflit par route."""
+        by_route = defaultdict(list)
+        for result in results:
+            by_route[result['route']].append(result)
+            by_route['TOTAL'].append(result)
+
+        routes = {}
+        for route, items in sorted(by_route.items()):
+            latencies = sorted(item['latency'] * 1000 for item in items)
+            errors = sum(1 for item in items if item['status'] is None or item['status'] >= 500)
+            routes[route] = {
+                'count': len(items),
+                'throughput': round(len(items) / elapsed, 2) if elapsed else None,
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'error_rate': round(errors / len(items), 4),
+                'conflict_rate': round(sum(item['conflict'] for item in items) / len(items), 4),
+            }
+        return {'elapsed': round(elapsed, 3), 'skipped': skipped, 'routes': routes}
@@ -0,0 +1,77 @@
+from rest_framework import serializers
+
+
+def parse_csv_param(request, name):
+    """Valeurs d'un paramètre de requête `a,b,c` (ensemble vide si absent)."""
+    if request is None:
+        return set()
+    value = request.query_params.get(name, '')
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class DynamicFieldsMixin:
+    """
+    Champs à la demande pour un ModelSerializer.
+
+    - `?fields=id,start_date` : ne renvoie que ces champs.
+    - `?expand=car,user` : inclut les champs imbriqués déclarés dans
+      `Meta.expandable_fields` (nom d'expansion -> nom du champ), absents
+      par défaut.
+
+    `Meta.field_dependencies` indique les colonnes nécessaires aux champs
+    calculés (ex. `status_display` -> `status`) pour `optimize_queryset`.
+
+    Seul le serializer racine lit les paramètres de la requête : les
+    serializers imbriqués renvoient tous leurs champs. Les clés `fields` /
+    `expand` du contexte, si présentes, remplacent les paramètres.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None and not {'fields', 'expand'} & set(self.context):
+            return
+
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        expand = self.context.get('expand', parse_csv_param(request, 'expand'))
+        for name, field_name in expandable.items():
+            if name not in expand:
+                self.fields.pop(field_name, None)
+
+        requested = self.context.get('fields', parse_csv_param(request, 'fields'))
+        if requested:
+            expanded = {expandable[name] for name in expand if name in expandable}
+            for field_name in set(self.fields) - requested - expanded:
+                self.fields.pop(field_name)
+
+    @classmethod
+    def optimize_queryset(cls, queryset, request):
+        """
+        Adapte le queryset aux champs demandés : select_related uniquement
+        pour les relations développées, only() quand `fields` est fourni.
+        """
+        expandable = getattr(cls.Meta, 'expandable_fields', {})
+        related = sorted(parse_csv_param(request, 'expand') & set(expandable))
+        if related:
+            queryset = queryset.select_related(*related)
+
+        requested = parse_csv_param(request, 'fields')
+        if not requested:
+            return queryset
+
+        dependencies = getattr(cls.Meta, 'field_dependencies', {})
+        model_fields = {field.name for field in cls.Meta.model._meta.concrete_fields}
+        columns = {'id', *related}
+        for field_name in requested:
+            if field_name in model_fields:
+                columns.add(field_name)
+            columns.update(dependencies.get(field_name, []))
+
+        return queryset.only(*sorted(columns))
+
+
+class SamplerToggleSerializer(serializers.Serializer):
+    """Activation de l'échantillonneur de fond (durée plafonnée par SAMPLER_MAX_DURATION)."""
+    enabled = serializers.BooleanField()
+    interval = serializers.FloatField(required=False, min_value=0.001, max_value=1)
+    duration = serializers.IntegerField(required=False, min_value=1)
@@ -0,0 +1,142 @@
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+
+# Modules des outils et sous-systèmes optionnels : importés à la première
+# utilisation, jamais au démarrage d'un worker
+LAZY_MODULES = [
+    'apps.core.replay',
+    'apps.core.startup',
+    'brotli',
+    'cProfile',
+    'msgpack',
+    'pstats',
+]
+
+# Exécuté dans un processus neuf : démarrage de l'application puis première
+# requête, sans le client de test (qui importerait des modules en plus)
+BOOTSTRAP = r'''
+import asyncio, io, json, os, sys, time
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+server, path, lazy = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+
+if server == 'wsgi':
+    from config.wsgi import application
+    loaded = time.perf_counter()
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True, 'wsgi.multiprocess': True, 'wsgi.run_once': False,
+        'wsgi.version': (1, 0),
+    }
+    statuses = []
+    b''.join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+    status = int(statuses[0].split()[0])
+else:
+    from config.asgi import application
+    loaded = time.perf_counter()
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'root_path': '', 'query_string': b'', 'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+    }
+    messages = []
+
+    async def main():
+        requested = False
+        done = asyncio.Event()
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # Le client se déconnecte une fois la réponse reçue
+            await done.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            messages.append(message)
+            if message['type'] == 'http.response.body' and not message.get('more_body'):
+                done.set()
+
+        await application(scope, receive, send)
+
+    asyncio.run(main())
+    status = messages[0]['status']
+
+finished = time.perf_counter()
+print(json.dumps({
+    'load': loaded - started,
+    'first_request': finished - loaded,
+    'total': finished - started,
+    'status': status,
+    'lazy_loaded': [name for name in lazy if name in sys.modules],
+}))
+'''
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Lignes `import time: self | cumulé | module` de `-X importtime`.
+
+    Returns:
+        Liste de dicts {module, self, cumulative, depth} (secondes)
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports.append({
+            'module': name.strip(),
+            'self': int(self_us) / 1e6,
+            'cumulative': int(cumulative_us) / 1e6,
+            'depth': (len(name) - len(name.lstrip())) // 2,
+        })
+    return imports
+
+
+def by_package(imports: list) -> list:
+    """Temps propre cumulé par paquet de premier niveau, décroissant."""
+    totals = defaultdict(float)
+    for item in imports:
+        totals[item['module'].split('.')[0]] += item['self']
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def measure_startup(server: str = 'wsgi', path: str = '/health/live/', importtime: bool = False) -> dict:
+    """
+    Démarre l'application WSGI ou ASGI dans un processus neuf et sert une
+    première requête.
+
+    Returns:
+        {load, first_request, total (secondes), status, lazy_loaded} et,
+        avec `importtime`, `imports` (voir parse_importtime)
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', BOOTSTRAP, server, path, json.dumps(LAZY_MODULES)]
+
+    result = subprocess.run(
+        command,
+        cwd=Path(settings.BASE_DIR),
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Échec du démarrage ({server}) :\n{result.stderr[-2000:]}")
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    if importtime:
+        report['imports'] = parse_importtime(result.stderr)
+    return report
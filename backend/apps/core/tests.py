@@ -0,0 +1,651 @@
+from rest_framework.test import APIClient
+from django.test import RequestFactory, TestCase, override_settings
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from datetime import datetime, timedelta
+import glob
+import gzip
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+import brotli
+import msgpack
+
+from apps.cars.models import CarStatus, Car
+from apps.core.compression import CompressionMiddleware
+from apps.core.middleware import QueryBudget, RequestBudgetMiddleware
+from apps.core.profiling import sampler_control
+from apps.core.recorder import TrafficRecorderMiddleware
+from apps.core.replay import TraceReplayer, load_trace, percentile
+from apps.core.startup import measure_startup, parse_importtime
+from apps.core.throttling import CacheBucketStore, LocalBucketStore, get_bucket_store
+from apps.reservations.models import Reservation
+from apps.reservations.services import DashboardService
+
+User = get_user_model()
+
+
+class TokenBucketTestCase(TestCase):
+    """Tests du seau de jetons."""
+
+    def test_bucket_refills_over_time(self):
+        """Test: capacité épuisée puis remplissage progressif."""
+        store = LocalBucketStore()
+
+        self.assertEqual(store.consume('k', 2, 1.0, now=100.0), (True, 0))
+        self.assertEqual(store.consume('k', 2, 1.0, now=100.0), (True, 0))
+        allowed, wait = store.consume('k', 2, 1.0, now=100.5)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 0.5)
+        self.assertTrue(store.consume('k', 2, 1.0, now=101.0)[0])
+
+    def test_cache_store_sliding_window(self):
+        """Test: limite partagée par compteurs atomiques, fermée sous la rafale."""
+        store = CacheBucketStore()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        # Fenêtres de 3 s pour 3 requêtes
+        for _ in range(3):
+            self.assertEqual(store.consume('c', 3, 1.0, now=300.0), (True, 0))
+        allowed, wait = store.consume('c', 3, 1.0, now=301.0)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 2.0)
+
+        # Début de la fenêtre suivante : la précédente (4 requêtes) pèse encore
+        self.assertFalse(store.consume('c', 3, 1.0, now=303.0)[0])
+        # Aux trois quarts, elle ne compte plus que pour une requête
+        self.assertTrue(store.consume('c', 3, 1.0, now=305.25)[0])
+
+    def test_cache_store_fails_closed_when_cache_is_busy(self):
+        """Test: pas de laisser-passer quand le compteur est très sollicité."""
+        store = CacheBucketStore()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        results = [store.consume('busy', 5, 5.0, now=500.0)[0] for _ in range(50)]
+
+        self.assertEqual(results.count(True), 5)
+
+
+class BookingThrottleTestCase(TestCase):
+    """Tests de la limitation des endpoints de réservation."""
+
+    def setUp(self):
+        get_bucket_store().reset()
+        self.addCleanup(get_bucket_store().reset)
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='hammer',
+            email='hammer@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.car = Car.objects.create(
+            registration_number='THR-001',
+            brand='Toyota',
+            model='Hilux',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+
+    @override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'booking_user': '2/min'},
+    })
+    def test_booking_throttled_with_retry_after(self):
+        """Test: 429 et Retry-After une fois le seau vide."""
+        start = timezone.now() + timedelta(days=1)
+        for day in range(2):
+            response = self.client.post('/api/reservations/', {
+                'car_id': self.car.id,
+                'start_date': (start + timedelta(days=day)).isoformat(),
+                'end_date': (start + timedelta(days=day, hours=1)).isoformat(),
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+
+        response = self.client.post('/api/reservations/', {
+            'car_id': self.car.id,
+            'start_date': (start + timedelta(days=5)).isoformat(),
+            'end_date': (start + timedelta(days=5, hours=1)).isoformat(),
+        }, format='json')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+
+    @override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'booking_user': '2/min', 'booking_car': '3/min'},
+    })
+    def test_rejected_requests_do_not_drain_shared_buckets(self):
+        """Test: un client qui insiste n'épuise pas le seau du véhicule pour les autres."""
+        start = timezone.now() + timedelta(days=1)
+
+        def book(client, day):
+            return client.post('/api/reservations/', {
+                'car_id': self.car.id,
+                'start_date': (start + timedelta(days=day)).isoformat(),
+                'end_date': (start + timedelta(days=day, hours=1)).isoformat(),
+            }, format='json')
+
+        statuses = [book(self.client, day).status_code for day in range(6)]
+        self.assertEqual(statuses, [201, 201, 429, 429, 429, 429])
+
+        other = APIClient()
+        other.force_authenticate(user=User.objects.create_user(
+            username='patient', email='patient@example.com', password='testpass123'
+        ))
+        self.assertEqual(book(other, 10).status_code, 201)
+
+    @override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'availability_car': '1/min'},
+    })
+    def test_availability_throttled_per_car(self):
+        """Test: seau par véhicule sur /availability/."""
+        url = f'/api/cars/{self.car.id}/availability/'
+        params = {
+            'start_date': (timezone.now() + timedelta(days=1)).isoformat(),
+            'end_date': (timezone.now() + timedelta(days=2)).isoformat(),
+        }
+        self.assertEqual(self.client.get(url, params).status_code, 200)
+        self.assertEqual(self.client.get(url, params).status_code, 429)
+        # La liste n'est pas concernée
+        self.assertEqual(self.client.get('/api/cars/').status_code, 200)
+
+
+class HealthCheckTestCase(TestCase):
+    """Tests des sondes de santé."""
+
+    def test_liveness(self):
+        """Test: la sonde de vie répond sans authentification"""
+        response = self.client.get('/health/live/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok'})
+
+    def test_readiness(self):
+        """Test: prêt quand la base répond et les migrations sont appliquées"""
+        response = self.client.get('/health/ready/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_readiness_database_down(self):
+        """Test: 503 si la base est injoignable"""
+        with mock.patch(
+            'apps.core.views.connection.cursor', side_effect=OperationalError('connexion refusée')
+        ):
+            response = self.client.get('/health/ready/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['status'], 'database unavailable')
+
+
+class RequestBudgetTestCase(TestCase):
+    """Tests du budget de temps et du délestage."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    @override_settings(LOAD_SHEDDING={
+        'MAX_IN_FLIGHT': {'booking': 1, 'default': 1, 'reporting': 0},
+        'RETRY_AFTER': 3,
+    })
+    def test_reporting_shed_before_booking(self):
+        """Test: les lectures de reporting sont délestées avant les écritures"""
+        response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '3')
+
+        response = self.client.post('/api/reservations/', {}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(LOAD_SHEDDING={'MAX_IN_FLIGHT': {'booking': 2, 'default': 1, 'reporting': 1}})
+    def test_concurrent_requests_counted(self):
+        """Test: une lecture est refusée pendant qu'une autre est en cours, pas une écriture"""
+        factory = RequestFactory()
+        inner = {}
+
+        def view(request):
+            # Requêtes arrivant pendant que celle-ci occupe un thread
+            if request.method == 'GET' and not inner:
+                inner['read'] = middleware(factory.get('/api/cars/')).status_code
+                inner['booking'] = middleware(factory.post('/api/reservations/')).status_code
+            return HttpResponse('ok')
+
+        middleware = RequestBudgetMiddleware(view)
+        self.assertEqual(middleware(factory.get('/api/cars/')).status_code, 200)
+        self.assertEqual(inner, {'read': 503, 'booking': 200})
+        self.assertEqual(middleware.in_flight, 0)
+
+    @override_settings(LOAD_SHEDDING={'MAX_IN_FLIGHT': {'booking': 0, 'default': 0, 'reporting': 0}})
+    def test_health_not_shed(self):
+        """Test: les sondes de santé ne sont jamais délestées"""
+        self.assertEqual(self.client.get('/health/live/').status_code, 200)
+
+    @override_settings(REQUEST_BUDGETS={'default': {'TIMEOUT': 0.000001, 'LOCK_TIMEOUT': 1}})
+    def test_deadline_exceeded(self):
+        """Test: budget épuisé avant une requête SQL → 503"""
+        with self.assertLogs('apps.core.middleware', 'WARNING'):
+            response = self.client.get('/api/cars/')
+        self.assertEqual(response.status_code, 503)
+
+    def test_budget_applied_to_database(self):
+        """Test: busy_timeout SQLite réglé sur le LOCK_TIMEOUT de la classe"""
+        budget = QueryBudget(deadline=time.monotonic() + 5, lock_timeout=1, slow_query=10)
+        with connection.execute_wrapper(budget), connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 1000)
+        budget.release()
+
+    def test_budget_does_not_outlive_request(self):
+        """Test: la connexion réutilisée retrouve ses réglages après la requête"""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            before = cursor.fetchone()[0]
+
+        self.client.get('/api/cars/')
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], before)
+        self.assertNotEqual(before, settings.REQUEST_BUDGETS['default']['LOCK_TIMEOUT'] * 1000)
+        # Plus d'interruption à l'échéance de la requête terminée
+        self.assertEqual(Car.objects.count(), 0)
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_query_logged_with_plan(self):
+        """Test: requête lente journalisée avec son plan"""
+        Car.objects.create(
+            registration_number='SLW-001', brand='Toyota', model='Hilux',
+            year=2023, status=CarStatus.AVAILABLE
+        )
+        with self.assertLogs('apps.core.slow_queries', 'WARNING') as logs:
+            self.client.get('/api/cars/')
+        self.assertIn('Plan', logs.output[0])
+        self.assertIn('cars', logs.output[0])
+
+
+class TrafficReplayTestCase(TestCase):
+    """Tests de l'enregistrement et du rejeu du trafic."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.car = Car.objects.create(
+            registration_number='RPL-001', brand='Toyota', model='Hilux',
+            year=2023, status=CarStatus.AVAILABLE
+        )
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def record(self):
+        with override_settings(TRAFFIC_RECORDER={'ENABLED': True, 'DIRECTORY': self.directory}):
+            client = APIClient()
+            client.force_authenticate(user=self.user)
+            start = timezone.now() + timedelta(days=1)
+            client.post('/api/reservations/', {
+                'car_id': self.car.id,
+                'start_date': start.isoformat(),
+                'end_date': (start + timedelta(hours=2)).isoformat(),
+                'purpose': 'Mission confidentielle',
+            }, format='json')
+            reservation_id = Reservation.objects.get().id
+            client.post(f'/api/reservations/{reservation_id}/cancel/')
+            client.get(f'/api/cars/{self.car.id}/availability/', {
+                'start_date': start.isoformat(), 'end_date': (start + timedelta(hours=1)).isoformat()
+            })
+        return load_trace(glob.glob(os.path.join(self.directory, 'traffic-*.jsonl')))
+
+    def test_recorder_writes_anonymized_trace(self):
+        """Test: trace JSONL sans identité ni texte libre"""
+        records = self.record()
+
+        self.assertEqual(len(records), 3)
+        create, cancel, availability = records
+        self.assertEqual(create['route'], 'api/reservations/')
+        self.assertEqual(create['status'], 201)
+        self.assertIsNone(create['body']['purpose'])
+        self.assertIn('created_id', create)
+        self.assertNotEqual(create['actor'], str(self.user.id))
+        self.assertEqual(cancel['route'], 'api/reservations/<pk>/cancel/')
+        self.assertEqual(availability['kwargs'], {'pk': str(self.car.id)})
+
+    def test_recorder_disabled_by_default(self):
+        """Test: middleware retiré de la chaîne sans activation"""
+        with override_settings(TRAFFIC_RECORDER={'ENABLED': False, 'DIRECTORY': self.directory}):
+            with self.assertRaises(MiddlewareNotUsed):
+                TrafficRecorderMiddleware(lambda request: None)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_replay_remaps_ids_and_reports(self):
+        """Test: identifiants remappés, dates décalées, rapport par route"""
+        records = self.record()
+        sent = []
+
+        def fake_send(base_url, method, path, query, body, token):
+            sent.append((method, path, query, body))
+            if path == '/api/auth/login/':
+                return 200, b'{"access": "jeton"}'
+            if method == 'POST' and path == '/api/reservations/':
+                return 201, b'{"id": 900}'
+            return 409 if path.endswith('/cancel/') else 200, b'{}'
+
+        replayer = TraceReplayer(
+            'http://testserver', credentials=[('kofi', 'test123')], car_ids=[42],
+            speed=1000, concurrency=2, send=fake_send
+        )
+        report = replayer.run(records)
+
+        paths = [path for _, path, _, _ in sent]
+        self.assertIn('/api/reservations/900/cancel/', paths)
+        self.assertIn('/api/cars/42/availability/', paths)
+        create_body = next(body for method, path, _, body in sent if path == '/api/reservations/')
+        self.assertEqual(create_body['car_id'], 42)
+        self.assertGreater(
+            datetime.fromisoformat(create_body['start_date']),
+            timezone.now()
+        )
+        self.assertEqual(report['routes']['TOTAL']['count'], 3)
+        self.assertEqual(report['routes']['POST api/reservations/<pk>/cancel/']['conflict_rate'], 1.0)
+
+    def test_replay_logs_in_again_on_expired_token(self):
+        """Test: un 401 en cours de rejeu déclenche une nouvelle connexion"""
+        records = self.record()
+        logins = []
+        sent = []
+
+        def fake_send(base_url, method, path, query, body, token):
+            if path == '/api/auth/login/':
+                logins.append(body['username'])
+                return 200, json.dumps({'access': f'jeton-{len(logins)}'}).encode()
+            sent.append((path, token))
+            if token == 'jeton-1' and path.endswith('/availability/'):
+                return 401, b'{}'
+            return 200, b'{}'
+
+        replayer = TraceReplayer(
+            'http://testserver', credentials=[('kofi', 'test123')], car_ids=[42],
+            speed=1000, concurrency=1, send=fake_send
+        )
+        report = replayer.run(records)
+
+        self.assertEqual(logins, ['kofi', 'kofi'])
+        self.assertEqual(sent[-1], ('/api/cars/42/availability/', 'jeton-2'))
+        self.assertEqual(report['routes']['TOTAL']['error_rate'], 0)
+
+    def test_percentile_nearest_rank(self):
+        """Test: percentile au rang le plus proche (ceil(p/100 * n))"""
+        self.assertEqual(percentile([10, 20], 50), 10)
+        self.assertEqual(percentile([10, 20, 30, 40], 50), 20)
+        self.assertEqual(percentile(list(range(1, 101)), 95), 95)
+        self.assertEqual(percentile(list(range(1, 101)), 100), 100)
+        self.assertIsNone(percentile([], 50))
+
+
+class StartupBudgetTestCase(TestCase):
+    """Tests du démarrage à froid (processus neuf)."""
+
+    def test_cold_start_within_budget(self):
+        """Test: chargement + première requête sous le budget, modules optionnels non chargés"""
+        for server in ('wsgi', 'asgi'):
+            with self.subTest(server=server):
+                report = measure_startup(server)
+                self.assertEqual(report['status'], 200)
+                self.assertLess(report['total'], settings.STARTUP_BUDGET_SECONDS)
+                self.assertEqual(report['lazy_loaded'], [])
+
+    def test_parse_importtime(self):
+        """Test: lecture de la sortie de -X importtime"""
+        imports = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   apps.core.views\n"
+            "import time:      1500 |       1620 | config.urls\n"
+        )
+        self.assertEqual([item['module'] for item in imports], ['apps.core.views', 'config.urls'])
+        self.assertEqual(imports[0]['depth'], 1)
+        self.assertAlmostEqual(imports[1]['cumulative'], 0.00162)
+
+
+class ResponseEncodingTestCase(TestCase):
+    """Tests des formats compacts et de la compression des réponses."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        for i in range(20):
+            Car.objects.create(
+                registration_number=f'ENC-{i:03d}', brand='Toyota', model='Corolla',
+                year=2023, status=CarStatus.AVAILABLE
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_msgpack_and_columns_negotiation(self):
+        """Test: même contenu en JSON, MessagePack et colonnes selon Accept"""
+        expected = self.client.get('/api/cars/').json()
+
+        response = self.client.get('/api/cars/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), expected)
+
+        response = self.client.get('/api/cars/', HTTP_ACCEPT='application/vnd.carreservation.columns+json')
+        table = json.loads(response.content)
+        self.assertEqual(table['columns'], list(expected[0]))
+        self.assertEqual([dict(zip(table['columns'], row)) for row in table['rows']], expected)
+
+    def test_compression_follows_accept_encoding(self):
+        """Test: brotli préféré, gzip sinon, Vary toujours présent"""
+        expected = self.client.get('/api/cars/').content
+
+        response = self.client.get('/api/cars/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), expected)
+
+        response = self.client.get('/api/cars/', HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), expected)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_small_and_excluded_responses_not_compressed(self):
+        """Test: pas de compression sous le seuil ni sur l'authentification"""
+        with override_settings(RESPONSE_COMPRESSION={'MIN_SIZE': 10 ** 6}):
+            response = self.client.get('/api/cars/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        response = APIClient().post('/api/auth/login/', {
+            'username': 'testuser', 'password': 'testpass123'
+        }, format='json', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_response_compressed_per_chunk(self):
+        """Test: chaque morceau du flux est émis compressé, ETag affaiblie"""
+        chunks = [b'{"ligne": %d}\n' % i * 50 for i in range(3)]
+
+        def view(request):
+            response = StreamingHttpResponse(iter(chunks), content_type='application/json')
+            response['ETag'] = '"abc"'
+            return response
+
+        request = RequestFactory().get('/api/export/', HTTP_ACCEPT_ENCODING='gzip')
+        response = CompressionMiddleware(view)(request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+        received = list(response.streaming_content)
+        # Un morceau compressé par morceau source, puis la fin du flux
+        self.assertEqual(len(received), len(chunks) + 1)
+        self.assertEqual(gzip.decompress(b''.join(received)), b''.join(chunks))
+
+    def test_incompressible_type_untouched(self):
+        """Test: types hors liste (images) transmis tels quels"""
+        request = RequestFactory().get('/media/car.png', HTTP_ACCEPT_ENCODING='gzip')
+        response = CompressionMiddleware(
+            lambda request: HttpResponse(b'x' * 5000, content_type='image/png')
+        )(request)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_html_pages_not_compressed(self):
+        """Test: pages HTML avec jeton CSRF (admin, API navigable) jamais compressées"""
+        response = self.client.get('/admin/login/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        response = self.client.get('/api/cars/', HTTP_ACCEPT='text/html', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_encoding_benchmark_command(self):
+        """Test: rapport de taille par format et encodage"""
+        out = StringIO()
+        call_command('encoding_benchmark', rows=5, cars=2, repeat=1, json=True, stdout=out)
+        results = json.loads(out.getvalue())
+
+        self.assertEqual(len(results), 2 * 3 * 3)
+        sizes = {(r['payload'], r['format'], r['encoding']): r['bytes'] for r in results}
+        self.assertLess(sizes[('reservations', 'json', 'gzip')], sizes[('reservations', 'json', 'identity')])
+        self.assertLess(sizes[('reservations', 'columns', 'identity')], sizes[('reservations', 'json', 'identity')])
+
+
+class ProfilingTestCase(TestCase):
+    """Tests du profilage à la demande (staff)."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='admin', email='admin@example.com', password='adminpass123', is_staff=True
+        )
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123'
+        )
+        Car.objects.create(
+            registration_number='PRF-001', brand='Toyota', model='Hilux',
+            year=2023, status=CarStatus.AVAILABLE
+        )
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        settings_override = override_settings(PROFILING={
+            'DIRECTORY': self.directory, 'CONTROL_CHECK_INTERVAL': 0, 'SAMPLER_FLUSH_INTERVAL': 0,
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(self.stop_sampler)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.staff)
+
+    def stop_sampler(self):
+        if sampler_control.sampler is not None:
+            sampler_control.sampler.stop()
+            sampler_control.sampler = None
+        sampler_control.mtime = None
+
+    def login(self, username, password):
+        """Client authentifié par jeton JWT, comme le frontend."""
+        client = APIClient()
+        token = client.post('/api/auth/login/', {
+            'username': username, 'password': password
+        }, format='json').json()['access']
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def test_cprofile_dump_for_staff(self):
+        """Test: profil cProfile stocké, listé et téléchargeable"""
+        client = self.login('admin', 'adminpass123')
+        response = client.get('/api/cars/', HTTP_X_PROFILE='cprofile')
+
+        self.assertEqual(response.status_code, 200)
+        url = response['X-Profile-Url']
+        listed = self.client.get('/api/profiling/').json()['profiles']
+        self.assertEqual(listed[0]['id'], response['X-Profile-Id'])
+        self.assertEqual(listed[0]['view'], 'cars-list')
+
+        download = self.client.get(url)
+        self.assertEqual(download.status_code, 200)
+        self.assertIn('attachment', download['Content-Disposition'])
+        path = os.path.join(self.directory, 'requests', f"{response['X-Profile-Id']}.prof")
+        self.assertTrue(any('views.py' in key[0] for key in pstats.Stats(path).stats))
+
+        summary = self.client.get(url, {'summary': 1})
+        self.assertIn('cumulative', summary.content.decode())
+
+    def test_sample_mode_writes_folded_stacks(self):
+        """Test: piles échantillonnées au format folded"""
+        original = DashboardService.get_user_summary
+
+        def slow_summary(user):
+            time.sleep(0.05)
+            return original(user)
+
+        client = self.login('admin', 'adminpass123')
+        with mock.patch.object(DashboardService, 'get_user_summary', side_effect=slow_summary):
+            response = client.get('/api/dashboard/', {'_profile': 'sample'})
+
+        path = os.path.join(self.directory, 'requests', f"{response['X-Profile-Id']}.folded")
+        with open(path, encoding='utf-8') as stream:
+            lines = stream.read().splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+        self.assertTrue(any('apps.reservations.views:dashboard' in line for line in lines))
+
+    def test_flag_ignored_for_non_staff(self):
+        """Test: drapeau sans effet et endpoints refusés hors staff"""
+        client = self.login('testuser', 'testpass123')
+        response = client.get('/api/cars/', HTTP_X_PROFILE='cprofile')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'requests')))
+        self.assertEqual(client.get('/api/profiling/').status_code, 403)
+        self.assertEqual(client.post('/api/profiling/sampler/', {'enabled': True}).status_code, 403)
+
+    def test_background_sampler_aggregates_by_view(self):
+        """Test: échantillonneur activé à chaud, piles agrégées par vue"""
+        original = DashboardService.get_user_summary
+
+        def slow_summary(user):
+            time.sleep(0.05)
+            return original(user)
+
+        state = self.client.post('/api/profiling/sampler/', {
+            'enabled': True, 'interval': 0.001, 'duration': 60
+        }, format='json').json()
+        self.assertTrue(state['enabled'])
+
+        with mock.patch.object(DashboardService, 'get_user_summary', side_effect=slow_summary):
+            self.client.get('/api/dashboard/')
+        self.assertIsNotNone(sampler_control.sampler)
+
+        self.client.post('/api/profiling/sampler/', {'enabled': False}, format='json')
+        self.client.get('/api/cars/')
+        self.assertIsNone(sampler_control.sampler)
+
+        response = self.client.get('/api/profiling/sampler/')
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertIn('\nGET:dashboard;', '\n' + response.content.decode())
+        sampler = self.client.get('/api/profiling/').json()['sampler']
+        self.assertFalse(sampler['enabled'])
+        self.assertGreater(sampler['samples_by_view']['GET:dashboard'], 0)
@@ -0,0 +1,224 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+class LocalBucketStore:
+    """
+    Seaux de jetons en mémoire, protégés par un verrou.
+    Exact, mais propre à un seul processus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def consume(self, key, capacity, refill_rate, now):
+        """
+        Retire un jeton du seau `key`.
+
+        Returns:
+            (autorisé, secondes avant le prochain jeton)
+        """
+        with self._lock:
+            tokens, last = self._buckets.get(key, (capacity, now))
+            allowed, tokens, wait = refill_and_take(tokens, last, capacity, refill_rate, now)
+            self._buckets[key] = (tokens, now)
+        return allowed, wait
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Limite partagée entre processus dans un cache Django, par fenêtre
+    glissante : compteurs par fenêtre de `capacity / refill_rate` secondes,
+    incrémentés avec cache.incr() (atomique sur Redis et Memcached), sans
+    verrou. La fenêtre précédente compte au prorata du temps qui lui reste,
+    ce qui lisse les rafales en bordure de fenêtre comme le ferait le seau.
+
+    Une requête refusée est comptée aussi : sous une rafale continue, la
+    limite reste fermée jusqu'à ce que le débit retombe.
+    """
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def consume(self, key, capacity, refill_rate, now):
+        period = capacity / refill_rate
+        window = int(now // period)
+        elapsed = now - window * period
+
+        current_key = f"{key}:{window}"
+        # Conservée jusqu'à la fin de la fenêtre suivante, qui la lit encore
+        timeout = int(2 * period) + 1
+        self.cache.add(current_key, 0, timeout)
+        try:
+            count = self.cache.incr(current_key)
+        except ValueError:
+            # Clé expirée entre add() et incr()
+            self.cache.set(current_key, 1, timeout)
+            count = 1
+        previous = self.cache.get(f"{key}:{window - 1}", 0)
+
+        estimate = previous * (1 - elapsed / period) + count
+        if estimate <= capacity:
+            return True, 0
+        # L'estimation baisse au rythme où la fenêtre précédente s'efface
+        until_next_window = period - elapsed
+        if previous:
+            return False, min(until_next_window, (estimate - capacity) * period / previous)
+        return False, until_next_window
+
+    def reset(self):
+        pass
+
+
+def refill_and_take(tokens, last, capacity, refill_rate, now):
+    """Remplit le seau selon le temps écoulé puis tente d'en retirer un jeton."""
+    tokens = min(capacity, tokens + max(0, now - last) * refill_rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0
+    return False, tokens, (1 - tokens) / refill_rate
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_bucket_store():
+    """Store configuré par THROTTLE_STORE : 'local' (défaut) ou 'cache'."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if getattr(settings, 'THROTTLE_STORE', 'local') == 'cache':
+                    _store = CacheBucketStore()
+                else:
+                    _store = LocalBucketStore()
+    return _store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle DRF par seau de jetons.
+
+    Le débit est lu dans DEFAULT_THROTTLE_RATES sous la clé
+    `<scope>_<kind>` (ex. `booking_user`) au format DRF `N/période` :
+    le seau contient N jetons et se remplit de N jetons par période.
+    Sans débit configuré, la requête n'est pas limitée.
+    """
+    kind = None
+    timer = time.time
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.rate = api_settings.DEFAULT_THROTTLE_RATES.get(f"{scope}_{self.kind}")
+        self._wait = 0
+
+    def parse_rate(self):
+        num, period = self.rate.split('/')
+        capacity = int(num)
+        duration = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+        return capacity, capacity / duration
+
+    def get_ident_key(self, request, view):
+        """Identifiant du seau ; None pour ne pas limiter la requête."""
+        raise NotImplementedError('.get_ident_key() must be overridden')
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+
+        capacity, refill_rate = self.parse_rate()
+        allowed, self._wait = get_bucket_store().consume(
+            f"bucket:{self.scope}:{self.kind}:{ident}", capacity, refill_rate, self.timer()
+        )
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class UserBucketThrottle(TokenBucketThrottle):
+    """Un seau par utilisateur (par IP pour les anonymes)."""
+    kind = 'user'
+
+    def get_ident_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return self.get_ident(request)
+
+
+class IPBucketThrottle(TokenBucketThrottle):
+    kind = 'ip'
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class CarBucketThrottle(TokenBucketThrottle):
+    """Un seau par véhicule : URL `/cars/{pk}/...` ou champ `car_id` du corps."""
+    kind = 'car'
+
+    def get_ident_key(self, request, view):
+        if getattr(view, 'basename', None) == 'cars':
+            return view.kwargs.get('pk')
+        car_id = request.data.get('car_id') if hasattr(request.data, 'get') else None
+        return str(car_id) if car_id is not None else None
+
+
+class GlobalBucketThrottle(TokenBucketThrottle):
+    """Un seau unique pour l'ensemble des clients."""
+    kind = 'global'
+
+    def get_ident_key(self, request, view):
+        return 'all'
+
+
+# Seaux du client d'abord, seaux partagés ensuite (voir ScopedBucketThrottle)
+BUCKET_THROTTLES = [
+    UserBucketThrottle, IPBucketThrottle, CarBucketThrottle, GlobalBucketThrottle
+]
+
+
+class ScopedBucketThrottle(BaseThrottle):
+    """
+    Tous les seaux d'un scope, consultés dans l'ordre de BUCKET_THROTTLES
+    jusqu'au premier refus.
+
+    DRF interroge chaque throttle d'une vue même après un refus : avec un
+    throttle par seau, les requêtes refusées d'un client videraient aussi
+    les seaux partagés (véhicule, global) et feraient refuser les autres
+    clients. Ici, un seau partagé n'est débité qu'une fois ceux du client
+    passés.
+    """
+
+    def __init__(self, scope):
+        self.throttles = [throttle(scope) for throttle in BUCKET_THROTTLES]
+        self._wait = 0
+
+    def allow_request(self, request, view):
+        for throttle in self.throttles:
+            if not throttle.allow_request(request, view):
+                self._wait = throttle.wait()
+                return False
+        return True
+
+    def wait(self):
+        return self._wait
+
+
+def bucket_throttles(scope):
+    """Throttles d'un scope pour get_throttles() (débits non configurés ignorés)."""
+    return [ScopedBucketThrottle(scope)]
@@ -0,0 +1,96 @@
+import re
+
+from django.db import DatabaseError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from .profiling import SamplerControl, dump_path, list_dumps, stats_text
+from .serializers import SamplerToggleSerializer
+
+SESSION_RE = re.compile(r'\d{8}T\d{6}')
+
+_migrations_applied = False
+
+
+def liveness(request):
+    """Le processus répond (aucun accès à la base)."""
+    return JsonResponse({'status': 'ok'})
+
+
+def readiness(request):
+    """
+    Le processus peut recevoir du trafic : base joignable et migrations
+    appliquées. Ces dernières ne sont vérifiées que jusqu'au premier succès.
+    """
+    global _migrations_applied
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        if not _migrations_applied:
+            executor = MigrationExecutor(connection)
+            if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+                return JsonResponse({'status': 'migrations pending'}, status=503)
+            _migrations_applied = True
+    except DatabaseError as e:
+        return JsonResponse({'status': 'database unavailable', 'error': str(e)}, status=503)
+
+    return JsonResponse({'status': 'ok'})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_list(request):
+    """Profils par requête stockés et état de l'échantillonneur de fond (staff)."""
+    views = {}
+    for stack, count in SamplerControl.stacks().items():
+        view = stack.split(';', 1)[0]
+        views[view] = views.get(view, 0) + count
+    return Response({
+        'profiles': list_dumps(),
+        'sampler': {**SamplerControl.status(), 'samples_by_view': views},
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_download(request, profile_id):
+    """
+    Télécharge un profil par requête (.prof pstats ou .folded).
+    `?summary=1` : résumé texte des fonctions les plus coûteuses (.prof).
+    """
+    path = dump_path(str(profile_id))
+    if path is None:
+        raise Http404
+    if request.GET.get('summary') and path.suffix == '.prof':
+        return HttpResponse(stats_text(path), content_type='text/plain; charset=utf-8')
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name)
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAdminUser])
+def sampler(request):
+    """
+    POST {"enabled", "interval", "duration"} : active (nouvelle session) ou
+    arrête l'échantillonneur de fond de tous les processus.
+    GET : piles agrégées au format folded (`?session=`, `?view=` pour filtrer).
+    """
+    if request.method == 'POST':
+        serializer = SamplerToggleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(SamplerControl.write(**serializer.validated_data))
+
+    session = request.GET.get('session') or SamplerControl.read().get('session')
+    if not session or not SESSION_RE.fullmatch(session):
+        raise Http404
+    view = request.GET.get('view')
+    lines = [
+        f'{stack} {count}\n' for stack, count in SamplerControl.stacks(session).most_common()
+        if view is None or stack.startswith(f'{view};')
+    ]
+    response = HttpResponse(''.join(lines), content_type='text/plain; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="sampler-{session}.folded"'
+    return response
@@ -0,0 +1,25 @@
+from django.contrib import admin, messages
+
+from apps.core.admin import EstimatedCountPaginator
+from .models import Notification
+from .services import NotificationService
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['id', 'recipient', 'kind', 'status', 'attempts', 'run_after', 'sent_at', 'created_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['recipient', '=user__username']
+    readonly_fields = [field.name for field in Notification._meta.fields]
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    ordering = ['-id']
+    actions = ['requeue_selected']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Remettre en file les notifications abandonnées")
+    def requeue_selected(self, request, queryset):
+        requeued = NotificationService.requeue(queryset)
+        self.message_user(request, f"{requeued} notification(s) remise(s) en file.", messages.SUCCESS)
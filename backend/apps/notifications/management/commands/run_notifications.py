@@ -0,0 +1,87 @@
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from apps.notifications.services import NotificationService
+
+
+class Command(BaseCommand):
+    help = 'Envoie les notifications en attente (worker de la file de notifications)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Attente en secondes lorsque la file est vide'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Nombre de processus worker'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Vide la file puis s\'arrête'
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] <= 1:
+            self.run(options)
+            return
+
+        # Chaque processus ouvre ses propres connexions
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=self.run, args=(options,), name=f'notifications-{i}')
+            for i in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+
+        # Arrêt du parent (SIGTERM de l'orchestrateur, Ctrl-C) : transmis
+        # aux workers, qui terminent leur lot en cours avant de sortir
+        def forward(signum, frame):
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        previous = {
+            signum: signal.signal(signum, forward)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            for process in processes:
+                process.join()
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def run(self, options):
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        while not stopping:
+            close_old_connections()
+            report = NotificationService.process_batch(options['batch_size'])
+            if any(report.values()):
+                self.stdout.write(
+                    f"{report['sent']} envoyée(s), {report['retried']} à réessayer, "
+                    f"{report['dead']} abandonnée(s)"
+                )
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['interval'])
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:13
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient', models.EmailField(max_length=254, verbose_name='Adresse')),
+                ('kind', models.CharField(choices=[('RESERVATION_CONFIRMED', 'Réservation confirmée'), ('RESERVATION_CANCELLED', 'Réservation annulée')], max_length=40, verbose_name='Type')),
+                ('context', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('status', models.CharField(choices=[('PENDING', 'En attente'), ('PROCESSING', "En cours d'envoi"), ('SENT', 'Envoyée'), ('DEAD', 'Abandonnée')], default='PENDING', max_length=20, verbose_name='Statut')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('run_after', models.DateTimeField(verbose_name='Prochaine tentative')),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Destinataire')),
+            ],
+            options={
+                'db_table': 'notifications',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='notificatio_status_3a55ce_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('RESERVATION_CONFIRMED', 'Réservation confirmée'), ('RESERVATION_CANCELLED', 'Réservation annulée'), ('RESERVATION_PENDING', 'Réservation mise en attente')], max_length=40, verbose_name='Type'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import models
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class NotificationKind(models.TextChoices):
+    RESERVATION_CONFIRMED = 'RESERVATION_CONFIRMED', 'Réservation confirmée'
+    RESERVATION_CANCELLED = 'RESERVATION_CANCELLED', 'Réservation annulée'
+    RESERVATION_PENDING = 'RESERVATION_PENDING', 'Réservation mise en attente'
+    RESERVATION_REASSIGNED = 'RESERVATION_REASSIGNED', 'Réservation réaffectée'
+    WAITLIST_AVAILABLE = 'WAITLIST_AVAILABLE', 'Créneau libéré (liste d\'attente)'
+
+
+class NotificationStatus(models.TextChoices):
+    PENDING = 'PENDING', 'En attente'
+    PROCESSING = 'PROCESSING', 'En cours d\'envoi'
+    SENT = 'SENT', 'Envoyée'
+    DEAD = 'DEAD', 'Abandonnée'
+
+
+class Notification(models.Model):
+    """
+    File d'attente des notifications e-mail, traitée hors requête par
+    `manage.py run_notifications`.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name="Destinataire"
+    )
+    recipient = models.EmailField(verbose_name="Adresse")
+    kind = models.CharField(
+        max_length=40,
+        choices=NotificationKind.choices,
+        verbose_name="Type"
+    )
+    # Instantané des données utiles au message, pris à la mise en file
+    context = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        max_length=20,
+        choices=NotificationStatus.choices,
+        default=NotificationStatus.PENDING,
+        verbose_name="Statut"
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    # Prochaine tentative (PENDING) ou fin du bail du worker (PROCESSING)
+    run_after = models.DateTimeField(verbose_name="Prochaine tentative")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'notifications'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} → {self.recipient}"
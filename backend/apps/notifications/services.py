@@ -0,0 +1,238 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Iterable, List
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.notifications.models import Notification, NotificationKind, NotificationStatus
+from apps.reservations.models import Reservation, WaitlistEntry
+
+logger = logging.getLogger(__name__)
+
+
+SUBJECTS = {
+    NotificationKind.RESERVATION_CONFIRMED: "Réservation #{reservation_id} confirmée",
+    NotificationKind.RESERVATION_CANCELLED: "Réservation #{reservation_id} annulée",
+    NotificationKind.RESERVATION_PENDING: "Réservation #{reservation_id} mise en attente",
+    NotificationKind.RESERVATION_REASSIGNED: "Réservation #{reservation_id} : changement de véhicule",
+    NotificationKind.WAITLIST_AVAILABLE: "Créneau disponible : {car}",
+}
+
+MESSAGES = {
+    NotificationKind.RESERVATION_CONFIRMED: (
+        "Votre réservation #{reservation_id} du véhicule {car} "
+        "du {start_date} au {end_date} est confirmée."
+    ),
+    NotificationKind.RESERVATION_CANCELLED: (
+        "Votre réservation #{reservation_id} du véhicule {car} "
+        "du {start_date} au {end_date} a été annulée."
+    ),
+    NotificationKind.RESERVATION_PENDING: (
+        "Votre réservation #{reservation_id} du véhicule {car} "
+        "du {start_date} au {end_date} est mise en attente : "
+        "le véhicule n'est plus disponible, nous revenons vers vous."
+    ),
+    NotificationKind.RESERVATION_REASSIGNED: (
+        "Le véhicule initialement prévu n'est plus disponible : votre réservation "
+        "#{reservation_id} du {start_date} au {end_date} est transférée sur le véhicule {car}."
+    ),
+    NotificationKind.WAITLIST_AVAILABLE: (
+        "Le véhicule {car} s'est libéré du {start_date} au {end_date} "
+        "(liste d'attente #{entry_id}). Réservez-le sans tarder : il n'est pas bloqué pour vous."
+    ),
+}
+
+DATE_FORMAT = '%d/%m/%Y %H:%M'
+
+
+def notification_option(name: str):
+    defaults = {'MAX_ATTEMPTS': 5, 'BACKOFF_BASE': 30, 'LEASE_SECONDS': 300}
+    return getattr(settings, 'NOTIFICATIONS', {}).get(name, defaults[name])
+
+
+class NotificationService:
+    """
+    File d'attente des notifications e-mail, stockée en base.
+
+    Les requêtes HTTP se contentent d'insérer des lignes (après commit) ;
+    l'envoi est fait par `manage.py run_notifications`, qui regroupe les
+    notifications d'un même destinataire en un seul e-mail, réessaie avec
+    un délai exponentiel et abandonne (statut DEAD) après MAX_ATTEMPTS.
+    """
+
+    @classmethod
+    def enqueue(cls, kind: str, reservation_ids: Iterable[int]) -> None:
+        """
+        Met en file une notification par réservation, une fois la
+        transaction courante validée (rien n'est envoyé en cas de rollback).
+        """
+        ids = sorted(set(reservation_ids))
+        if ids:
+            transaction.on_commit(lambda: cls._create(kind, ids))
+
+    @staticmethod
+    def _create(kind: str, reservation_ids: List[int]) -> int:
+        reservations = Reservation.objects.filter(
+            id__in=reservation_ids
+        ).exclude(user__email='').select_related('user', 'car')
+
+        now = timezone.now()
+        notifications = [
+            Notification(
+                user_id=reservation.user_id,
+                recipient=reservation.user.email,
+                kind=kind,
+                context={
+                    'reservation_id': reservation.id,
+                    'car': str(reservation.car),
+                    'start_date': timezone.localtime(reservation.start_date).strftime(DATE_FORMAT),
+                    'end_date': timezone.localtime(reservation.end_date).strftime(DATE_FORMAT),
+                },
+                run_after=now,
+            )
+            for reservation in reservations
+        ]
+        Notification.objects.bulk_create(notifications)
+        return len(notifications)
+
+    @classmethod
+    def enqueue_waitlist(cls, entry_ids: Iterable[int]) -> None:
+        """Annonce, après commit, les créneaux libérés aux demandes en liste d'attente."""
+        ids = sorted(set(entry_ids))
+        if ids:
+            transaction.on_commit(lambda: cls._create_waitlist(ids))
+
+    @staticmethod
+    def _create_waitlist(entry_ids: List[int]) -> int:
+        entries = WaitlistEntry.objects.filter(
+            id__in=entry_ids, matched_car__isnull=False
+        ).exclude(user__email='').select_related('user', 'matched_car')
+
+        now = timezone.now()
+        notifications = [
+            Notification(
+                user_id=entry.user_id,
+                recipient=entry.user.email,
+                kind=NotificationKind.WAITLIST_AVAILABLE,
+                context={
+                    'entry_id': entry.id,
+                    'car': str(entry.matched_car),
+                    'start_date': timezone.localtime(entry.start_date).strftime(DATE_FORMAT),
+                    'end_date': timezone.localtime(entry.end_date).strftime(DATE_FORMAT),
+                },
+                run_after=now,
+            )
+            for entry in entries
+        ]
+        Notification.objects.bulk_create(notifications)
+        return len(notifications)
+
+    @staticmethod
+    def backoff(attempts: int) -> timedelta:
+        """Délai avant la tentative suivante : BACKOFF_BASE * 2^(attempts-1)."""
+        return timedelta(seconds=notification_option('BACKOFF_BASE') * 2 ** (attempts - 1))
+
+    @staticmethod
+    @transaction.atomic
+    def claim(batch_size: int = 100) -> List[Notification]:
+        """
+        Réserve un lot de notifications échues pour ce worker.
+
+        Les lignes sont verrouillées avec SKIP LOCKED (PostgreSQL) pour que
+        plusieurs workers se partagent la file, puis passées en PROCESSING
+        avec un bail : si le worker s'arrête en cours d'envoi, elles
+        redeviennent éligibles à l'expiration du bail.
+        """
+        now = timezone.now()
+        due = Notification.objects.filter(
+            status__in=[NotificationStatus.PENDING, NotificationStatus.PROCESSING],
+            run_after__lte=now
+        ).order_by('run_after').select_for_update(skip_locked=True)
+        notifications = list(due[:batch_size])
+        if notifications:
+            Notification.objects.filter(id__in=[n.id for n in notifications]).update(
+                status=NotificationStatus.PROCESSING,
+                run_after=now + timedelta(seconds=notification_option('LEASE_SECONDS'))
+            )
+        return notifications
+
+    @staticmethod
+    def build_message(recipient: str, notifications: List[Notification]) -> EmailMessage:
+        """Un seul e-mail par destinataire, quel que soit le nombre de notifications."""
+        lines = [MESSAGES[n.kind].format(**n.context) for n in notifications]
+        if len(notifications) == 1:
+            subject = SUBJECTS[notifications[0].kind].format(**notifications[0].context)
+        else:
+            subject = f"{len(notifications)} mises à jour de vos réservations"
+        return EmailMessage(subject=subject, body="\n\n".join(lines), to=[recipient])
+
+    @classmethod
+    def process_batch(cls, batch_size: int = 100) -> dict:
+        """
+        Envoie un lot de notifications.
+
+        Returns:
+            {'sent': n, 'retried': n, 'dead': n}
+        """
+        report = {'sent': 0, 'retried': 0, 'dead': 0}
+        notifications = cls.claim(batch_size)
+        if not notifications:
+            return report
+
+        by_recipient = defaultdict(list)
+        for notification in notifications:
+            by_recipient[notification.recipient].append(notification)
+
+        sent, failed = [], []
+        # Une seule connexion SMTP pour tout le lot
+        with get_connection() as connection:
+            for recipient, group in by_recipient.items():
+                try:
+                    connection.send_messages([cls.build_message(recipient, group)])
+                except Exception as e:
+                    logger.warning("Échec d'envoi à %s : %s", recipient, e)
+                    for notification in group:
+                        notification.last_error = str(e)
+                    failed.extend(group)
+                else:
+                    sent.extend(group)
+
+        now = timezone.now()
+        if sent:
+            Notification.objects.filter(id__in=[n.id for n in sent]).update(
+                status=NotificationStatus.SENT,
+                attempts=F('attempts') + 1,
+                sent_at=now,
+                last_error=''
+            )
+            report['sent'] = len(sent)
+
+        max_attempts = notification_option('MAX_ATTEMPTS')
+        for notification in failed:
+            notification.attempts += 1
+            if notification.attempts >= max_attempts:
+                notification.status = NotificationStatus.DEAD
+                report['dead'] += 1
+            else:
+                notification.status = NotificationStatus.PENDING
+                notification.run_after = now + cls.backoff(notification.attempts)
+                report['retried'] += 1
+        Notification.objects.bulk_update(
+            failed, ['attempts', 'status', 'run_after', 'last_error']
+        )
+        return report
+
+    @staticmethod
+    def requeue(queryset) -> int:
+        """Remet en file des notifications abandonnées (dead letters)."""
+        return queryset.filter(status=NotificationStatus.DEAD).update(
+            status=NotificationStatus.PENDING,
+            attempts=0,
+            run_after=timezone.now(),
+            last_error=''
+        )
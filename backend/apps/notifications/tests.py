@@ -0,0 +1,169 @@
+from rest_framework.test import APIClient
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.utils import timezone
+from datetime import timedelta
+from unittest import mock
+import signal
+
+from django.core.management import call_command
+
+from apps.cars.models import CarStatus, Car
+from apps.notifications.models import Notification, NotificationKind, NotificationStatus
+from apps.notifications.services import NotificationService
+from apps.reservations.services import ReservationService
+
+User = get_user_model()
+
+
+@override_settings(NOTIFICATIONS={'MAX_ATTEMPTS': 2, 'BACKOFF_BASE': 30, 'LEASE_SECONDS': 300})
+class NotificationQueueTestCase(TestCase):
+    """Tests de la file de notifications."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.car = Car.objects.create(
+            registration_number='ABC-123',
+            brand='Toyota',
+            model='Corolla',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def book(self, days):
+        start = timezone.now() + timedelta(days=days)
+        return ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=start,
+            end_date=start + timedelta(hours=2)
+        )
+
+    def test_booking_enqueues_without_sending(self):
+        """Test: la réservation via l'API met en file sans envoyer d'e-mail"""
+        start = timezone.now() + timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/reservations/', {
+                'car_id': self.car.id,
+                'start_date': start.isoformat(),
+                'end_date': (start + timedelta(hours=2)).isoformat(),
+            })
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.kind, NotificationKind.RESERVATION_CONFIRMED)
+        self.assertEqual(notification.recipient, 'test@example.com')
+        self.assertEqual(notification.status, NotificationStatus.PENDING)
+
+    def test_batches_per_recipient(self):
+        """Test: un seul e-mail par destinataire pour plusieurs notifications"""
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation = self.book(1)
+            self.book(2)
+            ReservationService.cancel_reservation(reservation.id)
+
+        report = NotificationService.process_batch()
+
+        self.assertEqual(report, {'sent': 3, 'retried': 0, 'dead': 0})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['test@example.com'])
+        self.assertIn('annulée', mail.outbox[0].body)
+        self.assertEqual(
+            Notification.objects.filter(status=NotificationStatus.SENT).count(), 3
+        )
+        # Plus rien à envoyer
+        self.assertEqual(NotificationService.process_batch()['sent'], 0)
+
+    def test_retry_with_backoff_then_dead_letter(self):
+        """Test: échec d'envoi → nouvelle tentative différée puis abandon"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(1)
+
+        failing = mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=ConnectionError('SMTP indisponible')
+        )
+        with failing, self.assertLogs('apps.notifications.services', 'WARNING'):
+            report = NotificationService.process_batch()
+        self.assertEqual(report['retried'], 1)
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.status, NotificationStatus.PENDING)
+        self.assertEqual(notification.attempts, 1)
+        self.assertGreater(notification.run_after, timezone.now() + timedelta(seconds=25))
+        self.assertIn('SMTP', notification.last_error)
+
+        # Pas encore échue : le worker l'ignore
+        self.assertEqual(NotificationService.process_batch(), {'sent': 0, 'retried': 0, 'dead': 0})
+
+        Notification.objects.update(run_after=timezone.now())
+        with failing, self.assertLogs('apps.notifications.services', 'WARNING'):
+            report = NotificationService.process_batch()
+        self.assertEqual(report['dead'], 1)
+        self.assertEqual(Notification.objects.get().status, NotificationStatus.DEAD)
+
+        # Remise en file manuelle des dead letters
+        self.assertEqual(NotificationService.requeue(Notification.objects.all()), 1)
+        self.assertEqual(NotificationService.process_batch()['sent'], 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_expired_lease_is_reclaimed(self):
+        """Test: un lot abandonné par un worker arrêté est repris après le bail"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(1)
+
+        self.assertEqual(len(NotificationService.claim()), 1)
+        self.assertEqual(NotificationService.claim(), [])
+
+        Notification.objects.update(run_after=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(NotificationService.process_batch()['sent'], 1)
+
+    def test_no_notification_on_rollback(self):
+        """Test: une réservation refusée ne met rien en file"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(1)
+            with self.assertRaises(Exception):
+                self.book(1)
+
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_workers_stopped_with_parent(self):
+        """Test: SIGTERM reçu par le parent est transmis aux workers, puis attendus"""
+        workers = []
+
+        class Worker:
+            def __init__(self, target, args, name):
+                self.alive = False
+                self.joined = False
+                workers.append(self)
+
+            def start(self):
+                self.alive = True
+
+            def is_alive(self):
+                return self.alive
+
+            def terminate(self):
+                self.alive = False
+
+            def join(self):
+                if self is workers[0]:
+                    # Signal reçu pendant l'attente des workers
+                    signal.getsignal(signal.SIGTERM)(signal.SIGTERM, None)
+                self.joined = not self.alive
+
+        handler = signal.getsignal(signal.SIGTERM)
+        with mock.patch('multiprocessing.Process', Worker):
+            call_command('run_notifications', workers=2)
+
+        self.assertEqual(len(workers), 2)
+        self.assertTrue(all(worker.joined for worker in workers))
+        self.assertIs(signal.getsignal(signal.SIGTERM), handler)
@@ -1,10 +1,170 @@
-from django.contrib import admin
-from .models import Reservation
+from django import forms
+from django.contrib import admin, messages
+
+from apps.core.admin import AutocompleteFilter, AutocompleteFilterMixin, EstimatedCountPaginator
+from .models import Reservation, ReservationArchive, ReservationEvent, ReservationStatus, WaitlistEntry
+from .services import ReservationBulkService, ReservationService
+
+
+class ReservationAdminForm(forms.ModelForm):
+    """
+    Contrôles du service avant l'enregistrement, pour les afficher dans le
+    formulaire ; ils sont refaits sous verrou par le service lui-même.
+    """
+
+    class Meta:
+        model = Reservation
+        fields = '__all__'
+
+    def clean(self):
+        data = super().clean()
+        start, end = data.get('start_date'), data.get('end_date')
+        if start is None or end is None:
+            return data
+        instance = self.instance
+        if instance.pk:
+            # Le formulaire est à la seconde près : dates inchangées conservées
+            for name in ('start_date', 'end_date'):
+                if data[name] == getattr(instance, name).replace(microsecond=0):
+                    data[name] = getattr(instance, name)
+            if (data['start_date'], data['end_date']) == (instance.start_date, instance.end_date):
+                return data
+            start, end = data['start_date'], data['end_date']
+
+        ReservationService.validate_date_range(start, end)
+        car = data['car'] if not instance.pk else instance.car
+        if not instance.pk:
+            ReservationService.validate_car_availability(car)
+        ReservationService.check_reservation_overlap(
+            car.id, start, end, exclude_reservation_id=instance.pk
+        )
+        return data
 
 
 @admin.register(Reservation)
-class ReservationAdmin(admin.ModelAdmin):
-    list_display = ['user', 'car', 'start_date', 'end_date', 'status', 'purpose', 'created_at']
-    list_filter = ['status', 'purpose', 'user', 'car']
-    search_fields = ['status', 'purpose', 'start_date', 'end_date']
-    ordering = ['-created_at']
\ No newline at end of file
+class ReservationAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
+    list_display = ['id', 'user', 'car', 'start_date', 'end_date', 'status', 'purpose', 'created_at']
+    # Autocomplete plutôt qu'une liste déroulante de tous les utilisateurs/véhicules
+    list_filter = ['status', ('user', AutocompleteFilter), ('car', AutocompleteFilter)]
+    list_select_related = ['user', 'car']
+    autocomplete_fields = ['user', 'car']
+    search_fields = ['=id', 'car__registration_number', 'user__username', 'user__email']
+    date_hierarchy = 'start_date'
+    # Pas de COUNT(*) non filtré en plus de celui de la pagination
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    # -id suit l'ordre de création et s'appuie sur la clé primaire
+    ordering = ['-id']
+    actions = ['cancel_selected', 'pend_selected', 'complete_selected']
+    form = ReservationAdminForm
+    # Statut : actions groupées (ReservationBulkService) ; dates et motif :
+    # ReservationService, comme l'API (chevauchement, version, audit, état
+    # du véhicule, liste d'attente)
+    readonly_fields = ['status', 'hold_expires_at', 'version']
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is None:
+            return self.readonly_fields
+        return ['user', 'car', *self.readonly_fields]
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            ReservationService.update_reservation(
+                obj.pk,
+                start_date=obj.start_date,
+                end_date=obj.end_date,
+                purpose=obj.purpose,
+                expected_version=obj.version,
+                actor=request.user
+            )
+        else:
+            created = ReservationService.create_reservation(
+                user=obj.user,
+                car_id=obj.car_id,
+                start_date=obj.start_date,
+                end_date=obj.end_date,
+                purpose=obj.purpose
+            )
+            obj.pk = created.pk
+        obj.refresh_from_db()
+
+    def delete_model(self, request, obj):
+        # Auteur de la suppression pour le journal d'audit (signal post_delete)
+        obj.deleted_by = request.user.id
+        obj.delete()
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.delete_model(request, obj)
+
+    def _set_status(self, request, queryset, new_status, verb):
+        """Changement de statut en un seul UPDATE, sans charger les instances."""
+        updated = ReservationBulkService.set_status(queryset, new_status, actor=request.user)
+        self.message_user(request, f"{len(updated)} réservation(s) {verb}.", messages.SUCCESS)
+
+    @admin.action(description="Annuler les réservations sélectionnées")
+    def cancel_selected(self, request, queryset):
+        self._set_status(request, queryset, ReservationStatus.CANCELLED, 'annulée(s)')
+
+    @admin.action(description="Mettre en attente les réservations sélectionnées")
+    def pend_selected(self, request, queryset):
+        self._set_status(request, queryset, ReservationStatus.PENDING, 'mise(s) en attente')
+
+    @admin.action(description="Marquer les réservations sélectionnées comme terminées")
+    def complete_selected(self, request, queryset):
+        self._set_status(request, queryset, ReservationStatus.COMPLETED, 'terminée(s)')
+
+
+@admin.register(ReservationArchive)
+class ReservationArchiveAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
+    list_display = ['id', 'user', 'car', 'start_date', 'end_date', 'status', 'archived_at']
+    list_filter = ['status', ('user', AutocompleteFilter), ('car', AutocompleteFilter)]
+    list_select_related = ['user', 'car']
+    search_fields = ['=id', 'car__registration_number', 'user__username']
+    date_hierarchy = 'start_date'
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ReservationEvent)
+class ReservationEventAdmin(admin.ModelAdmin):
+    list_display = ['occurred_at', 'event_type', 'reservation_id', 'car_id', 'actor_id']
+    list_filter = ['event_type']
+    search_fields = ['=reservation_id', '=actor_id']
+    date_hierarchy = 'occurred_at'
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    ordering = ['-occurred_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
+    list_display = ['id', 'user', 'car', 'brand', 'model', 'start_date', 'end_date', 'status', 'created_at']
+    list_filter = ['status', 'auto_book', ('user', AutocompleteFilter), ('car', AutocompleteFilter)]
+    list_select_related = ['user', 'car']
+    search_fields = ['=id', 'car__registration_number', 'brand', 'model', 'user__username']
+    date_hierarchy = 'start_date'
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    ordering = ['-id']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ReservationsConfig(AppConfig):
     name = 'apps.reservations'
+
+    def ready(self):
+        from . import signals  # noqa: F401
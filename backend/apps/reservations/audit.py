@@ -0,0 +1,139 @@
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import ReservationEvent, ReservationEventType
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLog:
+    """
+    Journal d'audit asynchrone et groupé.
+
+    `record()` ne fait qu'inscrire un callback on_commit : l'événement n'est
+    mis en mémoire que si la transaction métier est validée, et la
+    transaction (avec son verrou sur le véhicule) n'est pas allongée.
+    Un thread d'arrière-plan écrit le tampon par bulk_create dès que
+    `batch_size` événements sont en attente ou toutes les `flush_interval`
+    secondes. En cas d'échec d'écriture, les événements restent en tampon,
+    dans la limite de `max_buffer` (les plus anciens sont alors perdus).
+    """
+
+    def __init__(self, batch_size=100, flush_interval=1.0, max_buffer=10000, background=True):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.background = background
+        self._buffer = deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def record(self, reservation_id, car_id, event_type, actor_id=None, changes=None):
+        event = ReservationEvent(
+            reservation_id=reservation_id,
+            car_id=car_id,
+            actor_id=actor_id,
+            event_type=event_type,
+            changes=changes or {},
+            occurred_at=timezone.now(),
+        )
+        transaction.on_commit(lambda: self._enqueue(event))
+
+    def _enqueue(self, event):
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                logger.warning("Tampon d'audit plein : événement le plus ancien perdu")
+            self._buffer.append(event)
+            pending = len(self._buffer)
+
+        if self.background:
+            self._ensure_thread()
+            if pending >= self.batch_size:
+                self._wakeup.set()
+
+    def _ensure_thread(self):
+        # Après un fork (workers), le thread du processus parent n'existe plus
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name='reservation-audit', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Échec d'écriture du journal d'audit")
+
+    def flush(self):
+        """Écrit les événements en attente ; retourne leur nombre."""
+        with self._lock:
+            events = list(self._buffer)
+            self._buffer.clear()
+        if not events:
+            return 0
+
+        try:
+            for start in range(0, len(events), self.batch_size):
+                ReservationEvent.objects.bulk_create(events[start:start + self.batch_size])
+        except Exception:
+            with self._lock:
+                self._buffer.extendleft(reversed(events))
+            raise
+        return len(events)
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+
+def _create_audit_log():
+    options = getattr(settings, 'RESERVATION_AUDIT', {})
+    log = AuditLog(
+        batch_size=options.get('BATCH_SIZE', 100),
+        flush_interval=options.get('FLUSH_INTERVAL', 1.0),
+        max_buffer=options.get('MAX_BUFFER', 10000),
+        background=options.get('BACKGROUND', True),
+    )
+    if log.background:
+        atexit.register(log.flush)
+    return log
+
+
+audit_log = _create_audit_log()
+
+
+def replay(reservation_id: int):
+    """
+    Reconstruit l'historique d'une réservation à partir du journal.
+
+    Returns:
+        Liste de couples (événement, état après l'événement)
+    """
+    history = []
+    state = {}
+    for event in ReservationEvent.objects.filter(reservation_id=reservation_id):
+        if event.event_type == ReservationEventType.CREATED:
+            state = dict(event.changes)
+        else:
+            for field, (_, new) in event.changes.items():
+                state[field] = new
+        history.append((event, dict(state)))
+    return history
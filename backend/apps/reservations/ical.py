@@ -0,0 +1,165 @@
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Optional
+
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Reservation, ReservationStatus
+
+TOKEN_SALT = 'apps.reservations.ical'
+
+ICAL_STATUS = {
+    ReservationStatus.CONFIRMED: 'CONFIRMED',
+    ReservationStatus.COMPLETED: 'CONFIRMED',
+    ReservationStatus.PENDING: 'TENTATIVE',
+    ReservationStatus.CANCELLED: 'CANCELLED',
+}
+
+
+def make_feed_token(kind: str, object_id: int) -> str:
+    """Jeton signé d'un flux : `kind` vaut 'user' ou 'car'."""
+    return signing.dumps([kind, object_id], salt=TOKEN_SALT)
+
+
+def read_feed_token(token: str) -> Optional[tuple]:
+    """(kind, id) du jeton, ou None s'il est invalide."""
+    try:
+        kind, object_id = signing.loads(token, salt=TOKEN_SALT)
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+    if kind not in ('user', 'car'):
+        return None
+    return kind, object_id
+
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line: str) -> str:
+    """Coupe les lignes à 75 octets (RFC 5545, 3.1)."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    parts, current = [], b''
+    for char in line:
+        char_bytes = char.encode('utf-8')
+        if len(current) + len(char_bytes) > (75 if not parts else 74):
+            parts.append(current.decode('utf-8'))
+            current = b''
+        current += char_bytes
+    parts.append(current.decode('utf-8'))
+    return '\r\n '.join(parts)
+
+
+def format_datetime(value: datetime) -> str:
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+class CalendarFeedService:
+    """
+    Flux iCalendar des réservations d'un utilisateur ou d'un véhicule.
+
+    Le flux couvre une fenêtre glissante (PAST_DAYS jours passés,
+    FUTURE_DAYS jours à venir) lue en une requête. Le rendu est mis en
+    cache sous une clé versionnée, incrémentée après commit à chaque
+    modification d'une réservation de l'utilisateur ou du véhicule. La
+    version n'est incrémentée que par le processus qui écrit : le cache
+    doit être partagé (settings.CACHES), sans quoi les autres workers
+    servent l'ancien flux et son ETag jusqu'à CACHE_TIMEOUT.
+    """
+    PAST_DAYS = 30
+    FUTURE_DAYS = 365
+    CACHE_TIMEOUT = 300
+
+    @staticmethod
+    def version_key(kind: str, object_id: int) -> str:
+        return f"ical:{kind}:{object_id}:version"
+
+    @classmethod
+    def invalidate(cls, user_ids=None, car_ids=None) -> None:
+        keys = [cls.version_key('user', user_id) for user_id in user_ids or []]
+        keys += [cls.version_key('car', car_id) for car_id in car_ids or []]
+        if not keys:
+            return
+
+        def bump():
+            for key in keys:
+                try:
+                    cache.incr(key)
+                except ValueError:
+                    pass
+
+        transaction.on_commit(bump)
+
+    @classmethod
+    def get_feed(cls, kind: str, object_id: int) -> dict:
+        """
+        Returns:
+            {'body', 'etag', 'last_modified'}
+        """
+        version = cache.get_or_set(cls.version_key(kind, object_id), 1, None)
+        key = f"ical:{kind}:{object_id}:{version}"
+        feed = cache.get(key)
+        if feed is None:
+            feed = cls.render(kind, object_id)
+            cache.set(key, feed, cls.CACHE_TIMEOUT)
+        return feed
+
+    @classmethod
+    def render(cls, kind: str, object_id: int) -> dict:
+        now = timezone.now()
+        reservations = Reservation.objects.filter(
+            end_date__gte=now - timedelta(days=cls.PAST_DAYS),
+            start_date__lte=now + timedelta(days=cls.FUTURE_DAYS),
+            **{f"{kind}_id": object_id}
+        ).select_related('car', 'user').only(
+            'id', 'car', 'user', 'start_date', 'end_date', 'status', 'purpose', 'version', 'updated_at',
+            'car__brand', 'car__model', 'car__registration_number',
+            'user__username', 'user__first_name', 'user__last_name'
+        ).order_by('start_date')
+        reservations = list(reservations)
+
+        lines = [
+            'BEGIN:VCALENDAR',
+            'VERSION:2.0',
+            'PRODID:-//Car Reservation System//Reservations//FR',
+            'CALSCALE:GREGORIAN',
+            'METHOD:PUBLISH',
+            'X-PUBLISHED-TTL:PT15M',
+        ]
+        for reservation in reservations:
+            if kind == 'user':
+                summary = str(reservation.car)
+            else:
+                summary = reservation.user.get_full_name() or reservation.user.username
+            lines += [
+                'BEGIN:VEVENT',
+                f"UID:reservation-{reservation.id}@car-reservation",
+                # Horodatage stable : le flux ne change qu'avec les données
+                f"DTSTAMP:{format_datetime(reservation.updated_at)}",
+                f"DTSTART:{format_datetime(reservation.start_date)}",
+                f"DTEND:{format_datetime(reservation.end_date)}",
+                f"SUMMARY:{escape_text(summary)}",
+                f"STATUS:{ICAL_STATUS[reservation.status]}",
+                f"SEQUENCE:{reservation.version - 1}",
+                f"LAST-MODIFIED:{format_datetime(reservation.updated_at)}",
+            ]
+            if reservation.purpose:
+                lines.append(f"DESCRIPTION:{escape_text(reservation.purpose)}")
+            lines.append('END:VEVENT')
+        lines.append('END:VCALENDAR')
+
+        body = '\r\n'.join(fold(line) for line in lines) + '\r\n'
+        last_modified = max((r.updated_at for r in reservations), default=None)
+        return {
+            'body': body,
+            'etag': '"%s"' % hashlib.md5(body.encode('utf-8'), usedforsecurity=False).hexdigest(),
+            'last_modified': last_modified,
+        }
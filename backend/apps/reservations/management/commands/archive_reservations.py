@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.reservations.services import ReservationArchiveService
+
+
+class Command(BaseCommand):
+    help = 'Déplace les réservations terminées vers la table d\'archive, par lots'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.RESERVATION_ARCHIVE_AFTER_DAYS,
+            help='Archive les réservations terminées depuis plus de N jours'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Nombre de réservations déplacées par transaction'
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        self.stdout.write(f'Archivage des réservations terminées avant le {before:%d/%m/%Y}...')
+
+        total = ReservationArchiveService.archive(before, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'{total} réservation(s) archivée(s).'))
@@ -0,0 +1,48 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.reservations.services import ReservationBulkService, WaitlistService
+
+
+class Command(BaseCommand):
+    help = 'Libère les options (réservations PENDING) expirées, par lots, et clôt les demandes en liste d\'attente échues'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Nombre d\'options libérées par transaction'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Répète le balayage toutes les N secondes (0 : un seul passage)'
+        )
+
+    def handle(self, *args, **options):
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        while not stopping:
+            close_old_connections()
+            released = ReservationBulkService.release_expired_holds(options['batch_size'])
+            expired = WaitlistService.expire()
+            if released or expired or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{released} option(s) expirée(s) libérée(s), '
+                    f'{expired} demande(s) en liste d\'attente expirée(s).'
+                ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,44 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.reservations.services import CarStateService
+
+
+class Command(BaseCommand):
+    help = 'Recalcule l\'état dénormalisé des véhicules (réservation en cours, libre jusqu\'à)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Nombre de véhicules recalculés par transaction'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Répète le recalcul toutes les N secondes (0 : un seul passage)'
+        )
+
+    def handle(self, *args, **options):
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        while not stopping:
+            close_old_connections()
+            fixed = CarStateService.reconcile(options['batch_size'])
+            if fixed or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(f'{fixed} véhicule(s) mis à jour.'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
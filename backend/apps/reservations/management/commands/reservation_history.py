@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reservations.audit import replay
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit l\'historique d\'une réservation à partir du journal d\'audit'
+
+    def add_arguments(self, parser):
+        parser.add_argument('reservation_id', type=int)
+
+    def handle(self, *args, **options):
+        history = replay(options['reservation_id'])
+        if not history:
+            raise CommandError(
+                f"Aucun événement pour la réservation #{options['reservation_id']}."
+            )
+
+        for event, state in history:
+            actor = f"utilisateur #{event.actor_id}" if event.actor_id else "système"
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{event.occurred_at:%d/%m/%Y %H:%M:%S} {event.get_event_type_display()} ({actor})"
+            ))
+            for field, value in event.changes.items():
+                self.stdout.write(f"   {field}: {value}")
+
+        _, state = history[-1]
+        self.stdout.write(self.style.SUCCESS('\nÉtat reconstruit:'))
+        for field, value in state.items():
+            self.stdout.write(f"   {field}: {value}")
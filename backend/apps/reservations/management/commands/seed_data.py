@@ -5,6 +5,7 @@ from datetime import timedelta
 
 from apps.cars.models import Car, CarStatus
 from apps.reservations.models import Reservation, ReservationStatus
+from apps.reservations.services import CarStateService
 
 User = get_user_model()
 
@@ -103,6 +104,9 @@ class Command(BaseCommand):
                 f'{status_icon} Réservation: {user.username} - {car.registration_number}'
             )
 
+        # Réservations créées hors service : état des véhicules recalculé
+        CarStateService.reconcile()
+
         self.stdout.write(self.style.SUCCESS('\nDonnées de test créées avec succès!'))
         self.stdout.write('\nConnexions disponibles:')
         self.stdout.write('   Admin: admin / admin123')
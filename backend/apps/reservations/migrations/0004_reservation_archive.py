@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0001_initial'),
+        ('reservations', '0003_reservation_start_date_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('start_date', models.DateTimeField(verbose_name='Date de début')),
+                ('end_date', models.DateTimeField(verbose_name='Date de fin')),
+                ('status', models.CharField(choices=[('PENDING', 'En attente'), ('CONFIRMED', 'Confirmée'), ('CANCELLED', 'Annulée'), ('COMPLETED', 'Terminée')], max_length=20, verbose_name='Statut')),
+                ('purpose', models.TextField(blank=True, verbose_name='Motif de la mission')),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('car', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_reservations', to='cars.car', verbose_name='Véhicule')),
+                ('user', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_reservations', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'db_table': 'reservations_archive',
+                'ordering': ['-start_date'],
+                'indexes': [models.Index(fields=['user', 'start_date'], name='reservation_user_id_75ce55_idx'), models.Index(fields=['car', 'start_date'], name='reservation_car_id_f702f4_idx')],
+            },
+        ),
+    ]
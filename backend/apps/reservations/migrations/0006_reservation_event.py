@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:09
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0005_reservation_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reservation_id', models.BigIntegerField(verbose_name='Réservation')),
+                ('car_id', models.BigIntegerField(verbose_name='Véhicule')),
+                ('actor_id', models.BigIntegerField(blank=True, null=True, verbose_name='Auteur')),
+                ('event_type', models.CharField(choices=[('CREATED', 'Créée'), ('UPDATED', 'Modifiée'), ('CANCELLED', 'Annulée'), ('COMPLETED', 'Terminée')], max_length=20, verbose_name='Type')),
+                ('changes', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('occurred_at', models.DateTimeField(verbose_name='Date')),
+            ],
+            options={
+                'db_table': 'reservation_events',
+                'ordering': ['occurred_at', 'id'],
+                'indexes': [models.Index(fields=['reservation_id', 'occurred_at'], name='reservation_reserva_c57ce9_idx')],
+            },
+        ),
+    ]
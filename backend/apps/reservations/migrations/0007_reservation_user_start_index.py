@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0001_initial'),
+        ('reservations', '0006_reservation_event'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['user', 'start_date'], name='reservation_user_id_8daf32_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0001_initial'),
+        ('reservations', '0007_reservation_user_start_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='hold_expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Expiration de l'option"),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['hold_expires_at'], name='reservations_hold_expiry_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0002_car_reservation_state'),
+        ('reservations', '0008_reservation_hold_expires_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('brand', models.CharField(blank=True, max_length=100, verbose_name='Marque')),
+                ('model', models.CharField(blank=True, max_length=100, verbose_name='Modèle')),
+                ('start_date', models.DateTimeField(verbose_name='Date de début')),
+                ('end_date', models.DateTimeField(verbose_name='Date de fin')),
+                ('purpose', models.TextField(blank=True, verbose_name='Motif de la mission')),
+                ('auto_book', models.BooleanField(default=True, verbose_name='Réservation automatique')),
+                ('status', models.CharField(choices=[('WAITING', 'En attente'), ('BOOKED', 'Réservée'), ('NOTIFIED', 'Notifiée'), ('CANCELLED', 'Annulée'), ('EXPIRED', 'Expirée')], default='WAITING', max_length=20, verbose_name='Statut')),
+                ('matched_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('car', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='cars.car', verbose_name='Véhicule')),
+                ('matched_car', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='cars.car', verbose_name='Véhicule proposé')),
+                ('reservation', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reservations.reservation', verbose_name='Réservation')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'db_table': 'reservation_waitlist',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'WAITING')), fields=['car', 'start_date', 'end_date'], name='waitlist_car_window_idx'), models.Index(condition=models.Q(('car__isnull', True), ('status', 'WAITING')), fields=['brand', 'model', 'start_date', 'end_date'], name='waitlist_model_window_idx'), models.Index(fields=['user', 'status'], name='reservation_user_id_cefa92_idx')],
+            },
+        ),
+    ]
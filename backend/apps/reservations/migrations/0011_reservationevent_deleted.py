@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0010_reservation_user_updated_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reservationevent',
+            name='event_type',
+            field=models.CharField(choices=[('CREATED', 'Créée'), ('UPDATED', 'Modifiée'), ('CANCELLED', 'Annulée'), ('COMPLETED', 'Terminée'), ('DELETED', 'Supprimée')], max_length=20, verbose_name='Type'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 
 from apps.cars.models import Car
 
@@ -9,6 +11,20 @@ class ReservationStatus(models.TextChoices):
     CANCELLED = 'CANCELLED', 'Annulée'
     COMPLETED = 'COMPLETED', 'Terminée'
 
+class ReservationQuerySet(models.QuerySet):
+    def blocking(self, now=None):
+        """
+        Réservations qui occupent leur créneau : confirmées, ou options
+        (PENDING) non expirées. Une option expirée pas encore balayée ne
+        bloque plus rien.
+        """
+        return self.filter(
+            status__in=[ReservationStatus.CONFIRMED, ReservationStatus.PENDING]
+        ).exclude(
+            status=ReservationStatus.PENDING,
+            hold_expires_at__lte=now or timezone.now()
+        )
+
 class Reservation(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -31,8 +47,18 @@ class Reservation(models.Model):
         verbose_name="Statut"
     )
     purpose = models.TextField(blank=True, verbose_name="Motif de la mission")
+    # Option (PENDING) posée par le formulaire : libérée à cette date si non confirmée
+    hold_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Expiration de l'option"
+    )
+    # Incrémenté à chaque écriture (verrouillage optimiste)
+    version = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ReservationQuerySet.as_manager()
     
     class Meta:
         db_table = 'reservations'
@@ -40,7 +66,190 @@ class Reservation(models.Model):
         indexes = [
             models.Index(fields=['car', 'start_date', 'end_date']),
             models.Index(fields=['status']),
+            models.Index(fields=['start_date']),
+            # Listes d'un utilisateur filtrées/triées par date (?start_after=...)
+            models.Index(fields=['user', 'start_date']),
+            # Flux de synchronisation d'un utilisateur (/api/sync/?since=)
+            models.Index(fields=['user', 'updated_at']),
+            # Balayage des options expirées : seules les réservations PENDING
+            models.Index(
+                fields=['hold_expires_at'],
+                condition=models.Q(status='PENDING'),
+                name='reservations_hold_expiry_idx'
+            ),
         ]
         
     def __str__(self):
-        return f"Réservation #{self.id} - {self.car} ({self.start_date.date()})"
\ No newline at end of file
+        return f"Réservation #{self.id} - {self.car} ({self.start_date.date()})"
+
+class ReservationArchive(models.Model):
+    """
+    Réservations terminées déplacées hors de la table chaude `reservations`.
+
+    Les contrôles de chevauchement et les listes courantes n'indexent ainsi
+    que les réservations en cours ou à venir. L'identifiant d'origine est
+    conservé comme clé primaire.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        related_name='archived_reservations',
+        verbose_name="Utilisateur"
+    )
+    car = models.ForeignKey(
+        Car,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        related_name='archived_reservations',
+        verbose_name="Véhicule"
+    )
+    start_date = models.DateTimeField(verbose_name="Date de début")
+    end_date = models.DateTimeField(verbose_name="Date de fin")
+    status = models.CharField(
+        max_length=20,
+        choices=ReservationStatus.choices,
+        verbose_name="Statut"
+    )
+    purpose = models.TextField(blank=True, verbose_name="Motif de la mission")
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'reservations_archive'
+        ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['user', 'start_date']),
+            models.Index(fields=['car', 'start_date']),
+        ]
+
+    def __str__(self):
+        return f"Réservation archivée #{self.id} - {self.car_id} ({self.start_date.date()})"
+
+
+class ReservationEventType(models.TextChoices):
+    CREATED = 'CREATED', 'Créée'
+    UPDATED = 'UPDATED', 'Modifiée'
+    CANCELLED = 'CANCELLED', 'Annulée'
+    COMPLETED = 'COMPLETED', 'Terminée'
+    DELETED = 'DELETED', 'Supprimée'
+
+
+class ReservationEvent(models.Model):
+    """
+    Journal d'audit des réservations, en ajout seul.
+
+    Les identifiants sont stockés sans clé étrangère : l'historique survit
+    à l'archivage ou à la suppression de la réservation.
+    """
+    reservation_id = models.BigIntegerField(verbose_name="Réservation")
+    car_id = models.BigIntegerField(verbose_name="Véhicule")
+    actor_id = models.BigIntegerField(null=True, blank=True, verbose_name="Auteur")
+    event_type = models.CharField(
+        max_length=20,
+        choices=ReservationEventType.choices,
+        verbose_name="Type"
+    )
+    # CREATED : valeurs initiales ; sinon {champ: [ancienne, nouvelle]}
+    changes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    occurred_at = models.DateTimeField(verbose_name="Date")
+
+    class Meta:
+        db_table = 'reservation_events'
+        ordering = ['occurred_at', 'id']
+        indexes = [
+            models.Index(fields=['reservation_id', 'occurred_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_type_display()} #{self.reservation_id} ({self.occurred_at:%d/%m/%Y %H:%M})"
+
+
+class WaitlistStatus(models.TextChoices):
+    WAITING = 'WAITING', 'En attente'
+    BOOKED = 'BOOKED', 'Réservée'
+    NOTIFIED = 'NOTIFIED', 'Notifiée'
+    CANCELLED = 'CANCELLED', 'Annulée'
+    EXPIRED = 'EXPIRED', 'Expirée'
+
+
+class WaitlistEntry(models.Model):
+    """
+    Demande en liste d'attente sur un créneau complet : un véhicule précis,
+    ou n'importe quel véhicule d'une marque et d'un modèle.
+
+    Rapprochée des créneaux libérés (annulation, réservation raccourcie)
+    par WaitlistService : réservée automatiquement (`auto_book`) ou
+    signalée par notification.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries',
+        verbose_name="Utilisateur"
+    )
+    car = models.ForeignKey(
+        Car,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='waitlist_entries',
+        verbose_name="Véhicule"
+    )
+    # Sans véhicule précis : tout véhicule de cette marque et de ce modèle
+    brand = models.CharField(max_length=100, blank=True, verbose_name="Marque")
+    model = models.CharField(max_length=100, blank=True, verbose_name="Modèle")
+    start_date = models.DateTimeField(verbose_name="Date de début")
+    end_date = models.DateTimeField(verbose_name="Date de fin")
+    purpose = models.TextField(blank=True, verbose_name="Motif de la mission")
+    auto_book = models.BooleanField(default=True, verbose_name="Réservation automatique")
+    status = models.CharField(
+        max_length=20,
+        choices=WaitlistStatus.choices,
+        default=WaitlistStatus.WAITING,
+        verbose_name="Statut"
+    )
+    # Véhicule proposé ou réservé, et réservation créée (auto_book)
+    matched_car = models.ForeignKey(
+        Car,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Véhicule proposé"
+    )
+    reservation = models.ForeignKey(
+        Reservation,
+        on_delete=models.SET_NULL,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Réservation"
+    )
+    matched_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'reservation_waitlist'
+        ordering = ['created_at']
+        indexes = [
+            # Rapprochement : demandes en attente par véhicule ou par modèle, puis période
+            models.Index(
+                fields=['car', 'start_date', 'end_date'],
+                condition=models.Q(status='WAITING'),
+                name='waitlist_car_window_idx'
+            ),
+            models.Index(
+                fields=['brand', 'model', 'start_date', 'end_date'],
+                condition=models.Q(status='WAITING', car__isnull=True),
+                name='waitlist_model_window_idx'
+            ),
+            models.Index(fields=['user', 'status']),
+        ]
+
+    def __str__(self):
+        target = self.car or f"{self.brand} {self.model}"
+        return f"Attente #{self.id} - {target} ({self.start_date.date()})"
@@ -1,10 +1,11 @@
 from rest_framework import serializers
-from .models import Reservation
+from .models import Reservation, ReservationStatus, WaitlistEntry
 from apps.cars.serializers import CarSerializer
+from apps.core.serializers import DynamicFieldsMixin
 from apps.users.serializers import UserSerializer
 
 
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     car_detail = CarSerializer(source='car', read_only=True)
     user_detail = UserSerializer(source='user', read_only=True)
 
@@ -12,14 +13,127 @@ class ReservationSerializer(serializers.ModelSerializer):
         model = Reservation
         fields = [
             'id', 'user', 'user_detail', 'car', 'car_detail',
-            'start_date', 'end_date', 'status', 'purpose',
-            'created_at', 'updated_at'
+            'start_date', 'end_date', 'status', 'purpose', 'version',
+            'hold_expires_at', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['user', 'status', 'created_at', 'updated_at']
+        read_only_fields = [
+            'user', 'status', 'version', 'hold_expires_at', 'created_at', 'updated_at'
+        ]
+        # Détails imbriqués uniquement sur demande (?expand=car,user)
+        expandable_fields = {'car': 'car_detail', 'user': 'user_detail'}
 
 
 class ReservationCreateSerializer(serializers.Serializer):
     car_id = serializers.IntegerField()
     start_date = serializers.DateTimeField()
     end_date = serializers.DateTimeField()
-    purpose = serializers.CharField(required=False, allow_blank=True)
\ No newline at end of file
+    purpose = serializers.CharField(required=False, allow_blank=True)
+
+
+class ReservationConfirmSerializer(serializers.Serializer):
+    """Confirmation d'une option ; le motif peut être complété à cette étape."""
+    purpose = serializers.CharField(required=False, allow_blank=True)
+
+
+class ReservationUpdateSerializer(serializers.Serializer):
+    """Modification d'une réservation ; `version` peut aussi venir de If-Match."""
+    start_date = serializers.DateTimeField(required=False)
+    end_date = serializers.DateTimeField(required=False)
+    purpose = serializers.CharField(required=False, allow_blank=True)
+    version = serializers.IntegerField(required=False, min_value=1)
+
+
+class ReservationHistorySerializer(serializers.Serializer):
+    """Ligne de l'historique unifié (réservations courantes + archivées)."""
+    id = serializers.IntegerField()
+    user = serializers.IntegerField(source='user_id')
+    car = serializers.IntegerField(source='car_id')
+    start_date = serializers.DateTimeField()
+    end_date = serializers.DateTimeField()
+    status = serializers.CharField()
+    purpose = serializers.CharField()
+    created_at = serializers.DateTimeField()
+    archived = serializers.BooleanField()
+
+
+class BulkStatusSerializer(serializers.Serializer):
+    """Filtre et statut cible d'un changement de statut en masse (staff)."""
+    status = serializers.ChoiceField(
+        choices=[ReservationStatus.CANCELLED, ReservationStatus.PENDING]
+    )
+    car_id = serializers.IntegerField(required=False)
+    user_id = serializers.IntegerField(required=False)
+    date_from = serializers.DateTimeField(required=False)
+    date_to = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if not {'car_id', 'user_id', 'date_from', 'date_to'} & set(data):
+            raise serializers.ValidationError(
+                "Au moins un filtre requis : car_id, user_id, date_from ou date_to."
+            )
+        if 'date_from' in data and 'date_to' in data and data['date_from'] >= data['date_to']:
+            raise serializers.ValidationError("date_from doit précéder date_to.")
+        return data
+
+
+class ReassignSerializer(serializers.Serializer):
+    """Options de la réaffectation des réservations déplacées (staff)."""
+    car_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    dry_run = serializers.BooleanField(default=False)
+    hold_unplaced = serializers.BooleanField(default=False)
+
+
+class ReservationFilterSerializer(serializers.Serializer):
+    """
+    Filtres de la liste des réservations (query params).
+    `status` accepte plusieurs valeurs séparées par des virgules ;
+    `user` et `all_users` sont réservés au staff.
+    """
+    start_after = serializers.DateTimeField(required=False)
+    end_before = serializers.DateTimeField(required=False)
+    status = serializers.CharField(required=False)
+    car = serializers.IntegerField(required=False)
+    active_now = serializers.BooleanField(required=False, default=False)
+    user = serializers.IntegerField(required=False)
+    all_users = serializers.BooleanField(required=False, default=False)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=500)
+
+    def validate_status(self, value):
+        statuses = [item.strip().upper() for item in value.split(',') if item.strip()]
+        invalid = set(statuses) - set(ReservationStatus.values)
+        if invalid:
+            raise serializers.ValidationError(
+                f"Statut(s) inconnu(s) : {', '.join(sorted(invalid))}."
+            )
+        return statuses
+
+    def validate(self, data):
+        if 'start_after' in data and 'end_before' in data and data['start_after'] >= data['end_before']:
+            raise serializers.ValidationError("start_after doit précéder end_before.")
+        return data
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            'id', 'car', 'brand', 'model', 'start_date', 'end_date', 'purpose',
+            'auto_book', 'status', 'matched_car', 'reservation', 'matched_at', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class WaitlistJoinSerializer(serializers.Serializer):
+    """Inscription en liste d'attente : un véhicule (`car_id`) ou une marque et un modèle."""
+    car_id = serializers.IntegerField(required=False)
+    brand = serializers.CharField(required=False, allow_blank=True, default='')
+    model = serializers.CharField(required=False, allow_blank=True, default='')
+    start_date = serializers.DateTimeField()
+    end_date = serializers.DateTimeField()
+    purpose = serializers.CharField(required=False, allow_blank=True, default='')
+    auto_book = serializers.BooleanField(default=True)
+
+    def validate(self, data):
+        if data.get('car_id') is None and not (data['brand'] and data['model']):
+            raise serializers.ValidationError("Indiquez car_id, ou brand et model.")
+        return data
@@ -1,12 +1,25 @@
-from django.db import transaction
-from django.db.models import Q
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import BooleanField, Case, Count, F, Q, Value, When
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from datetime import datetime
-from typing import Optional
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import List, Optional
 
 from apps.cars.models import CarStatus, Car
-from apps.reservations.models import Reservation, ReservationStatus
+from apps.notifications.models import NotificationKind
+from apps.notifications.services import NotificationService
+from apps.reservations.audit import audit_log
+from apps.reservations.models import (
+    Reservation, ReservationArchive, ReservationEventType, ReservationStatus,
+    WaitlistEntry, WaitlistStatus
+)
+from apps.reservations.signals import reservations_changed
+from apps.sync.models import SyncKind, Tombstone
 
 
 class ReservationService:
@@ -68,9 +81,8 @@ class ReservationService:
         Raises:
             ValidationError: Si un chevauchement est détecté
         """
-        overlapping_reservations = Reservation.objects.filter(
-            car_id=car_id,
-            status__in=[ReservationStatus.CONFIRMED, ReservationStatus.PENDING]
+        overlapping_reservations = Reservation.objects.blocking().filter(
+            car_id=car_id
         ).filter(
             Q(start_date__lt=end_date) & Q(end_date__gt=start_date)
         )
@@ -87,11 +99,160 @@ class ReservationService:
                 f"du {conflicting.start_date.strftime('%d/%m/%Y %H:%M')} "
                 f"au {conflicting.end_date.strftime('%d/%m/%Y %H:%M')}. "
                 f"Le véhicule {conflicting.car.registration_number} n'est pas disponible "
-                f"pour cette période."
+                f"pour cette période.",
+                code='overlap'
             )
         
         return False
     
+    @staticmethod
+    def search(
+        queryset,
+        start_after: Optional[datetime] = None,
+        end_before: Optional[datetime] = None,
+        statuses: Optional[List[str]] = None,
+        car_id: Optional[int] = None,
+        active_now: bool = False
+    ):
+        """
+        Filtre une liste de réservations.
+
+        Avec `start_after`, le tri se fait par date de début croissante
+        (prochains trajets d'abord), servi par l'index (user, start_date).
+        """
+        if start_after is not None:
+            queryset = queryset.filter(start_date__gte=start_after).order_by('start_date')
+        if end_before is not None:
+            queryset = queryset.filter(end_date__lte=end_before)
+        if statuses:
+            queryset = queryset.filter(status__in=statuses)
+        if car_id is not None:
+            queryset = queryset.filter(car_id=car_id)
+        if active_now:
+            now = timezone.now()
+            queryset = queryset.filter(
+                status__in=[ReservationStatus.CONFIRMED, ReservationStatus.PENDING],
+                start_date__lte=now,
+                end_date__gt=now
+            )
+        return queryset
+
+    @staticmethod
+    def find_next_slots(
+        car_id: int,
+        duration: timedelta,
+        after: datetime,
+        limit: int = 3
+    ) -> List[dict]:
+        """
+        Trouve les prochains créneaux libres d'une durée donnée.
+
+        Un seul parcours, trié par date de début, des réservations actives
+        du véhicule se terminant après `after` : chaque intervalle entre la
+        fin courante et le début de la réservation suivante assez long pour
+        `duration` fournit un créneau.
+
+        Returns:
+            Liste de dicts {start_date, end_date, free_until} ; free_until
+            vaut None pour l'intervalle ouvert après la dernière réservation.
+        """
+        after = max(after, timezone.now())
+        slots = []
+        cursor = after
+
+        intervals = Reservation.objects.blocking().filter(
+            car_id=car_id,
+            end_date__gt=after
+        ).order_by('start_date').values_list('start_date', 'end_date')
+
+        for start, end in intervals.iterator():
+            if start - cursor >= duration:
+                slots.append({
+                    'start_date': cursor,
+                    'end_date': cursor + duration,
+                    'free_until': start,
+                })
+                if len(slots) >= limit:
+                    return slots
+            cursor = max(cursor, end)
+
+        slots.append({
+            'start_date': cursor,
+            'end_date': cursor + duration,
+            'free_until': None,
+        })
+        return slots
+
+    @staticmethod
+    def bulk_check_availability(items: List[dict]) -> List[dict]:
+        """
+        Disponibilité de nombreux couples (véhicule, période) sans exception.
+
+        Une seule requête charge les réservations actives des véhicules
+        concernés sur l'enveloppe des périodes. Pour chaque véhicule, les
+        intervalles triés par début sont interrogés par recherche binaire :
+        ceux qui commencent avant la fin demandée et, parmi eux, ceux dont
+        la fin (maximum cumulé) dépasse le début demandé.
+
+        Args:
+            items: dicts {car_id, start_date, end_date}
+
+        Returns:
+            Pour chaque item, dans l'ordre : {car_id, start_date, end_date,
+            available, conflicting_ids} et `reason` si indisponible.
+        """
+        if not items:
+            return []
+
+        car_ids = {item['car_id'] for item in items}
+        statuses = dict(Car.objects.filter(id__in=car_ids).values_list('id', 'status'))
+
+        intervals = {}
+        for car_id, reservation_id, start, end in Reservation.objects.blocking().filter(
+            car_id__in=car_ids,
+            start_date__lt=max(item['end_date'] for item in items),
+            end_date__gt=min(item['start_date'] for item in items)
+        ).order_by('car_id', 'start_date').values_list('car_id', 'id', 'start_date', 'end_date'):
+            ids, starts, ends = intervals.setdefault(car_id, ([], [], []))
+            ids.append(reservation_id)
+            starts.append(start)
+            ends.append(end)
+
+        # Maximum cumulé des fins : croissant même si des intervalles se chevauchent
+        max_ends = {car_id: list(accumulate(ends, max)) for car_id, (_, _, ends) in intervals.items()}
+
+        results = []
+        for item in items:
+            car_id, start, end = item['car_id'], item['start_date'], item['end_date']
+            result = {
+                'car_id': car_id,
+                'start_date': start,
+                'end_date': end,
+                'available': False,
+                'conflicting_ids': [],
+            }
+            results.append(result)
+
+            if car_id not in statuses:
+                result['reason'] = 'not_found'
+                continue
+            if statuses[car_id] != CarStatus.AVAILABLE:
+                result['reason'] = 'car_unavailable'
+                continue
+
+            if car_id in intervals:
+                ids, starts, ends = intervals[car_id]
+                hi = bisect_left(starts, end)
+                lo = bisect_right(max_ends[car_id], start, 0, hi)
+                result['conflicting_ids'] = [ids[i] for i in range(lo, hi) if ends[i] > start]
+
+            if result['conflicting_ids']:
+                result['reason'] = 'overlap'
+            else:
+                result['available'] = True
+
+        return results
+
     @classmethod
     @transaction.atomic
     def create_reservation(
@@ -100,12 +261,17 @@ class ReservationService:
         car_id: int,
         start_date: datetime,
         end_date: datetime,
-        purpose: str = ""
+        purpose: str = "",
+        hold: bool = False
     ) -> Reservation:
         """
         Crée une réservation avec validation complète.
         
         Transaction atomique pour éviter les race conditions.
+
+        Avec `hold`, la réservation est une option (PENDING) qui expire
+        après RESERVATION_HOLD_SECONDS : elle bloque déjà le créneau et
+        sera confirmée par `confirm_reservation`.
         """
         # Validation plage de dates
         cls.validate_date_range(start_date, end_date)
@@ -123,17 +289,101 @@ class ReservationService:
         cls.check_reservation_overlap(car_id, start_date, end_date)
         
         # Création
+        if hold:
+            status = ReservationStatus.PENDING
+            hold_expires_at = timezone.now() + timedelta(seconds=settings.RESERVATION_HOLD_SECONDS)
+        else:
+            status, hold_expires_at = ReservationStatus.CONFIRMED, None
         reservation = Reservation.objects.create(
             user=user,
             car=car,
             start_date=start_date,
             end_date=end_date,
             purpose=purpose,
-            status=ReservationStatus.CONFIRMED
+            status=status,
+            hold_expires_at=hold_expires_at
         )
-        
+
+        audit_log.record(
+            reservation.id, car.id, ReservationEventType.CREATED,
+            actor_id=user.id,
+            changes={
+                'user_id': user.id,
+                'car_id': car.id,
+                'start_date': start_date,
+                'end_date': end_date,
+                'status': reservation.status,
+                'purpose': purpose,
+            }
+        )
+        CarStateService.refresh([car.id])
+        if not hold:
+            NotificationService.enqueue(NotificationKind.RESERVATION_CONFIRMED, [reservation.id])
+        return reservation
+
+    @staticmethod
+    @transaction.atomic
+    def confirm_reservation(reservation_id: int, user, purpose: Optional[str] = None) -> Reservation:
+        """
+        Confirme une option non expirée de l'utilisateur.
+
+        Le chevauchement a été contrôlé, sous verrou, à la pose de
+        l'option : la confirmation est un UPDATE conditionnel sur la
+        ligne, sans verrou sur le véhicule.
+
+        Raises:
+            ValidationError: code 'expired' si l'option a expiré ou
+            n'existe pas
+        """
+        now = timezone.now()
+        changes = {
+            'status': ReservationStatus.CONFIRMED,
+            'hold_expires_at': None,
+            'updated_at': now,
+        }
+        if purpose is not None:
+            changes['purpose'] = purpose
+
+        updated = Reservation.objects.filter(
+            id=reservation_id,
+            user=user,
+            status=ReservationStatus.PENDING,
+            hold_expires_at__gt=now
+        ).update(version=F('version') + 1, **changes)
+        if not updated:
+            raise ValidationError(
+                f"L'option #{reservation_id} a expiré ou n'existe plus. "
+                f"Recommencez la réservation.",
+                code='expired'
+            )
+
+        reservation = Reservation.objects.get(id=reservation_id)
+        audit_log.record(
+            reservation.id, reservation.car_id, ReservationEventType.UPDATED,
+            actor_id=user.id,
+            changes={'status': [ReservationStatus.PENDING, ReservationStatus.CONFIRMED]}
+        )
+        reservations_changed.send(
+            sender=Reservation, user_ids=[reservation.user_id], car_ids=[reservation.car_id]
+        )
+        NotificationService.enqueue(NotificationKind.RESERVATION_CONFIRMED, [reservation.id])
         return reservation
     
+    @staticmethod
+    def record_deletion(reservation: Reservation, actor_id: Optional[int] = None) -> None:
+        """Trace la suppression d'une réservation (signal post_delete)."""
+        audit_log.record(
+            reservation.id, reservation.car_id, ReservationEventType.DELETED, actor_id=actor_id
+        )
+
+    @staticmethod
+    def stale_version_error(reservation_id: int) -> ValidationError:
+        return ValidationError(
+            f"La réservation #{reservation_id} a été modifiée entre-temps. "
+            f"Rechargez-la avant de réessayer.",
+            code='stale'
+        )
+
     @classmethod
     @transaction.atomic
     def update_reservation(
@@ -141,18 +391,44 @@ class ReservationService:
         reservation_id: int,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-        purpose: Optional[str] = None
+        purpose: Optional[str] = None,
+        expected_version: Optional[int] = None,
+        actor=None
     ) -> Reservation:
-        """Met à jour une réservation existante."""
+        """
+        Met à jour une réservation existante.
+
+        Verrouillage optimiste : la réservation est lue sans verrou puis
+        écrite par un UPDATE conditionnel sur sa version, limité aux champs
+        modifiés. Seul un changement de dates verrouille le véhicule, comme
+        à la création, pour sérialiser les contrôles de chevauchement.
+
+        Une option (PENDING) peut être déplacée tant qu'elle n'a pas expiré :
+        le formulaire suit ainsi la saisie des dates sans annuler puis
+        reposer une option à chaque modification.
+
+        Raises:
+            ValidationError: code 'stale' si la version a changé, 'expired'
+            si l'option a expiré
+        """
         try:
-            reservation = Reservation.objects.select_for_update().get(
-                id=reservation_id
-            )
+            reservation = Reservation.objects.get(id=reservation_id)
         except Reservation.DoesNotExist:
             raise ValidationError(f"Réservation #{reservation_id} introuvable.")
-        
+
+        if expected_version is not None and reservation.version != expected_version:
+            raise cls.stale_version_error(reservation_id)
+
         if reservation.status == ReservationStatus.CANCELLED:
             raise ValidationError("Impossible de modifier une réservation annulée.")
+        # Une option expirée ne bloque plus son créneau : la déplacer
+        # laisserait croire qu'elle bloque le nouveau
+        if (reservation.status == ReservationStatus.PENDING and reservation.hold_expires_at is not None
+                and reservation.hold_expires_at <= timezone.now()):
+            raise ValidationError(
+                f"L'option #{reservation_id} a expiré. Recommencez la réservation.",
+                code='expired'
+            )
         
         # Mise à jour des dates si fournies
         new_start = start_date or reservation.start_date
@@ -160,35 +436,1055 @@ class ReservationService:
         
         # Validation
         cls.validate_date_range(new_start, new_end)
-        cls.check_reservation_overlap(
-            reservation.car_id,
-            new_start,
-            new_end,
-            exclude_reservation_id=reservation_id
+
+        changes = {}
+        if new_start != reservation.start_date:
+            changes['start_date'] = new_start
+        if new_end != reservation.end_date:
+            changes['end_date'] = new_end
+        if purpose is not None and purpose != reservation.purpose:
+            changes['purpose'] = purpose
+
+        if not changes:
+            return reservation
+
+        if 'start_date' in changes or 'end_date' in changes:
+            Car.objects.select_for_update().get(id=reservation.car_id)
+            cls.check_reservation_overlap(
+                reservation.car_id,
+                new_start,
+                new_end,
+                exclude_reservation_id=reservation_id
+            )
+
+        audited = {field: [getattr(reservation, field), value] for field, value in changes.items()}
+        previous_start, previous_end = reservation.start_date, reservation.end_date
+
+        # Update conditionnel : échoue si une autre écriture est passée entre-temps
+        changes['updated_at'] = timezone.now()
+        updated = Reservation.objects.filter(
+            id=reservation_id,
+            version=reservation.version
+        ).exclude(
+            status=ReservationStatus.CANCELLED
+        ).update(version=F('version') + 1, **changes)
+
+        if not updated:
+            raise cls.stale_version_error(reservation_id)
+
+        for field, value in changes.items():
+            setattr(reservation, field, value)
+        reservation.version += 1
+        audit_log.record(
+            reservation.id, reservation.car_id, ReservationEventType.UPDATED,
+            actor_id=getattr(actor, 'id', None), changes=audited
+        )
+        if 'start_date' in changes or 'end_date' in changes:
+            CarStateService.refresh([reservation.car_id])
+            # Réservation raccourcie ou déplacée : le temps rendu profite à la liste d'attente
+            WaitlistService.time_freed(
+                (reservation.car_id, start, end)
+                for start, end in subtract_interval(previous_start, previous_end, new_start, new_end)
+            )
+        reservations_changed.send(
+            sender=Reservation, user_ids=[reservation.user_id], car_ids=[reservation.car_id]
         )
-        
-        # Update
-        if start_date:
-            reservation.start_date = start_date
-        if end_date:
-            reservation.end_date = end_date
-        if purpose is not None:
-            reservation.purpose = purpose
-            
-        reservation.save()
         return reservation
     
+    @classmethod
+    @transaction.atomic
+    def cancel_reservation(
+        cls,
+        reservation_id: int,
+        expected_version: Optional[int] = None,
+        actor=None
+    ) -> Reservation:
+        """
+        Annule une réservation.
+
+        Lecture puis UPDATE conditionnel sur la version lue : deux
+        annulations, ou une annulation et une modification concurrentes,
+        ne peuvent pas s'écraser. Sans version attendue, une écriture
+        concurrente provoque simplement une nouvelle tentative.
+
+        L'annulation et ses effets (état du véhicule, audit, liste
+        d'attente, notification) sont validés en une seule transaction.
+        """
+        for _ in range(3):
+            try:
+                reservation = Reservation.objects.get(id=reservation_id)
+            except Reservation.DoesNotExist:
+                raise ValidationError(f"Réservation #{reservation_id} introuvable.")
+
+            if expected_version is not None and reservation.version != expected_version:
+                raise cls.stale_version_error(reservation_id)
+
+            if reservation.status == ReservationStatus.CANCELLED:
+                raise ValidationError("Cette réservation est déjà annulée.")
+
+            now = timezone.now()
+            updated = Reservation.objects.filter(
+                id=reservation_id,
+                version=reservation.version
+            ).update(
+                status=ReservationStatus.CANCELLED,
+                version=F('version') + 1,
+                updated_at=now
+            )
+            if updated:
+                break
+            if expected_version is not None:
+                raise cls.stale_version_error(reservation_id)
+        else:
+            raise cls.stale_version_error(reservation_id)
+
+        previous_status = reservation.status
+        reservation.status = ReservationStatus.CANCELLED
+        reservation.version += 1
+        reservation.updated_at = now
+
+        audit_log.record(
+            reservation.id, reservation.car_id, ReservationEventType.CANCELLED,
+            actor_id=getattr(actor, 'id', None),
+            changes={'status': [previous_status, reservation.status]}
+        )
+        CarStateService.refresh([reservation.car_id])
+        WaitlistService.time_freed([(reservation.car_id, reservation.start_date, reservation.end_date)])
+        reservations_changed.send(
+            sender=Reservation, user_ids=[reservation.user_id], car_ids=[reservation.car_id]
+        )
+        # Une option abandonnée n'a jamais été annoncée à l'utilisateur
+        if reservation.hold_expires_at is None:
+            NotificationService.enqueue(NotificationKind.RESERVATION_CANCELLED, [reservation.id])
+        return reservation
+
+
+class ReservationBulkService:
+    """
+    Changements de statut en masse (annulation, mise en attente, clôture).
+
+    Les réservations visées sont modifiées par un seul UPDATE conditionnel
+    sur leur statut ; les identifiants touchés alimentent ensuite, en une
+    fois, le journal d'audit, l'invalidation des caches et les notifications.
+    """
+
+    # Statuts d'origine autorisés pour chaque statut cible
+    TRANSITIONS = {
+        ReservationStatus.CANCELLED: [ReservationStatus.CONFIRMED, ReservationStatus.PENDING],
+        ReservationStatus.PENDING: [ReservationStatus.CONFIRMED],
+        ReservationStatus.COMPLETED: [ReservationStatus.CONFIRMED, ReservationStatus.PENDING],
+    }
+    EVENT_TYPES = {
+        ReservationStatus.CANCELLED: ReservationEventType.CANCELLED,
+        ReservationStatus.PENDING: ReservationEventType.UPDATED,
+        ReservationStatus.COMPLETED: ReservationEventType.COMPLETED,
+    }
+    NOTIFICATION_KINDS = {
+        ReservationStatus.CANCELLED: NotificationKind.RESERVATION_CANCELLED,
+        ReservationStatus.PENDING: NotificationKind.RESERVATION_PENDING,
+    }
+
+    @staticmethod
+    def filter_queryset(
+        car_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ):
+        """Réservations d'un véhicule / utilisateur chevauchant [date_from, date_to[."""
+        queryset = Reservation.objects.all()
+        if car_id is not None:
+            queryset = queryset.filter(car_id=car_id)
+        if user_id is not None:
+            queryset = queryset.filter(user_id=user_id)
+        if date_from is not None:
+            queryset = queryset.filter(end_date__gt=date_from)
+        if date_to is not None:
+            queryset = queryset.filter(start_date__lt=date_to)
+        return queryset
+
+    @classmethod
+    @transaction.atomic
+    def set_status(cls, queryset, new_status: str, actor=None, notify: bool = True) -> List[int]:
+        """
+        Passe au statut `new_status` les réservations du queryset dont le
+        statut le permet. Sans `notify`, aucune notification n'est mise en file.
+
+        Returns:
+            Identifiants des réservations modifiées
+        """
+        if new_status not in cls.TRANSITIONS:
+            raise ValidationError(f"Statut cible invalide : {new_status}.")
+
+        targets = queryset.filter(status__in=cls.TRANSITIONS[new_status]).order_by()
+        now = timezone.now()
+        if connection.vendor == 'postgresql':
+            rows = cls._set_status_postgresql(targets, new_status, now)
+        else:
+            rows = cls._set_status_sqlite(targets, new_status, now)
+
+        if rows:
+            cls._propagate(rows, new_status, actor, notify)
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _set_status_postgresql(targets, new_status: str, now: datetime) -> list:
+        """UPDATE ... FROM ... RETURNING : statut précédent inclus, en une requête."""
+        sql, params = targets.select_for_update(of=('self',)).values('id', 'status').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE reservations AS r
+                SET status = %s, version = r.version + 1, updated_at = %s
+                FROM ({sql}) AS previous
+                WHERE r.id = previous.id
+                RETURNING r.id, r.user_id, r.car_id, previous.status
+                """,
+                [new_status, now, *params]
+            )
+            return cursor.fetchall()
+
+    @staticmethod
+    def _set_status_sqlite(targets, new_status: str, now: datetime) -> list:
+        """
+        SELECT puis un UPDATE ... RETURNING par statut précédent.
+
+        select_for_update est sans effet sur SQLite : chaque UPDATE répète
+        les conditions de `targets` (statut d'origine, échéance des
+        options...) et seules les lignes qu'il a réellement modifiées sont
+        renvoyées, par exemple sans une option confirmée entre-temps.
+        """
+        selected = defaultdict(dict)
+        for row in targets.values_list('id', 'user_id', 'car_id', 'status'):
+            selected[row[3]][row[0]] = row
+
+        rows = []
+        with connection.cursor() as cursor:
+            for status, by_id in selected.items():
+                sql, params = targets.filter(id__in=list(by_id), status=status).values('id').query.sql_with_params()
+                cursor.execute(
+                    'UPDATE "reservations" SET status = %s, version = version + 1, updated_at = %s '
+                    f'WHERE id IN ({sql}) RETURNING id',
+                    [new_status, connection.ops.adapt_datetimefield_value(now), *params]
+                )
+                rows += [by_id[reservation_id] for reservation_id, in cursor.fetchall()]
+        return rows
+
+    @classmethod
+    def _propagate(cls, rows: list, new_status: str, actor, notify: bool = True) -> None:
+        event_type = cls.EVENT_TYPES[new_status]
+        for reservation_id, _, car_id, previous_status in rows:
+            audit_log.record(
+                reservation_id, car_id, event_type,
+                actor_id=getattr(actor, 'id', None),
+                changes={'status': [previous_status, new_status]}
+            )
+        car_ids = sorted({row[2] for row in rows})
+        CarStateService.refresh(car_ids)
+        if new_status == ReservationStatus.CANCELLED:
+            WaitlistService.reservations_released([row[0] for row in rows])
+        reservations_changed.send(
+            sender=Reservation,
+            user_ids=sorted({row[1] for row in rows}),
+            car_ids=car_ids
+        )
+        if notify and new_status in cls.NOTIFICATION_KINDS:
+            NotificationService.enqueue(cls.NOTIFICATION_KINDS[new_status], [row[0] for row in rows])
+
+    @classmethod
+    @transaction.atomic
+    def retire_cars(cls, car_ids: List[int], actor=None) -> List[int]:
+        """
+        Met des véhicules en maintenance et annule leurs réservations non
+        terminées.
+
+        Returns:
+            Identifiants des réservations annulées
+        """
+        Car.objects.filter(id__in=car_ids).update(status=CarStatus.MAINTENANCE, updated_at=timezone.now())
+        # UPDATE sans post_save : invalidation explicite du parc
+        DashboardService.invalidate()
+        return cls.set_status(
+            Reservation.objects.filter(car_id__in=car_ids, end_date__gt=timezone.now()),
+            ReservationStatus.CANCELLED,
+            actor=actor
+        )
+
+    @classmethod
+    def release_expired_holds(cls, batch_size: int = 1000) -> int:
+        """
+        Annule par lots les options expirées (index partiel sur
+        hold_expires_at des réservations PENDING), sans notification.
+
+        Returns:
+            Nombre d'options libérées
+        """
+        total = 0
+        while True:
+            now = timezone.now()
+            expired = Reservation.objects.filter(
+                status=ReservationStatus.PENDING,
+                hold_expires_at__lte=now
+            )
+            ids = list(expired.order_by('hold_expires_at').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            # Filtre répété : une option confirmée entre-temps n'est pas touchée
+            total += len(cls.set_status(expired.filter(id__in=ids), ReservationStatus.CANCELLED, notify=False))
+            if len(ids) < batch_size:
+                break
+        return total
+
+
+def waitlist_option(name: str):
+    defaults = {'MAX_ENTRIES_PER_USER': 5, 'MATCH_LIMIT': 50}
+    return getattr(settings, 'WAITLIST', {}).get(name, defaults[name])
+
+
+def subtract_interval(start: datetime, end: datetime, new_start: datetime, new_end: datetime) -> list:
+    """Parties de [start, end[ qui ne sont plus couvertes par [new_start, new_end[."""
+    if new_end <= start or new_start >= end:
+        return [(start, end)]
+    freed = []
+    if new_start > start:
+        freed.append((start, new_start))
+    if new_end < end:
+        freed.append((new_end, end))
+    return freed
+
+
+class WaitlistService:
+    """
+    Liste d'attente des créneaux complets.
+
+    Plutôt que de laisser les utilisateurs interroger la disponibilité en
+    boucle, chaque libération de temps (annulation, option expirée,
+    réservation raccourcie ou déplacée) déclenche, après commit, le
+    rapprochement des seules demandes concernées : en attente, sur le même
+    véhicule ou le même modèle, et dont la période recoupe le temps libéré
+    (index partiels sur les demandes WAITING). Les demandes sont servies
+    dans l'ordre d'inscription ; la réservation passe par
+    `create_reservation`, donc par le même contrôle de chevauchement.
+    """
+
     @staticmethod
-    def cancel_reservation(reservation_id: int) -> Reservation:
-        """Annule une réservation."""
+    @transaction.atomic
+    def join(
+        user,
+        start_date: datetime,
+        end_date: datetime,
+        car_id: Optional[int] = None,
+        brand: str = "",
+        model: str = "",
+        purpose: str = "",
+        auto_book: bool = True
+    ) -> WaitlistEntry:
+        """
+        Inscrit une demande ; elle est rapprochée immédiatement si le
+        créneau est déjà libre.
+        """
+        ReservationService.validate_date_range(start_date, end_date)
+        if car_id is not None:
+            try:
+                car = Car.objects.get(id=car_id)
+            except Car.DoesNotExist:
+                raise ValidationError(f"Véhicule #{car_id} introuvable.")
+            brand, model = "", ""
+        elif not (brand and model):
+            raise ValidationError("Indiquez un véhicule, ou une marque et un modèle.")
+        else:
+            car = None
+
+        waiting = WaitlistEntry.objects.filter(user=user, status=WaitlistStatus.WAITING).count()
+        if waiting >= waitlist_option('MAX_ENTRIES_PER_USER'):
+            raise ValidationError(
+                f"Vous avez déjà {waiting} demandes en liste d'attente. "
+                f"Annulez-en une avant d'en ajouter."
+            )
+
+        entry = WaitlistEntry.objects.create(
+            user=user,
+            car=car,
+            brand=brand,
+            model=model,
+            start_date=start_date,
+            end_date=end_date,
+            purpose=purpose,
+            auto_book=auto_book
+        )
+
+        cars = Car.objects.filter(id=car.id) if car is not None else Car.objects.filter(brand=brand, model=model)
+        for candidate in cars.filter(status=CarStatus.AVAILABLE).order_by('id'):
+            if WaitlistService.fulfil(entry, candidate):
+                entry.refresh_from_db()
+                break
+        return entry
+
+    @staticmethod
+    def cancel(entry_id: int, user) -> WaitlistEntry:
+        updated = WaitlistEntry.objects.filter(
+            id=entry_id, user=user, status=WaitlistStatus.WAITING
+        ).update(status=WaitlistStatus.CANCELLED)
+        if not updated:
+            raise ValidationError(f"Demande #{entry_id} introuvable ou déjà traitée.")
+        return WaitlistEntry.objects.get(id=entry_id)
+
+    @classmethod
+    def time_freed(cls, intervals: List[tuple]) -> None:
+        """
+        Programme, après commit, le rapprochement des périodes libérées.
+
+        Args:
+            intervals: tuples (car_id, start_date, end_date)
+        """
+        intervals = list(intervals)
+        if intervals:
+            transaction.on_commit(lambda: cls.match(intervals))
+
+    @classmethod
+    def reservations_released(cls, reservation_ids: List[int]) -> None:
+        """Idem pour des réservations annulées, relues après commit."""
+        ids = sorted(set(reservation_ids))
+        if ids:
+            transaction.on_commit(lambda: cls.match(list(
+                Reservation.objects.filter(id__in=ids).values_list('car_id', 'start_date', 'end_date')
+            )))
+
+    @classmethod
+    def match(cls, intervals: List[tuple]) -> dict:
+        """
+        Rapproche les demandes en attente des périodes libérées.
+
+        Une requête charge les demandes candidates de tous les véhicules
+        (disponibles) concernés ; chaque demande est ensuite essayée sur les
+        véhicules dont une période libérée recoupe la sienne.
+
+        Returns:
+            {'booked': [ids], 'notified': [ids]}
+        """
+        report = {'booked': [], 'notified': []}
+        now = timezone.now()
+        freed = defaultdict(list)
+        for car_id, start, end in intervals:
+            if end > now:
+                freed[car_id].append((max(start, now), end))
+        if not freed:
+            return report
+
+        cars = Car.objects.filter(id__in=freed, status=CarStatus.AVAILABLE).in_bulk()
+        if not cars:
+            return report
+
+        targets = Q(car_id__in=cars)
+        for brand, model in {(car.brand, car.model) for car in cars.values()}:
+            targets |= Q(car__isnull=True, brand=brand, model=model)
+        periods = [period for car_id in cars for period in freed[car_id]]
+        candidates = WaitlistEntry.objects.filter(
+            targets,
+            status=WaitlistStatus.WAITING,
+            start_date__gt=now,
+            start_date__lt=max(end for _, end in periods),
+            end_date__gt=min(start for start, _ in periods)
+        ).select_related('user').order_by('created_at')[:waitlist_option('MATCH_LIMIT')]
+
+        for entry in candidates:
+            for car in cars.values():
+                if entry.car_id not in (None, car.id):
+                    continue
+                if entry.car_id is None and (entry.brand, entry.model) != (car.brand, car.model):
+                    continue
+                if not any(entry.start_date < end and entry.end_date > start for start, end in freed[car.id]):
+                    continue
+                if cls.fulfil(entry, car):
+                    report['booked' if entry.auto_book else 'notified'].append(entry.id)
+                    break
+        return report
+
+    @staticmethod
+    def fulfil(entry: WaitlistEntry, car: Car) -> bool:
+        """
+        Réserve `car` pour la demande (auto_book) ou la lui signale si le
+        créneau est libre. La demande est réclamée par un UPDATE
+        conditionnel : un rapprochement concurrent ne la sert pas deux fois.
+        """
+        now = timezone.now()
         try:
-            reservation = Reservation.objects.get(id=reservation_id)
-        except Reservation.DoesNotExist:
-            raise ValidationError(f"Réservation #{reservation_id} introuvable.")
-        
-        if reservation.status == ReservationStatus.CANCELLED:
-            raise ValidationError("Cette réservation est déjà annulée.")
-        
-        reservation.status = ReservationStatus.CANCELLED
-        reservation.save()
-        return reservation
\ No newline at end of file
+            with transaction.atomic():
+                claimed = WaitlistEntry.objects.filter(
+                    id=entry.id, status=WaitlistStatus.WAITING
+                ).update(
+                    status=WaitlistStatus.BOOKED if entry.auto_book else WaitlistStatus.NOTIFIED,
+                    matched_car=car,
+                    matched_at=now
+                )
+                if not claimed:
+                    return False
+
+                if entry.auto_book:
+                    reservation = ReservationService.create_reservation(
+                        entry.user, car.id, entry.start_date, entry.end_date, entry.purpose
+                    )
+                    WaitlistEntry.objects.filter(id=entry.id).update(reservation=reservation)
+                else:
+                    ReservationService.check_reservation_overlap(car.id, entry.start_date, entry.end_date)
+                    NotificationService.enqueue_waitlist([entry.id])
+        except ValidationError:
+            # Créneau repris entre-temps (chevauchement) : la demande reste en attente
+            return False
+        return True
+
+    @staticmethod
+    def expire() -> int:
+        """Clôt les demandes dont la période a commencé sans rapprochement."""
+        return WaitlistEntry.objects.filter(
+            status=WaitlistStatus.WAITING,
+            start_date__lte=timezone.now()
+        ).update(status=WaitlistStatus.EXPIRED)
+
+
+class ReservationReassignmentService:
+    """
+    Réaffectation des réservations à venir des véhicules indisponibles
+    (maintenance, indisponible) vers des véhicules disponibles de même
+    marque et modèle.
+
+    Chaque groupe marque/modèle est résolu en une passe, en mémoire : les
+    réservations déplacées sont triées par date de fin (ordre du glouton
+    optimal en ordonnancement d'intervalles) et chacune est placée sur le
+    véhicule compatible libre dont le créneau est le plus serré (meilleur
+    ajustement), ce qui préserve les grands créneaux pour les suivantes.
+    """
+    DISPLACED_CAR_STATUSES = [CarStatus.MAINTENANCE, CarStatus.UNAVAILABLE]
+
+    @staticmethod
+    def best_fit(calendars: dict, start: datetime, end: datetime) -> Optional[int]:
+        """
+        Véhicule libre sur [start, end[ dont la réservation précédente se
+        termine le plus tard.
+
+        Args:
+            calendars: car_id -> (débuts triés, fins triées) de réservations
+                ne se chevauchant pas
+        """
+        best, best_gap_start = None, None
+        for car_id, (starts, ends) in calendars.items():
+            index = bisect_left(starts, end)
+            if index and ends[index - 1] > start:
+                continue
+            gap_start = ends[index - 1] if index else datetime.min.replace(tzinfo=start.tzinfo)
+            if best is None or gap_start > best_gap_start:
+                best, best_gap_start = car_id, gap_start
+        return best
+
+    @classmethod
+    def plan(cls, displaced: List[dict], calendars_by_group: dict) -> tuple:
+        """
+        Calcule les déplacements sans rien écrire.
+
+        Returns:
+            (liste de (réservation, car_id cible), réservations non placées)
+        """
+        moves, unplaced = [], []
+        for reservation in sorted(displaced, key=lambda r: (r['end_date'], r['start_date'], r['id'])):
+            calendars = calendars_by_group.get((reservation['car__brand'], reservation['car__model']), {})
+            car_id = cls.best_fit(calendars, reservation['start_date'], reservation['end_date'])
+            if car_id is None:
+                unplaced.append(reservation)
+                continue
+            starts, ends = calendars[car_id]
+            index = bisect_left(starts, reservation['start_date'])
+            starts.insert(index, reservation['start_date'])
+            ends.insert(index, reservation['end_date'])
+            moves.append((reservation, car_id))
+        return moves, unplaced
+
+    @classmethod
+    @transaction.atomic
+    def reassign(
+        cls,
+        car_ids: Optional[List[int]] = None,
+        dry_run: bool = False,
+        hold_unplaced: bool = False,
+        actor=None
+    ) -> dict:
+        """
+        Réaffecte les réservations confirmées à venir des véhicules
+        indisponibles (limités à `car_ids` si fourni), en une transaction.
+
+        Args:
+            hold_unplaced: met en attente (PENDING) les réservations non placées
+
+        Returns:
+            {'moved': [...], 'unplaced': [...]}
+        """
+        now = timezone.now()
+        sources = Car.objects.filter(status__in=cls.DISPLACED_CAR_STATUSES)
+        if car_ids is not None:
+            sources = sources.filter(id__in=car_ids)
+        sources = list(sources.values('id', 'brand', 'model'))
+        groups = {(car['brand'], car['model']) for car in sources}
+        if not groups:
+            return {'moved': [], 'unplaced': []}
+
+        group_filter = Q()
+        for brand, model in groups:
+            group_filter |= Q(brand=brand, model=model)
+
+        # Verrou sur les véhicules source et cible, dans un ordre stable
+        source_ids = [car['id'] for car in sources]
+        locked = Car.objects.filter(Q(id__in=source_ids) | (group_filter & Q(status=CarStatus.AVAILABLE)))
+        target_cars = {
+            car.id: (car.brand, car.model)
+            for car in locked.select_for_update().order_by('id')
+            if car.status == CarStatus.AVAILABLE
+        }
+
+        displaced = list(
+            Reservation.objects.filter(
+                car_id__in=source_ids,
+                status=ReservationStatus.CONFIRMED,
+                start_date__gt=now
+            ).values('id', 'user_id', 'car_id', 'car__brand', 'car__model', 'start_date', 'end_date')
+        )
+
+        calendars_by_group = {}
+        for car_id, group in target_cars.items():
+            calendars_by_group.setdefault(group, {})[car_id] = ([], [])
+        busy = Reservation.objects.blocking(now).filter(
+            car_id__in=target_cars,
+            end_date__gt=now
+        ).order_by('start_date').values_list('car_id', 'start_date', 'end_date')
+        for car_id, start, end in busy:
+            starts, ends = calendars_by_group[target_cars[car_id]][car_id]
+            starts.append(start)
+            ends.append(end)
+
+        moves, unplaced = cls.plan(displaced, calendars_by_group)
+
+        if not dry_run and moves:
+            cls._apply(moves, now, actor)
+        if not dry_run and hold_unplaced and unplaced:
+            ReservationBulkService.set_status(
+                Reservation.objects.filter(id__in=[r['id'] for r in unplaced]),
+                ReservationStatus.PENDING,
+                actor=actor
+            )
+
+        return {
+            'moved': [
+                {'reservation_id': reservation['id'], 'from_car': reservation['car_id'], 'to_car': car_id}
+                for reservation, car_id in moves
+            ],
+            'unplaced': [
+                {
+                    'reservation_id': reservation['id'],
+                    'car_id': reservation['car_id'],
+                    'start_date': reservation['start_date'],
+                    'end_date': reservation['end_date'],
+                }
+                for reservation in unplaced
+            ],
+        }
+
+    @staticmethod
+    def _apply(moves: list, now: datetime, actor) -> None:
+        """Tous les déplacements en un seul UPDATE (CASE sur l'id)."""
+        Reservation.objects.filter(
+            id__in=[reservation['id'] for reservation, _ in moves]
+        ).update(
+            car_id=Case(
+                *[When(id=reservation['id'], then=Value(car_id)) for reservation, car_id in moves]
+            ),
+            version=F('version') + 1,
+            updated_at=now
+        )
+
+        for reservation, car_id in moves:
+            audit_log.record(
+                reservation['id'], car_id, ReservationEventType.UPDATED,
+                actor_id=getattr(actor, 'id', None),
+                changes={'car_id': [reservation['car_id'], car_id]}
+            )
+        car_ids = sorted({car for reservation, car_id in moves for car in (reservation['car_id'], car_id)})
+        CarStateService.refresh(car_ids)
+        reservations_changed.send(
+            sender=Reservation,
+            user_ids=sorted({reservation['user_id'] for reservation, _ in moves}),
+            car_ids=car_ids
+        )
+        NotificationService.enqueue(
+            NotificationKind.RESERVATION_REASSIGNED, [reservation['id'] for reservation, _ in moves]
+        )
+
+
+class ReservationArchiveService:
+    """
+    Archivage des réservations terminées.
+
+    Une réservation dont la date de fin est passée ne peut plus entrer en
+    conflit avec une nouvelle réservation (pas de réservation dans le passé) :
+    elle est déplacée par lots vers `reservations_archive`, ce qui garde la
+    table `reservations` (et ses index) limitée aux réservations utiles.
+    """
+
+    HISTORY_FIELDS = [
+        'id', 'user_id', 'car_id', 'start_date', 'end_date',
+        'status', 'purpose', 'created_at'
+    ]
+
+    @staticmethod
+    def archived_status(status: str) -> str:
+        """Une réservation confirmée et terminée est archivée comme COMPLETED."""
+        if status == ReservationStatus.CONFIRMED:
+            return ReservationStatus.COMPLETED
+        return status
+
+    @classmethod
+    def archive_batch(cls, before: datetime, batch_size: int = 1000) -> int:
+        """
+        Déplace au plus `batch_size` réservations terminées avant `before`.
+
+        Returns:
+            Nombre de réservations archivées
+        """
+        if connection.vendor == 'postgresql':
+            return cls._archive_batch_postgresql(before, batch_size)
+
+        with transaction.atomic():
+            rows = list(
+                Reservation.objects.select_for_update()
+                .filter(end_date__lt=before)
+                .order_by('end_date')
+                .values_list('id', 'user_id', 'car_id')[:batch_size]
+            )
+            if not rows:
+                return 0
+
+            ids = [row[0] for row in rows]
+            batch = Reservation.objects.filter(id__in=ids)
+            ReservationArchive.objects.bulk_create([
+                ReservationArchive(
+                    id=reservation.id,
+                    user_id=reservation.user_id,
+                    car_id=reservation.car_id,
+                    start_date=reservation.start_date,
+                    end_date=reservation.end_date,
+                    status=cls.archived_status(reservation.status),
+                    purpose=reservation.purpose,
+                    created_at=reservation.created_at,
+                    updated_at=reservation.updated_at,
+                )
+                for reservation in batch.order_by()
+            ])
+            # DELETE direct, comme sur PostgreSQL : ni cascade ni signal par
+            # ligne, les effets de bord sont appliqués par _detach
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM reservations WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                    ids
+                )
+            cls._detach(rows)
+
+        return len(rows)
+
+    @classmethod
+    def _archive_batch_postgresql(cls, before: datetime, batch_size: int) -> int:
+        """Déplacement en une seule requête (DELETE ... RETURNING + INSERT)."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                """
+                WITH moved AS (
+                    DELETE FROM reservations
+                    WHERE id IN (
+                        SELECT id FROM reservations
+                        WHERE end_date < %s
+                        ORDER BY end_date
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, user_id, car_id, start_date, end_date,
+                              status, purpose, created_at, updated_at
+                )
+                INSERT INTO reservations_archive (
+                    id, user_id, car_id, start_date, end_date,
+                    status, purpose, created_at, updated_at, archived_at
+                )
+                SELECT id, user_id, car_id, start_date, end_date,
+                       CASE WHEN status = %s THEN %s ELSE status END,
+                       purpose, created_at, updated_at, NOW()
+                FROM moved
+                RETURNING id, user_id, car_id
+                """,
+                [
+                    before, batch_size,
+                    ReservationStatus.CONFIRMED, ReservationStatus.COMPLETED
+                ]
+            )
+            rows = cursor.fetchall()
+            if rows:
+                cls._detach(rows)
+            return len(rows)
+
+    @staticmethod
+    def _detach(rows: list) -> None:
+        """
+        Effets de bord de l'archivage d'un lot, identiques sur tous les
+        moteurs : références sans contrainte remises à NULL (véhicule,
+        liste d'attente), suppressions signalées au flux de synchronisation
+        et caches invalidés.
+
+        Args:
+            rows: (id, user_id, car_id) des réservations archivées
+        """
+        ids = [row[0] for row in rows]
+        car_ids = sorted({row[2] for row in rows})
+        WaitlistEntry.objects.filter(reservation_id__in=ids).update(reservation=None)
+        # Recalcul complet : current_reservation ne peut plus désigner une
+        # réservation archivée, même si l'état du véhicule était périmé
+        CarStateService.refresh(car_ids)
+        now = timezone.now()
+        Tombstone.objects.bulk_create([
+            Tombstone(kind=SyncKind.RESERVATION, object_id=reservation_id, user_id=user_id, deleted_at=now)
+            for reservation_id, user_id, _ in rows
+        ])
+        reservations_changed.send(
+            sender=Reservation,
+            user_ids=sorted({row[1] for row in rows}),
+            car_ids=car_ids
+        )
+
+    @classmethod
+    def archive(cls, before: datetime, batch_size: int = 1000) -> int:
+        """Archive toutes les réservations terminées avant `before`, par lots."""
+        total = 0
+        while True:
+            moved = cls.archive_batch(before, batch_size)
+            total += moved
+            if moved < batch_size:
+                return total
+
+    @classmethod
+    def history(cls, user_id: Optional[int] = None, car_id: Optional[int] = None):
+        """
+        Lecture unifiée des réservations courantes et archivées.
+
+        Returns:
+            QuerySet de dictionnaires (UNION ALL), trié par date de début
+            décroissante, avec un champ `archived`.
+        """
+        filters = {}
+        if user_id is not None:
+            filters['user_id'] = user_id
+        if car_id is not None:
+            filters['car_id'] = car_id
+
+        live = Reservation.objects.filter(**filters).annotate(
+            archived=Value(False, output_field=BooleanField())
+        ).values(*cls.HISTORY_FIELDS, 'archived').order_by()
+
+        archived = ReservationArchive.objects.filter(**filters).annotate(
+            archived=Value(True, output_field=BooleanField())
+        ).values(*cls.HISTORY_FIELDS, 'archived').order_by()
+
+        return live.union(archived, all=True).order_by('-start_date')
+
+
+class DashboardService:
+    """
+    Compteurs du tableau de bord, calculés par agrégats conditionnels.
+
+    La partie utilisateur et la partie parc sont mises en cache séparément,
+    sous des clés versionnées : une écriture (signaux) incrémente la version
+    après le commit, ce qui rend les anciennes entrées inaccessibles. La
+    courte durée de vie borne la dérive liée au simple passage du temps
+    (une réservation à venir devient en cours sans aucune écriture).
+    """
+    CACHE_TIMEOUT = 60
+    UPCOMING_LIMIT = 5
+    FLEET_VERSION_KEY = 'dashboard:fleet:version'
+    ACTIVE_STATUSES = [ReservationStatus.CONFIRMED, ReservationStatus.PENDING]
+
+    @staticmethod
+    def user_version_key(user_id: int) -> str:
+        return f"dashboard:user:{user_id}:version"
+
+    @staticmethod
+    def _version(key: str) -> int:
+        return cache.get_or_set(key, 1, None)
+
+    @classmethod
+    def invalidate(cls, user_ids: Optional[List[int]] = None) -> None:
+        """Invalide le parc et, le cas échéant, les tableaux de bord des utilisateurs."""
+        keys = [cls.FLEET_VERSION_KEY] + [cls.user_version_key(user_id) for user_id in user_ids or []]
+
+        def bump():
+            for key in keys:
+                try:
+                    cache.incr(key)
+                except ValueError:
+                    # Version absente : aucune entrée ne peut l'utiliser
+                    pass
+
+        transaction.on_commit(bump)
+
+    @classmethod
+    def get_user_summary(cls, user) -> dict:
+        """Compteurs de l'utilisateur et prochaines réservations."""
+        key = f"dashboard:user:{user.id}:{cls._version(cls.user_version_key(user.id))}"
+        summary = cache.get(key)
+        if summary is not None:
+            return summary
+
+        now = timezone.now()
+        active = Q(status__in=cls.ACTIVE_STATUSES)
+        reservations = Reservation.objects.filter(user=user)
+        summary = reservations.aggregate(
+            upcoming=Count('id', filter=active & Q(start_date__gt=now)),
+            active=Count('id', filter=active & Q(start_date__lte=now, end_date__gt=now)),
+            cancelled=Count('id', filter=Q(status=ReservationStatus.CANCELLED)),
+        )
+        summary['next'] = list(
+            reservations.filter(active, start_date__gt=now)
+            .select_related('car')
+            .order_by('start_date')[:cls.UPCOMING_LIMIT]
+        )
+
+        cache.set(key, summary, cls.CACHE_TIMEOUT)
+        return summary
+
+    @classmethod
+    def get_fleet_summary(cls) -> dict:
+        """Compteurs du parc, dont les véhicules libres à l'instant présent."""
+        key = f"dashboard:fleet:{cls._version(cls.FLEET_VERSION_KEY)}"
+        summary = cache.get(key)
+        if summary is not None:
+            return summary
+
+        summary = Car.objects.aggregate(
+            total=Count('id'),
+            available_now=Count('id', filter=CarStateService.available_now_q(timezone.now())),
+            in_use=Count('id', filter=Q(status=CarStatus.IN_USE)),
+            maintenance=Count('id', filter=Q(status=CarStatus.MAINTENANCE)),
+            unavailable=Count('id', filter=Q(status=CarStatus.UNAVAILABLE)),
+        )
+
+        cache.set(key, summary, cls.CACHE_TIMEOUT)
+        return summary
+
+
+class CarStateService:
+    """
+    État dénormalisé des véhicules : réservation en cours, début de la
+    prochaine réservation et fin de la période libre (`free_until`).
+
+    `refresh` est appelé par le service des réservations dans la
+    transaction de chaque écriture ; les véhicules sont verrouillés avant
+    la lecture des réservations, ce qui ordonne les recalculs concurrents.
+    Le simple passage du temps (une réservation commence ou se termine)
+    ne déclenche aucune écriture ; les filtres comparent donc l'état à
+    l'instant présent : une réservation en cours dont la fin
+    (`current_reservation_end`) est passée ne bloque plus le véhicule, et
+    un début de prochaine réservation atteint le rend occupé. `reconcile`
+    (périodique) remet ensuite les colonnes elles-mêmes à jour : une
+    prochaine réservation commencée puis terminée entre deux passages
+    laisse le véhicule occupé jusqu'au suivant. Une suppression directe
+    (admin) recalcule l'état par le signal post_delete.
+    """
+    FIELDS = [
+        'current_reservation_id', 'current_reservation_end', 'next_reservation_start', 'free_until'
+    ]
+
+    @staticmethod
+    def available_now_q(now: datetime) -> Q:
+        """Véhicules disponibles et libres à `now` (filtre indexé sur `cars`)."""
+        return (
+            Q(status=CarStatus.AVAILABLE)
+            & (Q(current_reservation_end__isnull=True) | Q(current_reservation_end__lte=now))
+            & (Q(next_reservation_start__isnull=True) | Q(next_reservation_start__gt=now))
+        )
+
+    @classmethod
+    def free_until_q(cls, now: datetime, until: datetime) -> Q:
+        """Véhicules libres dès maintenant et au moins jusqu'à `until`."""
+        return cls.available_now_q(now) & (
+            Q(next_reservation_start__isnull=True) | Q(next_reservation_start__gte=until)
+        )
+
+    @classmethod
+    def compute(cls, car_ids: List[int], now: datetime) -> dict:
+        """
+        {car_id: (current_reservation_id, current_reservation_end,
+        next_reservation_start, free_until)} en une requête.
+        """
+        state = {car_id: [None, None, None] for car_id in car_ids}
+        reservations = Reservation.objects.blocking(now).filter(
+            car_id__in=car_ids,
+            end_date__gt=now
+        ).order_by('car_id', 'start_date').values_list('car_id', 'id', 'start_date', 'end_date')
+
+        for car_id, reservation_id, start, end in reservations:
+            current, _, next_start = state[car_id]
+            if start <= now:
+                if current is None:
+                    state[car_id][0:2] = [reservation_id, end]
+            elif next_start is None:
+                state[car_id][2] = start
+
+        return {
+            car_id: (current, current_end, next_start, next_start if current is None else None)
+            for car_id, (current, current_end, next_start) in state.items()
+        }
+
+    @classmethod
+    @transaction.atomic
+    def refresh(cls, car_ids: List[int]) -> int:
+        """
+        Recalcule l'état des véhicules donnés ; seules les lignes modifiées
+        sont écrites.
+
+        Returns:
+            Nombre de véhicules mis à jour
+        """
+        if not car_ids:
+            return 0
+        cars = list(
+            Car.objects.select_for_update().filter(id__in=car_ids).order_by('id').only('id', *cls.FIELDS)
+        )
+        now = timezone.now()
+        state = cls.compute([car.id for car in cars], now)
+
+        changed = []
+        for car in cars:
+            values = state[car.id]
+            if tuple(getattr(car, field) for field in cls.FIELDS) != values:
+                for field, value in zip(cls.FIELDS, values):
+                    setattr(car, field, value)
+                # bulk_update n'applique pas auto_now : daté pour le flux de synchronisation
+                car.updated_at = now
+                changed.append(car)
+        if changed:
+            Car.objects.bulk_update(changed, [*cls.FIELDS, 'updated_at'])
+        return len(changed)
+
+    @classmethod
+    def reconcile(cls, batch_size: int = 500) -> int:
+        """
+        Recalcule l'état de tout le parc, par lots d'identifiants (une
+        transaction par lot).
+
+        Returns:
+            Nombre de véhicules corrigés
+        """
+        total = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Car.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            total += cls.refresh(ids)
+            last_id = ids[-1]
+        if total:
+            DashboardService.invalidate()
+        return total
@@ -0,0 +1,47 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from apps.cars.models import Car
+from .models import Reservation
+
+# Envoyé par le service après une écriture par UPDATE (qui ne déclenche pas
+# post_save). Arguments : user_ids, car_ids
+reservations_changed = Signal()
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def reservation_saved(sender, instance, **kwargs):
+    reservations_changed.send(
+        sender=Reservation, user_ids=[instance.user_id], car_ids=[instance.car_id]
+    )
+
+
+@receiver(post_delete, sender=Reservation)
+def reservation_deleted(sender, instance, **kwargs):
+    # Suppression hors service (admin, shell) : journal d'audit et état
+    # dénormalisé du véhicule recalculé dans la même transaction
+    from .services import CarStateService, ReservationService
+    ReservationService.record_deletion(instance, actor_id=getattr(instance, 'deleted_by', None))
+    CarStateService.refresh([instance.car_id])
+
+
+@receiver(reservations_changed)
+def invalidate_dashboards(sender, user_ids, car_ids, **kwargs):
+    from .services import DashboardService
+    DashboardService.invalidate(user_ids=user_ids)
+
+
+@receiver(reservations_changed)
+def invalidate_calendar_feeds(sender, user_ids, car_ids, **kwargs):
+    from .ical import CalendarFeedService
+    CalendarFeedService.invalidate(user_ids=user_ids, car_ids=car_ids)
+
+
+@receiver(post_save, sender=Car)
+@receiver(post_delete, sender=Car)
+def car_saved(sender, instance, **kwargs):
+    from .ical import CalendarFeedService
+    from .services import DashboardService
+    DashboardService.invalidate()
+    CalendarFeedService.invalidate(car_ids=[instance.id])
@@ -1,13 +1,28 @@
 from rest_framework.test import APIClient
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.management import call_command
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from datetime import timedelta
+from unittest import mock
 
 from apps.cars.models import CarStatus, Car
-from apps.reservations.models import ReservationStatus
-from apps.reservations.services import ReservationService
+from apps.notifications.models import Notification, NotificationKind
+from apps.reservations.audit import AuditLog, replay
+from apps.reservations.models import (
+    Reservation, ReservationArchive, ReservationEvent, ReservationEventType, ReservationStatus,
+    WaitlistEntry, WaitlistStatus
+)
+from apps.reservations.services import (
+    ReservationService, ReservationArchiveService, ReservationBulkService,
+    ReservationReassignmentService, DashboardService, WaitlistService
+)
+from apps.sync.models import Tombstone
 
 User = get_user_model()
 
@@ -216,4 +231,1387 @@ class ReservationViewSetTestCase(TestCase):
         
         response = self.client.post('/api/reservations/', data, format='json')
         self.assertEqual(response.status_code, 400)
-        self.assertIn('error', response.data)
\ No newline at end of file
+        self.assertIn('error', response.data)
+
+class ReservationAdminTestCase(TestCase):
+    """Tests de l'admin des réservations."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='adminpass123'
+        )
+        self.client.force_login(self.admin)
+
+        self.car = Car.objects.create(
+            registration_number='ADM-001',
+            brand='Toyota',
+            model='Hilux',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        self.start = timezone.now() + timedelta(days=1)
+
+    def _create_reservations(self, count, offset=0):
+        for i in range(offset, offset + count):
+            ReservationService.create_reservation(
+                user=self.admin,
+                car_id=self.car.id,
+                start_date=self.start + timedelta(days=i),
+                end_date=self.start + timedelta(days=i, hours=2)
+            )
+
+    def _changelist_queries(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/admin/reservations/reservation/', params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_changelist_query_count_is_constant(self):
+        """Test: le nombre de requêtes ne dépend pas du nombre de lignes."""
+        self._create_reservations(2)
+        few = self._changelist_queries()
+        self._create_reservations(10, offset=2)
+        self.assertEqual(self._changelist_queries(), few)
+
+    def test_changelist_autocomplete_filter(self):
+        """Test: filtre par véhicule via l'autocomplete."""
+        self._create_reservations(2)
+        response = self.client.get(
+            '/admin/reservations/reservation/', {'car__id__exact': self.car.id}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'autocomplete-filter-car')
+        self.assertEqual(len(response.context['cl'].result_list), 2)
+
+    def test_cancel_action_is_set_based(self):
+        """Test: l'action d'annulation s'exécute en un seul UPDATE."""
+        self._create_reservations(3)
+        ids = list(Reservation.objects.values_list('id', flat=True))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post('/admin/reservations/reservation/', {
+                'action': 'cancel_selected',
+                '_selected_action': ids,
+            })
+
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "reservations"')]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(
+            Reservation.objects.exclude(status=ReservationStatus.CANCELLED).exists()
+        )
+
+
+    @staticmethod
+    def _dates(start, end):
+        """Champs date/heure séparés du formulaire d'admin."""
+        fields = {}
+        for name, value in (('start_date', start), ('end_date', end)):
+            value = timezone.localtime(value)
+            fields[f'{name}_0'] = value.strftime('%Y-%m-%d')
+            fields[f'{name}_1'] = value.strftime('%H:%M:%S')
+        return fields
+
+    def _change(self, reservation, start=None, end=None, **data):
+        return self.client.post(f'/admin/reservations/reservation/{reservation.id}/change/', {
+            **self._dates(start or reservation.start_date, end or reservation.end_date),
+            'purpose': reservation.purpose,
+            **data,
+        })
+
+    def test_change_form_goes_through_service(self):
+        """Test: dates modifiées via le service (version, contrôle), statut en lecture seule."""
+        self._create_reservations(2)
+        first, second = Reservation.objects.order_by('start_date')
+        original_start = first.start_date
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._change(first, status=ReservationStatus.CANCELLED, purpose='Révision')
+        self.assertEqual(response.status_code, 302)
+        first.refresh_from_db()
+        self.assertEqual(first.status, ReservationStatus.CONFIRMED)
+        self.assertEqual(first.purpose, 'Révision')
+        self.assertEqual(first.version, 2)
+        self.assertEqual(first.start_date, original_start)
+
+        # Déplacée sur la réservation suivante : refusée dans le formulaire
+        response = self._change(first, start=second.start_date, end=second.start_date + timedelta(hours=1))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f'Conflit détecté avec la réservation #{second.id}')
+        first.refresh_from_db()
+        self.assertEqual(first.version, 2)
+
+    def test_add_form_goes_through_service(self):
+        """Test: création depuis l'admin → contrôles et état du véhicule du service."""
+        response = self.client.post('/admin/reservations/reservation/add/', {
+            'user': self.admin.id,
+            'car': self.car.id,
+            **self._dates(self.start, self.start + timedelta(hours=2)),
+            'purpose': '',
+        })
+        self.assertEqual(response.status_code, 302)
+        reservation = Reservation.objects.get()
+        self.assertEqual(reservation.status, ReservationStatus.CONFIRMED)
+        self.car.refresh_from_db()
+        self.assertEqual(self.car.next_reservation_start, reservation.start_date)
+
+
+class ReservationArchiveTestCase(TestCase):
+    """Tests de l'archivage des réservations terminées."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='archiver',
+            email='archiver@example.com',
+            password='testpass123'
+        )
+        self.car = Car.objects.create(
+            registration_number='ARC-001',
+            brand='Ford',
+            model='Ranger',
+            year=2022,
+            status=CarStatus.AVAILABLE
+        )
+        now = timezone.now()
+
+        # Réservations passées créées directement (le service refuse le passé)
+        self.old = [
+            Reservation.objects.create(
+                user=self.user,
+                car=self.car,
+                start_date=now - timedelta(days=200 + i),
+                end_date=now - timedelta(days=199 + i),
+                status=status
+            )
+            for i, status in enumerate([
+                ReservationStatus.CONFIRMED,
+                ReservationStatus.CANCELLED,
+                ReservationStatus.COMPLETED,
+            ])
+        ]
+        self.upcoming = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=now + timedelta(days=1),
+            end_date=now + timedelta(days=2)
+        )
+        self.before = now - timedelta(days=90)
+
+    def test_archive_moves_only_finished_reservations(self):
+        """Test: seules les réservations terminées avant le seuil sont déplacées."""
+        moved = ReservationArchiveService.archive(self.before, batch_size=2)
+
+        self.assertEqual(moved, 3)
+        self.assertEqual(
+            list(Reservation.objects.values_list('id', flat=True)),
+            [self.upcoming.id]
+        )
+        archived = ReservationArchive.objects.get(id=self.old[0].id)
+        self.assertEqual(archived.status, ReservationStatus.COMPLETED)
+        self.assertEqual(
+            ReservationArchive.objects.get(id=self.old[1].id).status,
+            ReservationStatus.CANCELLED
+        )
+
+    def test_history_includes_archived_reservations(self):
+        """Test: l'historique unifié lit les deux tables."""
+        ReservationArchiveService.archive(self.before)
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get('/api/reservations/history/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 4)
+        self.assertEqual(response.data[0]['id'], self.upcoming.id)
+        self.assertFalse(response.data[0]['archived'])
+        self.assertTrue(all(row['archived'] for row in response.data[1:]))
+
+    def test_archive_clears_references(self):
+        """Test: aucune référence pendante vers une réservation archivée."""
+        # État du véhicule périmé : la réservation passée est encore « en cours »
+        Car.objects.filter(id=self.car.id).update(current_reservation=self.old[0])
+        entry = WaitlistEntry.objects.create(
+            user=self.user,
+            car=self.car,
+            start_date=self.old[0].start_date,
+            end_date=self.old[0].end_date,
+            status=WaitlistStatus.BOOKED,
+            reservation=self.old[0]
+        )
+
+        ReservationArchiveService.archive(self.before)
+
+        self.car.refresh_from_db()
+        entry.refresh_from_db()
+        self.assertIsNone(self.car.current_reservation_id)
+        self.assertEqual(self.car.next_reservation_start, self.upcoming.start_date)
+        self.assertIsNone(entry.reservation_id)
+        # Une tombstone par réservation archivée, quel que soit le moteur
+        self.assertEqual(
+            sorted(Tombstone.objects.values_list('object_id', flat=True)),
+            sorted(reservation.id for reservation in self.old)
+        )
+
+
+class ReservationConcurrencyTestCase(TestCase):
+    """Tests du verrouillage optimiste."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='editor',
+            email='editor@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.car = Car.objects.create(
+            registration_number='VER-001',
+            brand='Nissan',
+            model='Patrol',
+            year=2022,
+            status=CarStatus.AVAILABLE
+        )
+        self.start = timezone.now() + timedelta(days=1)
+        self.reservation = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=self.start,
+            end_date=self.start + timedelta(days=1)
+        )
+
+    def test_update_increments_version(self):
+        """Test: chaque écriture incrémente la version."""
+        updated = ReservationService.update_reservation(
+            self.reservation.id, purpose='Nouveau motif', expected_version=1
+        )
+        self.assertEqual(updated.version, 2)
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.purpose, 'Nouveau motif')
+
+    def test_stale_update_raises(self):
+        """Test: une version périmée est refusée."""
+        ReservationService.update_reservation(self.reservation.id, purpose='A')
+
+        with self.assertRaises(ValidationError) as context:
+            ReservationService.update_reservation(
+                self.reservation.id, purpose='B', expected_version=1
+            )
+
+        self.assertEqual(context.exception.code, 'stale')
+
+    def test_cancel_is_atomic(self):
+        """Test: un échec après l'UPDATE annule aussi l'annulation."""
+        with mock.patch(
+            'apps.reservations.services.CarStateService.refresh', side_effect=RuntimeError
+        ), self.captureOnCommitCallbacks() as callbacks:
+            with self.assertRaises(RuntimeError):
+                ReservationService.cancel_reservation(self.reservation.id, actor=self.user)
+
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.status, ReservationStatus.CONFIRMED)
+        self.assertEqual(self.reservation.version, 1)
+        self.assertEqual(callbacks, [])
+
+    def test_patch_with_stale_if_match_returns_409(self):
+        """Test: If-Match périmé renvoie 409."""
+        url = f'/api/reservations/{self.reservation.id}/'
+        response = self.client.patch(url, {'purpose': 'A'}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+
+        response = self.client.patch(url, {'purpose': 'B'}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 409)
+
+    def test_patch_dates_checks_overlap(self):
+        """Test: la modification des dates vérifie toujours les chevauchements."""
+        other = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=self.start + timedelta(days=2),
+            end_date=self.start + timedelta(days=3)
+        )
+        response = self.client.patch(f'/api/reservations/{other.id}/', {
+            'start_date': (self.start + timedelta(hours=12)).isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_cancel_after_concurrent_update_returns_409(self):
+        """Test: annulation avec une version périmée refusée."""
+        ReservationService.update_reservation(self.reservation.id, purpose='A')
+
+        response = self.client.post(
+            f'/api/reservations/{self.reservation.id}/cancel/', HTTP_IF_MATCH='"1"'
+        )
+        self.assertEqual(response.status_code, 409)
+
+        response = self.client.post(f'/api/reservations/{self.reservation.id}/cancel/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], ReservationStatus.CANCELLED)
+        self.assertEqual(response.data['version'], 3)
+
+
+class ReservationSparseFieldsTestCase(TestCase):
+    """Tests de ?fields= et ?expand=."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='sparse',
+            email='sparse@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.car = Car.objects.create(
+            registration_number='SPR-001',
+            brand='Toyota',
+            model='Corolla',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        start = timezone.now() + timedelta(days=1)
+        for day in range(3):
+            ReservationService.create_reservation(
+                user=self.user,
+                car_id=self.car.id,
+                start_date=start + timedelta(days=day),
+                end_date=start + timedelta(days=day, hours=2)
+            )
+
+    def test_default_list_does_not_embed_details(self):
+        """Test: car_detail/user_detail absents par défaut."""
+        response = self.client.get('/api/reservations/')
+        self.assertNotIn('car_detail', response.data[0])
+        self.assertNotIn('user_detail', response.data[0])
+        self.assertIn('start_date', response.data[0])
+
+    def test_fields_and_expand(self):
+        """Test: champs demandés et expansion du véhicule."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/reservations/', {
+                'fields': 'id,start_date',
+                'expand': 'car',
+            })
+
+        self.assertEqual(
+            set(response.data[0]), {'id', 'start_date', 'car_detail'}
+        )
+        self.assertEqual(response.data[0]['car_detail']['brand'], 'Toyota')
+        # Une seule requête (jointure) pour la liste
+        self.assertEqual(
+            len([q for q in ctx.captured_queries if 'reservations' in q['sql']]), 1
+        )
+
+    def test_car_fields(self):
+        """Test: ?fields= sur les véhicules, champ calculé compris."""
+        response = self.client.get('/api/cars/', {'fields': 'id,status_display'})
+        self.assertEqual(set(response.data[0]), {'id', 'status_display'})
+        self.assertEqual(response.data[0]['status_display'], 'Disponible')
+
+
+class DashboardTestCase(TestCase):
+    """Tests du tableau de bord agrégé."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='dash',
+            email='dash@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.car = Car.objects.create(
+            registration_number='DSH-001',
+            brand='Toyota',
+            model='Hilux',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        Car.objects.create(
+            registration_number='DSH-002',
+            brand='Ford',
+            model='Ranger',
+            year=2021,
+            status=CarStatus.MAINTENANCE
+        )
+        now = timezone.now()
+        # En cours (créée directement : le service refuse le passé)
+        Reservation.objects.create(
+            user=self.user,
+            car=self.car,
+            start_date=now - timedelta(hours=1),
+            end_date=now + timedelta(hours=1)
+        )
+        self.upcoming = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=now + timedelta(days=1),
+            end_date=now + timedelta(days=2)
+        )
+
+    def test_dashboard_counts(self):
+        """Test: compteurs calculés par agrégats."""
+        response = self.client.get('/api/dashboard/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['reservations'], {'upcoming': 1, 'active': 1, 'cancelled': 0})
+        self.assertEqual(response.data['cars']['total'], 2)
+        self.assertEqual(response.data['cars']['available_now'], 0)
+        self.assertEqual(response.data['cars']['maintenance'], 1)
+        self.assertEqual(response.data['next_reservations'][0]['id'], self.upcoming.id)
+        self.assertIn('car_detail', response.data['next_reservations'][0])
+
+    def test_dashboard_cached_and_invalidated_on_cancel(self):
+        """Test: mis en cache puis invalidé par une annulation."""
+        self.client.get('/api/dashboard/')
+        with self.assertNumQueries(0):
+            DashboardService.get_user_summary(self.user)
+            DashboardService.get_fleet_summary()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ReservationService.cancel_reservation(self.upcoming.id)
+
+        response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.data['reservations']['cancelled'], 1)
+        self.assertEqual(response.data['reservations']['upcoming'], 0)
+
+    @override_settings(CACHES={
+        alias: {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'shared_cache'}
+        for alias in ('default', 'worker')
+    })
+    def test_invalidation_seen_by_other_processes(self):
+        """Test: invalidé par un processus, le cache d'un autre n'est plus servi"""
+        call_command('createcachetable', verbosity=0)
+        # Deux instances sur le même stockage, comme deux workers
+        self.assertIsNot(caches['default'], caches['worker'])
+        self.assertEqual(DashboardService.get_user_summary(self.user)['upcoming'], 1)
+
+        with mock.patch('apps.reservations.services.cache', caches['worker']):
+            with self.captureOnCommitCallbacks(execute=True):
+                ReservationService.cancel_reservation(self.upcoming.id)
+
+        self.assertEqual(DashboardService.get_user_summary(self.user)['upcoming'], 0)
+
+
+class ReservationAuditTestCase(TestCase):
+    """Tests du journal d'audit."""
+
+    def setUp(self):
+        self.log = AuditLog(batch_size=2, background=False)
+        patcher = mock.patch('apps.reservations.services.audit_log', self.log)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(
+            username='auditor',
+            email='auditor@example.com',
+            password='testpass123'
+        )
+        self.car = Car.objects.create(
+            registration_number='AUD-001',
+            brand='Toyota',
+            model='Hilux',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        self.start = timezone.now() + timedelta(days=1)
+
+    def test_events_buffered_until_commit_then_flushed(self):
+        """Test: rien n'est écrit dans la transaction métier."""
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation = ReservationService.create_reservation(
+                user=self.user,
+                car_id=self.car.id,
+                start_date=self.start,
+                end_date=self.start + timedelta(hours=2)
+            )
+            self.assertEqual(self.log.pending(), 0)
+
+        self.assertEqual(self.log.pending(), 1)
+        self.assertFalse(ReservationEvent.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ReservationService.update_reservation(
+                reservation.id, end_date=self.start + timedelta(hours=3), actor=self.user
+            )
+            ReservationService.cancel_reservation(reservation.id, actor=self.user)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(self.log.flush(), 3)
+
+    def test_replay_rebuilds_state(self):
+        """Test: l'historique reconstruit l'état final."""
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation = ReservationService.create_reservation(
+                user=self.user,
+                car_id=self.car.id,
+                start_date=self.start,
+                end_date=self.start + timedelta(hours=2),
+                purpose='Mission'
+            )
+            ReservationService.update_reservation(
+                reservation.id, purpose='Mission modifiée', actor=self.user
+            )
+            ReservationService.cancel_reservation(reservation.id, actor=self.user)
+        self.log.flush()
+
+        history = replay(reservation.id)
+
+        self.assertEqual(
+            [event.event_type for event, _ in history],
+            [ReservationEventType.CREATED, ReservationEventType.UPDATED, ReservationEventType.CANCELLED]
+        )
+        _, state = history[-1]
+        self.assertEqual(state['purpose'], 'Mission modifiée')
+        self.assertEqual(state['status'], ReservationStatus.CANCELLED)
+        self.assertEqual(history[1][0].changes['purpose'], ['Mission', 'Mission modifiée'])
+
+    def test_admin_edit_and_delete_audited(self):
+        """Test: modification et suppression depuis l'admin tracées avec leur auteur."""
+        admin_user = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        self.client.force_login(admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation = ReservationService.create_reservation(
+                user=self.user,
+                car_id=self.car.id,
+                start_date=self.start,
+                end_date=self.start + timedelta(hours=2),
+                purpose='Mission'
+            )
+        url = f'/admin/reservations/reservation/{reservation.id}/'
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url + 'change/', {
+                **ReservationAdminTestCase._dates(reservation.start_date, reservation.end_date),
+                'purpose': 'Mission modifiée',
+            })
+        self.assertEqual(response.status_code, 302)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url + 'delete/', {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        self.log.flush()
+
+        events = list(ReservationEvent.objects.filter(reservation_id=reservation.id))
+        self.assertEqual(
+            [(event.event_type, event.actor_id) for event in events],
+            [
+                (ReservationEventType.CREATED, self.user.id),
+                (ReservationEventType.UPDATED, admin_user.id),
+                (ReservationEventType.DELETED, admin_user.id),
+            ]
+        )
+        self.assertEqual(events[1].changes, {'purpose': ['Mission', 'Mission modifiée']})
+        self.assertEqual(replay(reservation.id)[-1][1]['purpose'], 'Mission modifiée')
+
+
+class ReservationBulkStatusTestCase(TestCase):
+    """Tests des changements de statut en masse."""
+
+    def setUp(self):
+        self.log = AuditLog(background=False)
+        patcher = mock.patch('apps.reservations.services.audit_log', self.log)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.staff = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='adminpass123'
+        )
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.car = Car.objects.create(
+            registration_number='BLK-001',
+            brand='Toyota',
+            model='Hilux',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        self.other_car = Car.objects.create(
+            registration_number='BLK-002',
+            brand='Nissan',
+            model='Patrol',
+            year=2022,
+            status=CarStatus.AVAILABLE
+        )
+        self.start = timezone.now() + timedelta(days=1)
+        self.reservations = [
+            ReservationService.create_reservation(
+                user=self.user,
+                car_id=car.id,
+                start_date=self.start + timedelta(days=day),
+                end_date=self.start + timedelta(days=day, hours=2)
+            )
+            for car, day in [(self.car, 0), (self.car, 5), (self.other_car, 0)]
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.staff)
+
+    def test_cancel_by_car_and_date_range(self):
+        """Test: un seul UPDATE, audit et notifications pour les réservations touchées"""
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post('/api/reservations/bulk_status/', {
+                    'status': ReservationStatus.CANCELLED,
+                    'car_id': self.car.id,
+                    'date_to': (self.start + timedelta(days=2)).isoformat(),
+                }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        first = self.reservations[0]
+        self.assertEqual(response.data['ids'], [first.id])
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "reservations"')]
+        self.assertEqual(len(updates), 1)
+
+        first.refresh_from_db()
+        self.assertEqual(first.status, ReservationStatus.CANCELLED)
+        self.assertEqual(first.version, 2)
+        self.assertEqual(
+            Reservation.objects.filter(status=ReservationStatus.CONFIRMED).count(), 2
+        )
+
+        self.log.flush()
+        event = ReservationEvent.objects.get(event_type=ReservationEventType.CANCELLED)
+        self.assertEqual(event.actor_id, self.staff.id)
+        self.assertEqual(event.changes['status'], [ReservationStatus.CONFIRMED, ReservationStatus.CANCELLED])
+        self.assertEqual(
+            Notification.objects.get().kind, NotificationKind.RESERVATION_CANCELLED
+        )
+
+    def test_hold_confirmed_during_release_is_kept(self):
+        """Test: une option confirmée entre la lecture et l'UPDATE n'est pas annulée"""
+        hold = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=self.start + timedelta(days=10),
+            end_date=self.start + timedelta(days=10, hours=2),
+            hold=True
+        )
+        Reservation.objects.filter(id=hold.id).update(hold_expires_at=timezone.now() - timedelta(seconds=1))
+        expired = Reservation.objects.filter(
+            status=ReservationStatus.PENDING, hold_expires_at__lte=timezone.now()
+        )
+        values_list = QuerySet.values_list
+
+        def select_then_confirm(queryset, *fields, **kwargs):
+            rows = list(values_list(queryset, *fields, **kwargs))
+            # Confirmation concurrente, validée avant l'UPDATE du balayage
+            Reservation.objects.filter(id=hold.id).update(
+                status=ReservationStatus.CONFIRMED, hold_expires_at=None
+            )
+            return rows
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with mock.patch.object(QuerySet, 'values_list', select_then_confirm):
+                released = ReservationBulkService.set_status(expired, ReservationStatus.CANCELLED)
+
+        self.assertEqual(released, [])
+        hold.refresh_from_db()
+        self.assertEqual(hold.status, ReservationStatus.CONFIRMED)
+        self.log.flush()
+        self.assertFalse(ReservationEvent.objects.filter(event_type=ReservationEventType.CANCELLED).exists())
+
+    def test_move_to_pending_skips_non_confirmed(self):
+        """Test: seules les réservations confirmées passent en attente"""
+        ReservationService.cancel_reservation(self.reservations[1].id)
+
+        response = self.client.post('/api/reservations/bulk_status/', {
+            'status': ReservationStatus.PENDING,
+            'user_id': self.user.id,
+        }, format='json')
+
+        self.assertEqual(
+            sorted(response.data['ids']), [self.reservations[0].id, self.reservations[2].id]
+        )
+
+    def test_filter_required_and_staff_only(self):
+        """Test: filtre obligatoire et accès réservé au staff"""
+        response = self.client.post(
+            '/api/reservations/bulk_status/', {'status': ReservationStatus.CANCELLED}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post('/api/reservations/bulk_status/', {
+            'status': ReservationStatus.CANCELLED, 'car_id': self.car.id
+        }, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_retire_car(self):
+        """Test: retrait d'un véhicule et annulation de ses réservations"""
+        response = self.client.post(f'/api/cars/{self.car.id}/retire/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['cancelled'], 2)
+        self.assertEqual(response.data['car']['status'], CarStatus.MAINTENANCE)
+        self.assertEqual(
+            Reservation.objects.get(car=self.other_car).status, ReservationStatus.CONFIRMED
+        )
+
+
+class ReservationReassignmentTestCase(TestCase):
+    """Tests de la réaffectation des réservations déplacées."""
+
+    def setUp(self):
+        self.staff = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='adminpass123'
+        )
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.base = (timezone.now() + timedelta(days=2)).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.retired, self.busy, self.free = [
+            Car.objects.create(
+                registration_number=f'RSG-00{i}',
+                brand='Toyota',
+                model='Hilux',
+                year=2023,
+                status=CarStatus.AVAILABLE
+            )
+            for i in range(3)
+        ]
+        self.other_model = Car.objects.create(
+            registration_number='RSG-100',
+            brand='Nissan',
+            model='Patrol',
+            year=2022,
+            status=CarStatus.AVAILABLE
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.staff)
+
+    def reserve(self, car, day, start_hour, end_hour):
+        return Reservation.objects.create(
+            user=self.user,
+            car=car,
+            start_date=self.base + timedelta(days=day, hours=start_hour),
+            end_date=self.base + timedelta(days=day, hours=end_hour),
+            status=ReservationStatus.CONFIRMED
+        )
+
+    def test_best_fit_prefers_tightest_gap(self):
+        """Test: le véhicule dont le créneau libre commence le plus tard est choisi"""
+        t = lambda hours: self.base + timedelta(hours=hours)
+        calendars = {1: ([t(0)], [t(2)]), 2: ([], [])}
+
+        self.assertEqual(ReservationReassignmentService.best_fit(calendars, t(3), t(4)), 1)
+        self.assertEqual(ReservationReassignmentService.best_fit(calendars, t(1), t(4)), 2)
+
+    def test_reassign_moves_to_same_model(self):
+        """Test: toutes les réservations sont placées sur des véhicules équivalents"""
+        first = self.reserve(self.retired, 0, 10, 12)
+        second = self.reserve(self.retired, 0, 12, 14)
+        third = self.reserve(self.retired, 1, 10, 12)
+        self.reserve(self.busy, 0, 9, 13)
+        self.reserve(self.free, 1, 9, 11)
+        Car.objects.filter(id=self.retired.id).update(status=CarStatus.MAINTENANCE)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/reservations/reassign/', {}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['unplaced'], [])
+        moved = {item['reservation_id']: item['to_car'] for item in response.data['moved']}
+        self.assertEqual(moved, {
+            first.id: self.free.id,
+            second.id: self.free.id,
+            third.id: self.busy.id,
+        })
+
+        second.refresh_from_db()
+        self.assertEqual(second.car_id, self.free.id)
+        self.assertEqual(second.version, 2)
+        self.assertFalse(Reservation.objects.filter(car=self.other_model).exists())
+        self.assertEqual(
+            Notification.objects.filter(kind=NotificationKind.RESERVATION_REASSIGNED).count(), 3
+        )
+
+    def test_unplaced_reported_and_held(self):
+        """Test: sans véhicule libre, la réservation est signalée (et mise en attente)"""
+        stranded = self.reserve(self.retired, 0, 10, 12)
+        self.reserve(self.busy, 0, 8, 20)
+        self.reserve(self.free, 0, 11, 13)
+        Car.objects.filter(id=self.retired.id).update(status=CarStatus.UNAVAILABLE)
+
+        response = self.client.post(
+            '/api/reservations/reassign/', {'dry_run': True}, format='json'
+        )
+        self.assertEqual(
+            [item['reservation_id'] for item in response.data['unplaced']], [stranded.id]
+        )
+
+        self.client.post('/api/reservations/reassign/', {'hold_unplaced': True}, format='json')
+        stranded.refresh_from_db()
+        self.assertEqual(stranded.car_id, self.retired.id)
+        self.assertEqual(stranded.status, ReservationStatus.PENDING)
+
+
+class ReservationFilterTestCase(TestCase):
+    """Tests des filtres serveur de la liste des réservations."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.car = Car.objects.create(
+            registration_number='FLT-001',
+            brand='Toyota',
+            model='Hilux',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        now = timezone.now()
+        self.past = Reservation.objects.create(
+            user=self.user, car=self.car,
+            start_date=now - timedelta(days=3), end_date=now - timedelta(days=2),
+            status=ReservationStatus.COMPLETED
+        )
+        self.current = Reservation.objects.create(
+            user=self.user, car=self.car,
+            start_date=now - timedelta(hours=1), end_date=now + timedelta(hours=1),
+            status=ReservationStatus.CONFIRMED
+        )
+        self.upcoming = Reservation.objects.create(
+            user=self.user, car=self.car,
+            start_date=now + timedelta(days=2), end_date=now + timedelta(days=3),
+            status=ReservationStatus.CONFIRMED
+        )
+        self.others = Reservation.objects.create(
+            user=self.other, car=self.car,
+            start_date=now + timedelta(days=5), end_date=now + timedelta(days=6),
+            status=ReservationStatus.CONFIRMED
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def ids(self, params):
+        response = self.client.get('/api/reservations/', params)
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data]
+
+    def test_upcoming_and_active_now(self):
+        """Test: prochains trajets et réservation en cours"""
+        now = timezone.now().isoformat()
+        self.assertEqual(self.ids({'start_after': now}), [self.upcoming.id])
+        self.assertEqual(self.ids({'active_now': 'true'}), [self.current.id])
+        self.assertEqual(self.ids({'end_before': now}), [self.past.id])
+
+    def test_status_and_car_filters(self):
+        """Test: plusieurs statuts séparés par des virgules et filtre véhicule"""
+        self.assertEqual(
+            sorted(self.ids({'status': 'confirmed,pending', 'car': self.car.id})),
+            [self.current.id, self.upcoming.id]
+        )
+
+    def test_invalid_parameters(self):
+        """Test: dates ISO et statuts validés"""
+        self.assertEqual(self.client.get('/api/reservations/', {'start_after': 'demain'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/reservations/', {'status': 'LOST'}).status_code, 400)
+
+    def test_cross_user_filters_staff_only(self):
+        """Test: seul le staff interroge les réservations des autres utilisateurs"""
+        self.assertEqual(
+            self.client.get('/api/reservations/', {'user': self.other.id}).status_code, 403
+        )
+
+        staff = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        self.client.force_authenticate(user=staff)
+        self.assertEqual(self.ids({'user': self.other.id}), [self.others.id])
+        self.assertEqual(
+            self.ids({'all_users': 'true', 'start_after': timezone.now().isoformat(), 'limit': 1}),
+            [self.upcoming.id]
+        )
+
+
+class CalendarFeedTestCase(TestCase):
+    """Tests des flux iCalendar."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.car = Car.objects.create(
+            registration_number='ICS-001',
+            brand='Toyota',
+            model='Hilux',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        self.start = timezone.now() + timedelta(days=1)
+        self.reservation = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=self.start,
+            end_date=self.start + timedelta(hours=2),
+            purpose='Mission terrain, région Maritime'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = self.client.get('/api/reservations/calendar/').data['url']
+        self.client.force_authenticate(user=None)
+
+    def test_feed_content(self):
+        """Test: flux accessible par jeton, sans authentification"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = response.content.decode()
+        self.assertIn(f'UID:reservation-{self.reservation.id}@car-reservation', body)
+        self.assertIn('SUMMARY:Toyota Hilux (ICS-001)', body)
+        self.assertIn('DESCRIPTION:Mission terrain\\, région Maritime', body)
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_invalid_token(self):
+        """Test: jeton falsifié → 404"""
+        self.assertEqual(self.client.get('/calendar/falsifie.ics').status_code, 404)
+
+    def test_conditional_get_and_invalidation(self):
+        """Test: 304 sans requête SQL de rendu, nouveau contenu après modification"""
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ReservationService.cancel_reservation(self.reservation.id)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('STATUS:CANCELLED', response.content.decode())
+
+    @override_settings(CACHES={
+        alias: {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'shared_cache'}
+        for alias in ('default', 'worker')
+    })
+    def test_invalidation_seen_by_other_processes(self):
+        """Test: modification dans un autre processus → plus de 304 sur l'ancien ETag"""
+        call_command('createcachetable', verbosity=0)
+        etag = self.client.get(self.url)['ETag']
+
+        with mock.patch('apps.reservations.ical.cache', caches['worker']):
+            with self.captureOnCommitCallbacks(execute=True):
+                ReservationService.cancel_reservation(self.reservation.id)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('STATUS:CANCELLED', response.content.decode())
+
+    def test_car_feed_staff_only(self):
+        """Test: lien du planning véhicule réservé au staff"""
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(f'/api/cars/{self.car.id}/calendar/').status_code, 403)
+
+        staff = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        self.client.force_authenticate(user=staff)
+        url = self.client.get(f'/api/cars/{self.car.id}/calendar/').data['url']
+        self.assertIn('SUMMARY:testuser', self.client.get(url).content.decode())
+
+
+class ReservationHoldTestCase(TestCase):
+    """Tests des options (réservation en deux temps)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.car = Car.objects.create(
+            registration_number='ABC-123',
+            brand='Toyota',
+            model='Corolla',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        self.start = timezone.now() + timedelta(days=1)
+        self.payload = {
+            'car_id': self.car.id,
+            'start_date': self.start.isoformat(),
+            'end_date': (self.start + timedelta(hours=2)).isoformat(),
+        }
+
+    def test_hold_blocks_then_confirm(self):
+        """Test: l'option bloque le créneau ; la confirmation est un seul UPDATE"""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/reservations/hold/', self.payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], ReservationStatus.PENDING)
+        self.assertIsNotNone(response.data['hold_expires_at'])
+        self.assertFalse(Notification.objects.exists())
+
+        conflict = self.client.post('/api/reservations/', self.payload)
+        self.assertEqual(conflict.status_code, 400)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                confirmed = self.client.post(
+                    f"/api/reservations/{response.data['id']}/confirm/", {'purpose': 'Mission'}
+                )
+        self.assertEqual(confirmed.status_code, 200)
+        self.assertEqual(confirmed.data['status'], ReservationStatus.CONFIRMED)
+        self.assertEqual(confirmed.data['purpose'], 'Mission')
+        self.assertIsNone(confirmed.data['hold_expires_at'])
+        writes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "reservations"')]
+        self.assertEqual(len(writes), 1)
+        self.assertNotIn('FROM "cars"', ' '.join(q['sql'] for q in queries.captured_queries))
+        self.assertEqual(
+            Notification.objects.get().kind, NotificationKind.RESERVATION_CONFIRMED
+        )
+
+    def test_expired_hold_released(self):
+        """Test: option expirée → créneau libre, confirmation refusée (410), balayage"""
+        hold = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=self.start,
+            end_date=self.start + timedelta(hours=2),
+            hold=True
+        )
+        Reservation.objects.filter(id=hold.id).update(
+            hold_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        response = self.client.post(f'/api/reservations/{hold.id}/confirm/')
+        self.assertEqual(response.status_code, 410)
+
+        # Non encore balayée, l'option expirée ne bloque plus le créneau
+        booked = self.client.post('/api/reservations/', self.payload)
+        self.assertEqual(booked.status_code, 201)
+
+        self.assertEqual(ReservationBulkService.release_expired_holds(batch_size=1), 1)
+        hold.refresh_from_db()
+        self.assertEqual(hold.status, ReservationStatus.CANCELLED)
+        self.assertEqual(
+            Reservation.objects.get(id=booked.data['id']).status, ReservationStatus.CONFIRMED
+        )
+        self.assertEqual(ReservationBulkService.release_expired_holds(), 0)
+        self.assertFalse(
+            Notification.objects.filter(kind=NotificationKind.RESERVATION_CANCELLED).exists()
+        )
+
+    def expired_hold(self):
+        """Option posée puis expirée, pas encore balayée."""
+        hold = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=self.start,
+            end_date=self.start + timedelta(hours=2),
+            hold=True
+        )
+        Reservation.objects.filter(id=hold.id).update(
+            hold_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        return hold
+
+    def test_expired_hold_ignored_by_next_slots(self):
+        """Test: les créneaux suggérés ignorent une option expirée"""
+        self.expired_hold()
+
+        slots = ReservationService.find_next_slots(self.car.id, timedelta(hours=2), self.start)
+
+        self.assertEqual(slots[0]['start_date'], self.start)
+        self.assertIsNone(slots[0]['free_until'])
+
+    def test_expired_hold_ignored_by_bulk_availability(self):
+        """Test: la disponibilité groupée ignore une option expirée"""
+        self.expired_hold()
+
+        result, = ReservationService.bulk_check_availability([{
+            'car_id': self.car.id,
+            'start_date': self.start,
+            'end_date': self.start + timedelta(hours=2),
+        }])
+
+        self.assertTrue(result['available'])
+        self.assertEqual(result['conflicting_ids'], [])
+
+    def test_expired_hold_ignored_by_reassignment(self):
+        """Test: la réaffectation peut placer une réservation sur une option expirée"""
+        self.expired_hold()
+        source = Car.objects.create(
+            registration_number='ABC-124',
+            brand='Toyota',
+            model='Corolla',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        displaced = ReservationService.create_reservation(
+            user=self.user,
+            car_id=source.id,
+            start_date=self.start,
+            end_date=self.start + timedelta(hours=2)
+        )
+        Car.objects.filter(id=source.id).update(status=CarStatus.MAINTENANCE)
+
+        report = ReservationReassignmentService.reassign(car_ids=[source.id], dry_run=True)
+
+        self.assertEqual(
+            report['moved'],
+            [{'reservation_id': displaced.id, 'from_car': source.id, 'to_car': self.car.id}]
+        )
+
+    def test_move_hold_with_versioned_update(self):
+        """Test: l'option suit la saisie par PATCH versionné, sans annulation ; expirée → 410"""
+        log = AuditLog(background=False)
+        patcher = mock.patch('apps.reservations.services.audit_log', log)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        hold = self.client.post('/api/reservations/hold/', self.payload).data
+        later = self.start + timedelta(hours=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            moved = self.client.patch(
+                f"/api/reservations/{hold['id']}/",
+                {'start_date': later.isoformat(), 'end_date': (later + timedelta(hours=2)).isoformat()},
+                format='json',
+                HTTP_IF_MATCH=f'"{hold["version"]}"'
+            )
+        self.assertEqual(moved.status_code, 200)
+        self.assertEqual(moved.data['status'], ReservationStatus.PENDING)
+        self.assertEqual(Reservation.objects.count(), 1)
+        log.flush()
+        self.assertEqual(
+            list(ReservationEvent.objects.values_list('event_type', flat=True).order_by('id')),
+            [ReservationEventType.UPDATED]
+        )
+
+        Reservation.objects.filter(id=hold['id']).update(
+            hold_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        expired = self.client.patch(
+            f"/api/reservations/{hold['id']}/", {'end_date': (later + timedelta(hours=3)).isoformat()},
+            format='json'
+        )
+        self.assertEqual(expired.status_code, 410)
+
+    def test_sweeper_skips_live_and_staff_holds(self):
+        """Test: options valides et mises en attente staff (sans expiration) conservées"""
+        live = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=self.start,
+            end_date=self.start + timedelta(hours=2),
+            hold=True
+        )
+        held = Reservation.objects.create(
+            user=self.user,
+            car=self.car,
+            start_date=self.start + timedelta(days=1),
+            end_date=self.start + timedelta(days=1, hours=2),
+            status=ReservationStatus.PENDING
+        )
+
+        self.assertEqual(ReservationBulkService.release_expired_holds(), 0)
+        self.assertEqual(
+            set(Reservation.objects.filter(status=ReservationStatus.PENDING).values_list('id', flat=True)),
+            {live.id, held.id}
+        )
+
+    def test_cannot_confirm_other_users_hold(self):
+        """Test: option d'un autre utilisateur → 404"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        hold = ReservationService.create_reservation(
+            user=other,
+            car_id=self.car.id,
+            start_date=self.start,
+            end_date=self.start + timedelta(hours=2),
+            hold=True
+        )
+
+        response = self.client.post(f'/api/reservations/{hold.id}/confirm/')
+        self.assertEqual(response.status_code, 410)
+        hold.refresh_from_db()
+        self.assertEqual(hold.status, ReservationStatus.PENDING)
+
+
+class ReservationWaitlistTestCase(TestCase):
+    """Tests de la liste d'attente et du rapprochement sur libération."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            username='owner', email='owner@example.com', password='testpass123'
+        )
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123'
+        )
+        self.other = User.objects.create_user(
+            username='other', email='other@example.com', password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.car = Car.objects.create(
+            registration_number='HLX-001', brand='Toyota', model='Hilux',
+            year=2023, status=CarStatus.AVAILABLE
+        )
+        self.start = timezone.now() + timedelta(days=1)
+        self.end = self.start + timedelta(hours=4)
+        self.booked = ReservationService.create_reservation(
+            self.owner, self.car.id, self.start, self.end
+        )
+
+    def join(self, user=None, **kwargs):
+        data = {'car_id': self.car.id, 'start_date': self.start, 'end_date': self.end}
+        data.update(kwargs)
+        return WaitlistService.join(user or self.user, **data)
+
+    def test_full_window_waits_then_cancellation_books_first_entry(self):
+        """Test: demandes servies dans l'ordre d'inscription à l'annulation"""
+        first = self.join()
+        second = self.join(user=self.other)
+        self.assertEqual(first.status, WaitlistStatus.WAITING)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ReservationService.cancel_reservation(self.booked.id, actor=self.owner)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, WaitlistStatus.BOOKED)
+        self.assertEqual(first.reservation.user, self.user)
+        self.assertEqual(first.reservation.status, ReservationStatus.CONFIRMED)
+        self.assertEqual(second.status, WaitlistStatus.WAITING)
+        self.assertTrue(Notification.objects.filter(
+            user=self.user, kind=NotificationKind.RESERVATION_CONFIRMED
+        ).exists())
+
+    def test_model_entry_matched_on_any_car_of_model(self):
+        """Test: demande par modèle servie par le véhicule libéré"""
+        other_car = Car.objects.create(
+            registration_number='HLX-002', brand='Toyota', model='Hilux',
+            year=2023, status=CarStatus.AVAILABLE
+        )
+        ReservationService.create_reservation(self.owner, other_car.id, self.start, self.end)
+        entry = self.join(car_id=None, brand='Toyota', model='Hilux')
+        self.assertEqual(entry.status, WaitlistStatus.WAITING)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ReservationService.cancel_reservation(self.booked.id)
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistStatus.BOOKED)
+        self.assertEqual(entry.reservation.car, self.car)
+
+    def test_shortened_reservation_frees_only_its_tail(self):
+        """Test: seul le temps rendu par la réservation raccourcie est rapproché"""
+        tail = self.join(start_date=self.end - timedelta(hours=1), end_date=self.end)
+        head = self.join(user=self.other, start_date=self.start, end_date=self.start + timedelta(hours=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ReservationService.update_reservation(self.booked.id, end_date=self.end - timedelta(hours=2))
+
+        tail.refresh_from_db()
+        head.refresh_from_db()
+        self.assertEqual(tail.status, WaitlistStatus.BOOKED)
+        self.assertEqual(head.status, WaitlistStatus.WAITING)
+
+    def test_notify_mode_sends_notification_without_booking(self):
+        """Test: sans auto_book, notification du créneau libéré"""
+        entry = self.join(auto_book=False)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ReservationService.cancel_reservation(self.booked.id)
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistStatus.NOTIFIED)
+        self.assertEqual(entry.matched_car, self.car)
+        self.assertIsNone(entry.reservation)
+        notification = Notification.objects.get(kind=NotificationKind.WAITLIST_AVAILABLE)
+        self.assertEqual(notification.user, self.user)
+        self.assertEqual(notification.context['entry_id'], entry.id)
+
+    def test_expired_hold_release_matches_waitlist(self):
+        """Test: une option expirée libérée par le balayage profite à la liste d'attente"""
+        ReservationService.cancel_reservation(self.booked.id)
+        hold = ReservationService.create_reservation(self.owner, self.car.id, self.start, self.end, hold=True)
+        entry = self.join()
+        Reservation.objects.filter(id=hold.id).update(hold_expires_at=timezone.now() - timedelta(seconds=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ReservationBulkService.release_expired_holds()
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistStatus.BOOKED)
+
+    def test_matching_ignores_unrelated_entries(self):
+        """Test: demandes d'autres véhicules ou périodes non touchées"""
+        other_car = Car.objects.create(
+            registration_number='CRL-001', brand='Toyota', model='Corolla',
+            year=2023, status=CarStatus.AVAILABLE
+        )
+        ReservationService.create_reservation(self.owner, other_car.id, self.start, self.end)
+        unrelated_car = self.join(car_id=other_car.id)
+        later = self.start + timedelta(days=2)
+        ReservationService.create_reservation(self.owner, self.car.id, later, later + timedelta(hours=1))
+        unrelated_time = self.join(start_date=later, end_date=later + timedelta(hours=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            report = WaitlistService.match([(self.car.id, self.start, self.end)])
+
+        self.assertEqual(report, {'booked': [], 'notified': []})
+        unrelated_car.refresh_from_db()
+        unrelated_time.refresh_from_db()
+        self.assertEqual(unrelated_car.status, WaitlistStatus.WAITING)
+        self.assertEqual(unrelated_time.status, WaitlistStatus.WAITING)
+
+    def test_waitlist_api(self):
+        """Test: inscription, réservation immédiate si libre, retrait"""
+        payload = {
+            'car_id': self.car.id,
+            'start_date': self.start.isoformat(),
+            'end_date': self.end.isoformat(),
+        }
+        response = self.client.post('/api/reservations/waitlist/', payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], WaitlistStatus.WAITING)
+
+        free = self.end + timedelta(hours=1)
+        immediate = self.client.post('/api/reservations/waitlist/', {
+            **payload,
+            'start_date': free.isoformat(),
+            'end_date': (free + timedelta(hours=1)).isoformat(),
+        })
+        self.assertEqual(immediate.data['status'], WaitlistStatus.BOOKED)
+
+        missing = self.client.post('/api/reservations/waitlist/', {
+            'start_date': self.start.isoformat(), 'end_date': self.end.isoformat(),
+        })
+        self.assertEqual(missing.status_code, 400)
+
+        listed = self.client.get('/api/reservations/waitlist/')
+        self.assertEqual(len(listed.data), 2)
+
+        deleted = self.client.delete(f"/api/reservations/waitlist/{response.data['id']}/")
+        self.assertEqual(deleted.status_code, 204)
+        self.assertEqual(
+            WaitlistEntry.objects.get(id=response.data['id']).status, WaitlistStatus.CANCELLED
+        )
+        again = self.client.delete(f"/api/reservations/waitlist/{response.data['id']}/")
+        self.assertEqual(again.status_code, 400)
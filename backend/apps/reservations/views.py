@@ -1,12 +1,61 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 
-from .models import Reservation
-from .serializers import ReservationSerializer, ReservationCreateSerializer
-from .services import ReservationService
+from apps.cars.models import Car
+from apps.cars.serializers import SlotSerializer
+from apps.core.throttling import bucket_throttles
+from .ical import CalendarFeedService, make_feed_token, read_feed_token
+from .models import Reservation, WaitlistEntry
+from .serializers import (
+    ReservationSerializer, ReservationCreateSerializer, ReservationHistorySerializer,
+    ReservationUpdateSerializer, BulkStatusSerializer, ReassignSerializer,
+    ReservationFilterSerializer, ReservationConfirmSerializer,
+    WaitlistEntrySerializer, WaitlistJoinSerializer
+)
+from .services import (
+    ReservationService, ReservationArchiveService, ReservationBulkService,
+    ReservationReassignmentService, DashboardService, WaitlistService
+)
+
+
+def parse_if_match(request):
+    """Version attendue depuis l'en-tête If-Match (ex. `"3"` ou `W/"3"`)."""
+    header = request.headers.get('If-Match')
+    if not header:
+        return None
+    try:
+        return int(header.strip().removeprefix('W/').strip('"'))
+    except ValueError:
+        return None
+
+
+def error_response(error):
+    """
+    Réponse d'erreur métier : 409 pour une version périmée, 410 pour une
+    option expirée, 400 sinon.
+    """
+    codes = {'stale': status.HTTP_409_CONFLICT, 'expired': status.HTTP_410_GONE}
+    return Response({'error': str(error)}, status=codes.get(error.code, status.HTTP_400_BAD_REQUEST))
+
+
+def with_etag(response, reservation):
+    response['ETag'] = f'"{reservation.version}"'
+    return response
+
+
+def calendar_url(request, kind, object_id):
+    """URL d'abonnement (jeton signé) au flux iCalendar."""
+    token = make_feed_token(kind, object_id)
+    return request.build_absolute_uri(reverse('calendar-feed', args=[token]))
 
 
 class ReservationViewSet(viewsets.ModelViewSet):
@@ -14,43 +63,288 @@ class ReservationViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     pagination_class = None
 
+    def get_throttles(self):
+        # Limité avant d'entrer dans le service (et le verrou sur le véhicule)
+        if self.action in ('create', 'hold', 'update', 'partial_update', 'cancel'):
+            return bucket_throttles('booking')
+        # L'inscription en liste d'attente peut réserver immédiatement
+        if self.action == 'waitlist' and self.request.method == 'POST':
+            return bucket_throttles('booking')
+        return super().get_throttles()
+
     def get_queryset(self):
         """Utilisateur voit uniquement ses réservations."""
-        return Reservation.objects.filter(
-            user=self.request.user
-        ).select_related('car', 'user')
+        queryset = Reservation.objects.filter(user=self.request.user)
+        if self.action == 'list':
+            queryset = self.filter_list(queryset)
+            # Colonnes et jointures selon ?fields= / ?expand=
+            return ReservationSerializer.optimize_queryset(queryset, self.request)
+        return queryset.select_related('car', 'user')
+
+    def filter_list(self, queryset):
+        """
+        Filtres serveur de la liste.
+        Query params: start_after, end_before (ISO), status (ex. CONFIRMED,PENDING),
+        car, active_now, limit ; staff : user, all_users
+        """
+        params = ReservationFilterSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        if 'user' in data or data['all_users']:
+            if not self.request.user.is_staff:
+                raise PermissionDenied("Filtre réservé au staff.")
+            queryset = Reservation.objects.all()
+            if 'user' in data:
+                queryset = queryset.filter(user_id=data['user'])
+
+        queryset = ReservationService.search(
+            queryset,
+            start_after=data.get('start_after'),
+            end_before=data.get('end_before'),
+            statuses=data.get('status'),
+            car_id=data.get('car'),
+            active_now=data['active_now']
+        )
+        if 'limit' in data:
+            queryset = queryset[:data['limit']]
+        return queryset
 
     def create(self, request, *args, **kwargs):
         """Crée une réservation via le service."""
+        return self.book(request)
+
+    @action(detail=False, methods=['post'])
+    def hold(self, request):
+        """
+        Pose une option (PENDING) sur le créneau ; mêmes champs et mêmes
+        contrôles que la création. À confirmer avant `hold_expires_at`.
+        """
+        return self.book(request, hold=True)
+
+    def book(self, request, hold=False):
         serializer = ReservationCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         try:
             reservation = ReservationService.create_reservation(
                 user=request.user,
+                hold=hold,
                 **serializer.validated_data
             )
 
             return Response(
-                ReservationSerializer(reservation).data,
+                self.get_serializer(reservation).data,
                 status=status.HTTP_201_CREATED
             )
         except DjangoValidationError as e:
+            body = {'error': str(e)}
+            if e.code:
+                # 'overlap' : le client peut proposer la liste d'attente
+                body['code'] = e.code
+            # ?suggest=true : propose directement des créneaux libres en cas de conflit
+            if e.code == 'overlap' and request.query_params.get('suggest') == 'true':
+                data = serializer.validated_data
+                body['suggestions'] = SlotSerializer(
+                    ReservationService.find_next_slots(
+                        data['car_id'],
+                        data['end_date'] - data['start_date'],
+                        data['start_date']
+                    ),
+                    many=True
+                ).data
+            return Response(body, status=status.HTTP_400_BAD_REQUEST)
+
+    def retrieve(self, request, *args, **kwargs):
+        reservation = self.get_object()
+        return with_etag(Response(self.get_serializer(reservation).data), reservation)
+
+    def update(self, request, *args, **kwargs):
+        """
+        Modifie une réservation via le service (PUT et PATCH).
+        La version attendue vient de If-Match ou du champ `version` ;
+        une version périmée renvoie 409.
+        """
+        reservation = self.get_object()
+        serializer = ReservationUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = dict(serializer.validated_data)
+        body_version = data.pop('version', None)
+        expected_version = parse_if_match(request) or body_version
+
+        try:
+            updated = ReservationService.update_reservation(
+                reservation.id,
+                expected_version=expected_version,
+                actor=request.user,
+                **data
+            )
+        except DjangoValidationError as e:
+            return error_response(e)
+
+        return with_etag(Response(self.get_serializer(updated).data), updated)
+
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """
+        Historique complet de l'utilisateur, archives comprises.
+        Query params: limit (défaut 100, max 500)
+        """
+        try:
+            limit = min(int(request.query_params.get('limit', 100)), 500)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
             return Response(
-                {'error': str(e)},
+                {'error': 'limit doit être un entier positif'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        rows = ReservationArchiveService.history(user_id=request.user.id)[:limit]
+        return Response(ReservationHistorySerializer(rows, many=True).data)
+
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
         """Annule une réservation."""
         reservation = self.get_object()
 
         try:
-            updated = ReservationService.cancel_reservation(reservation.id)
-            return Response(ReservationSerializer(updated).data)
+            updated = ReservationService.cancel_reservation(
+                reservation.id,
+                expected_version=parse_if_match(request),
+                actor=request.user
+            )
+            return with_etag(Response(self.get_serializer(updated).data), updated)
         except DjangoValidationError as e:
-            return Response(
-                {'error': str(e)},
-                status=status.HTTP_400_BAD_REQUEST
-            )
\ No newline at end of file
+            return error_response(e)
+
+    @action(detail=True, methods=['post'])
+    def confirm(self, request, pk=None):
+        """Confirme une option ; 410 si elle a expiré."""
+        serializer = ReservationConfirmSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            confirmed = ReservationService.confirm_reservation(
+                pk, request.user, purpose=serializer.validated_data.get('purpose')
+            )
+            return with_etag(Response(self.get_serializer(confirmed).data), confirmed)
+        except DjangoValidationError as e:
+            return error_response(e)
+
+    @action(detail=False, methods=['get', 'post'])
+    def waitlist(self, request):
+        """
+        GET : demandes en liste d'attente de l'utilisateur.
+        POST : inscription sur un créneau complet
+        {car_id | brand + model, start_date, end_date, purpose, auto_book}.
+        La demande est réservée (auto_book) ou signalée dès qu'une
+        annulation libère le créneau, sans interrogation répétée.
+        """
+        if request.method == 'GET':
+            entries = WaitlistEntry.objects.filter(user=request.user).order_by('-created_at')
+            return Response(WaitlistEntrySerializer(entries, many=True).data)
+
+        serializer = WaitlistJoinSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            entry = WaitlistService.join(user=request.user, **serializer.validated_data)
+        except DjangoValidationError as e:
+            return error_response(e)
+        return Response(WaitlistEntrySerializer(entry).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['delete'], url_path=r'waitlist/(?P<entry_id>[0-9]+)')
+    def leave_waitlist(self, request, entry_id=None):
+        """Retire une demande encore en attente."""
+        try:
+            WaitlistService.cancel(int(entry_id), request.user)
+        except DjangoValidationError as e:
+            return error_response(e)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """Lien d'abonnement iCalendar aux réservations de l'utilisateur."""
+        return Response({'url': calendar_url(request, 'user', request.user.id)})
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def bulk_status(self, request):
+        """
+        Annule ou met en attente toutes les réservations actives d'un filtre (staff).
+        Corps : {"status": "CANCELLED"|"PENDING", "car_id", "user_id", "date_from", "date_to"}
+        """
+        serializer = BulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        filters = dict(serializer.validated_data)
+        new_status = filters.pop('status')
+
+        ids = ReservationBulkService.set_status(
+            ReservationBulkService.filter_queryset(**filters),
+            new_status,
+            actor=request.user
+        )
+        return Response({'status': new_status, 'updated': len(ids), 'ids': ids})
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def reassign(self, request):
+        """
+        Réaffecte les réservations à venir des véhicules indisponibles vers
+        des véhicules disponibles de même marque et modèle (staff).
+        Corps : {"car_ids": [...], "dry_run": bool, "hold_unplaced": bool}
+        """
+        serializer = ReassignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        report = ReservationReassignmentService.reassign(actor=request.user, **serializer.validated_data)
+        return Response(report)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard(request):
+    """Compteurs du tableau de bord, sans télécharger les listes complètes."""
+    summary = DashboardService.get_user_summary(request.user)
+    upcoming = ReservationSerializer(
+        summary['next'],
+        many=True,
+        context={'request': request, 'expand': {'car'}}
+    )
+
+    return Response({
+        'reservations': {
+            'upcoming': summary['upcoming'],
+            'active': summary['active'],
+            'cancelled': summary['cancelled'],
+        },
+        'cars': DashboardService.get_fleet_summary(),
+        'next_reservations': upcoming.data,
+    })
+
+
+def calendar_feed(request, token):
+    """
+    Flux iCalendar (utilisateur ou véhicule) authentifié par son jeton.
+    ETag et Last-Modified permettent aux clients d'obtenir un 304.
+    """
+    subject = read_feed_token(token)
+    if subject is None:
+        raise Http404
+    kind, object_id = subject
+    if kind == 'user':
+        exists = get_user_model().objects.filter(pk=object_id, is_active=True).exists()
+    else:
+        exists = Car.objects.filter(pk=object_id).exists()
+    if not exists:
+        raise Http404
+
+    feed = CalendarFeedService.get_feed(kind, object_id)
+    response = HttpResponse(feed['body'], content_type='text/calendar; charset=utf-8')
+    response['ETag'] = feed['etag']
+    response['Cache-Control'] = 'private, max-age=60'
+    last_modified = None
+    if feed['last_modified'] is not None:
+        last_modified = int(feed['last_modified'].timestamp())
+        response['Last-Modified'] = http_date(last_modified)
+    return get_conditional_response(
+        request, etag=feed['etag'], last_modified=last_modified, response=response
+    )
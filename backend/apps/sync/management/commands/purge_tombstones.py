@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.sync.services import SyncService, sync_option
+
+
+class Command(BaseCommand):
+    help = 'Supprime les tombstones du flux de synchronisation plus anciennes que la rétention'
+
+    def handle(self, *args, **options):
+        purged = SyncService.purge_tombstones()
+        self.stdout.write(self.style.SUCCESS(
+            f"{purged} tombstone(s) de plus de {sync_option('TOMBSTONE_RETENTION_DAYS')} jours supprimée(s)."
+        ))
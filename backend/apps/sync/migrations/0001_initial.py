@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('car', 'Véhicule'), ('reservation', 'Réservation')], max_length=20, verbose_name='Type')),
+                ('object_id', models.BigIntegerField(verbose_name='Identifiant')),
+                ('user_id', models.BigIntegerField(blank=True, null=True, verbose_name='Propriétaire')),
+                ('deleted_at', models.DateTimeField(verbose_name='Supprimé le')),
+            ],
+            options={
+                'db_table': 'sync_tombstones',
+                'ordering': ['deleted_at'],
+                'indexes': [models.Index(fields=['kind', 'user_id', 'deleted_at'], name='sync_tombst_kind_d56423_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import models
+
+
+class SyncKind(models.TextChoices):
+    CAR = 'car', 'Véhicule'
+    RESERVATION = 'reservation', 'Réservation'
+
+
+class Tombstone(models.Model):
+    """
+    Trace d'une suppression (ou d'un archivage) pour le flux `/api/sync/`.
+
+    Sans clé étrangère : la ligne d'origine n'existe plus. `user_id` est le
+    propriétaire d'une réservation, pour ne renvoyer à chacun que les
+    siennes. Purgées après SYNC['TOMBSTONE_RETENTION_DAYS'].
+    """
+    kind = models.CharField(max_length=20, choices=SyncKind.choices, verbose_name="Type")
+    object_id = models.BigIntegerField(verbose_name="Identifiant")
+    user_id = models.BigIntegerField(null=True, blank=True, verbose_name="Propriétaire")
+    deleted_at = models.DateTimeField(verbose_name="Supprimé le")
+
+    class Meta:
+        db_table = 'sync_tombstones'
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['kind', 'user_id', 'deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id} supprimé(e) le {self.deleted_at:%d/%m/%Y %H:%M}"
@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Optional
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.cars.models import Car
+from apps.reservations.models import Reservation
+from .models import SyncKind, Tombstone
+
+CURSOR_SALT = 'apps.sync.cursor'
+
+
+def sync_option(name: str):
+    defaults = {
+        'OVERLAP_SECONDS': None,
+        'CLOCK_SKEW_SECONDS': 2,
+        'PAGE_SIZE': 500,
+        'TOMBSTONE_RETENTION_DAYS': 30,
+    }
+    return getattr(settings, 'SYNC', {}).get(name, defaults[name])
+
+
+def overlap_seconds() -> float:
+    """
+    Recouvrement entre deux lectures : OVERLAP_SECONDS s'il est fixé,
+    sinon le plus long budget de REQUEST_BUDGETS (échéance de toute
+    transaction ouverte par une requête) plus l'écart toléré entre les
+    horloges des serveurs.
+    """
+    configured = sync_option('OVERLAP_SECONDS')
+    if configured is not None:
+        return configured
+    budgets = getattr(settings, 'REQUEST_BUDGETS', {}).values()
+    longest = max((budget.get('TIMEOUT', 0) for budget in budgets), default=0)
+    return longest + sync_option('CLOCK_SKEW_SECONDS')
+
+
+def after(position: Optional[tuple]) -> Q:
+    """Lignes situées après `position` (updated_at, id) dans l'ordre du flux."""
+    if position is None:
+        return Q()
+    updated_at, pk = position
+    return Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk)
+
+
+class SyncService:
+    """
+    Flux des modifications pour les clients : véhicules et réservations de
+    l'utilisateur créés ou modifiés depuis un jeton (index sur updated_at),
+    et identifiants supprimés (table des tombstones).
+
+    Le jeton encode l'instant, à l'horloge du serveur, du début de la
+    lecture précédente. updated_at étant fixé avant le commit, une
+    transaction encore ouverte à cet instant peut valider ensuite une ligne
+    datée d'avant le jeton : la lecture suivante repart donc
+    `overlap_seconds()` plus tôt, borne dérivée du budget des requêtes.
+    Les lignes de ce recouvrement sont renvoyées deux fois ; le client les
+    applique comme des remplacements.
+
+    Chaque réponse contient au plus PAGE_SIZE lignes par table, dans
+    l'ordre (updated_at, id) et jusqu'à l'instant du jeton ; le curseur
+    signé de la page suivante poursuit la même lecture. Les modifications
+    postérieures au jeton arrivent avec la lecture suivante.
+    """
+
+    @staticmethod
+    def make_token(moment: datetime) -> str:
+        return str(int(moment.timestamp() * 1_000_000))
+
+    @staticmethod
+    def read_token(token: str) -> datetime:
+        try:
+            return datetime.fromtimestamp(int(token) / 1_000_000, tz=dt_timezone.utc)
+        except (TypeError, ValueError, OverflowError, OSError):
+            raise ValidationError("Jeton de synchronisation invalide.")
+
+    @classmethod
+    def make_cursor(cls, user, since: Optional[datetime], now: datetime, positions: dict) -> str:
+        """Curseur signé de la page suivante, propre à `user`."""
+        return signing.dumps({
+            'user': user.id,
+            'since': cls.make_token(since) if since else None,
+            'now': cls.make_token(now),
+            'positions': {
+                name: [cls.make_token(position[0]), position[1]] if position else None
+                for name, position in positions.items()
+            },
+        }, salt=CURSOR_SALT)
+
+    @classmethod
+    def read_cursor(cls, user, cursor: str) -> tuple:
+        """(since, now, positions) d'un curseur émis pour `user`."""
+        try:
+            data = signing.loads(cursor, salt=CURSOR_SALT)
+            if data['user'] != user.id:
+                raise ValueError
+            positions = {
+                name: (cls.read_token(data['positions'][name][0]), int(data['positions'][name][1]))
+                if data['positions'][name] else None
+                for name in ('cars', 'reservations')
+            }
+            since = cls.read_token(data['since']) if data['since'] else None
+            return since, cls.read_token(data['now']), positions
+        except (signing.BadSignature, ValidationError, ValueError, TypeError, KeyError, IndexError):
+            raise ValidationError("Curseur de synchronisation invalide.")
+
+    @classmethod
+    def changes(cls, user, since: Optional[datetime] = None, cursor: Optional[str] = None) -> dict:
+        """
+        Modifications visibles par `user` depuis `since`, page par page.
+
+        Sans `since`, ou si les tombstones de cette période ont été purgées,
+        renvoie un instantané complet avec `reset` : le client remplace
+        alors son état, une fois toutes les pages reçues, au lieu de le
+        compléter. `cursor` (page suivante) remplace `since` ; `deleted`
+        n'est renseigné que sur la première page.
+
+        Returns:
+            {token, reset, cursor (None sur la dernière page), cars,
+            reservations (querysets), deleted: {cars, reservations}}
+        """
+        if cursor is not None:
+            since, now, positions = cls.read_cursor(user, cursor)
+        else:
+            now = timezone.now()
+            positions = {'cars': None, 'reservations': None}
+        retention = timedelta(days=sync_option('TOMBSTONE_RETENTION_DAYS'))
+        reset = since is None or since < now - retention
+        if reset:
+            since = None
+
+        querysets = {
+            'cars': Car.objects.filter(updated_at__lte=now),
+            'reservations': Reservation.objects.filter(user=user, updated_at__lte=now),
+        }
+        deleted = {'cars': [], 'reservations': []}
+        if not reset:
+            start = since - timedelta(seconds=overlap_seconds())
+            querysets = {name: queryset.filter(updated_at__gt=start) for name, queryset in querysets.items()}
+            if cursor is None:
+                tombstones = Tombstone.objects.filter(deleted_at__gt=start).order_by()
+                deleted['cars'] = sorted(set(
+                    tombstones.filter(kind=SyncKind.CAR, user_id__isnull=True).values_list('object_id', flat=True)
+                ))
+                deleted['reservations'] = sorted(set(
+                    tombstones.filter(kind=SyncKind.RESERVATION, user_id=user.id).values_list('object_id', flat=True)
+                ))
+
+        page_size = sync_option('PAGE_SIZE')
+        more = False
+        for name, queryset in querysets.items():
+            # Clés de la page d'abord (index), lignes complètes ensuite
+            keys = list(
+                queryset.filter(after(positions[name]))
+                .order_by('updated_at', 'id').values_list('updated_at', 'id')[:page_size + 1]
+            )
+            more = more or len(keys) > page_size
+            keys = keys[:page_size]
+            if keys:
+                positions[name] = keys[-1]
+            querysets[name] = queryset.filter(id__in=[pk for _, pk in keys]).order_by('updated_at', 'id')
+
+        return {
+            'token': cls.make_token(now),
+            'reset': reset,
+            'cursor': cls.make_cursor(user, since, now, positions) if more else None,
+            'cars': querysets['cars'],
+            'reservations': querysets['reservations'],
+            'deleted': deleted,
+        }
+
+    @staticmethod
+    def purge_tombstones() -> int:
+        """Supprime les tombstones plus anciennes que la rétention."""
+        before = timezone.now() - timedelta(days=sync_option('TOMBSTONE_RETENTION_DAYS'))
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=before).delete()
+        return deleted
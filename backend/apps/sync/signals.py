@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.cars.models import Car
+from apps.reservations.models import Reservation
+from .models import SyncKind, Tombstone
+
+
+@receiver(post_delete, sender=Car)
+def car_deleted(sender, instance, **kwargs):
+    Tombstone.objects.create(kind=SyncKind.CAR, object_id=instance.id, deleted_at=timezone.now())
+
+
+@receiver(post_delete, sender=Reservation)
+def reservation_deleted(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        kind=SyncKind.RESERVATION,
+        object_id=instance.id,
+        user_id=instance.user_id,
+        deleted_at=timezone.now()
+    )
@@ -0,0 +1,229 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.cars.models import Car, CarStatus
+from apps.reservations.models import Reservation, ReservationStatus
+from apps.core.throttling import get_bucket_store
+from apps.reservations.services import CarStateService, ReservationService
+from .models import SyncKind, Tombstone
+from .services import SyncService, overlap_seconds
+
+User = get_user_model()
+
+
+class SyncTestCase(TestCase):
+    """Tests du flux de synchronisation /api/sync/."""
+
+    def setUp(self):
+        get_bucket_store().reset()
+        self.addCleanup(get_bucket_store().reset)
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='sync',
+            email='sync@example.com',
+            password='testpass123'
+        )
+        self.other = User.objects.create_user(
+            username='sync-other',
+            email='sync-other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.car = Car.objects.create(
+            registration_number='SYN-001',
+            brand='Toyota',
+            model='Yaris',
+            year=2023,
+            status=CarStatus.AVAILABLE
+        )
+        self.spare = Car.objects.create(
+            registration_number='SYN-002',
+            brand='Renault',
+            model='Clio',
+            year=2022,
+            status=CarStatus.AVAILABLE
+        )
+        base = timezone.now() + timedelta(days=1)
+        self.reservation = ReservationService.create_reservation(
+            user=self.user,
+            car_id=self.car.id,
+            start_date=base,
+            end_date=base + timedelta(hours=2)
+        )
+        self.foreign = ReservationService.create_reservation(
+            user=self.other,
+            car_id=self.spare.id,
+            start_date=base,
+            end_date=base + timedelta(hours=2)
+        )
+
+    def age(self, seconds=60):
+        """Recule updated_at de toutes les lignes existantes."""
+        past = timezone.now() - timedelta(seconds=seconds)
+        Car.objects.update(updated_at=past)
+        Reservation.objects.update(updated_at=past)
+
+    def token(self, seconds_ago=0):
+        return SyncService.make_token(timezone.now() - timedelta(seconds=seconds_ago))
+
+    def test_full_snapshot_without_token(self):
+        """Test: sans jeton, état complet des véhicules et des réservations de l'utilisateur."""
+        response = self.client.get('/api/sync/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['reset'])
+        self.assertTrue(response.data['token'])
+        self.assertEqual({car['id'] for car in response.data['cars']}, {self.car.id, self.spare.id})
+        self.assertEqual([r['id'] for r in response.data['reservations']], [self.reservation.id])
+
+    def test_only_changes_since_token(self):
+        """Test: seules les lignes modifiées depuis le jeton sont renvoyées."""
+        self.age()
+        token = self.token()
+        ReservationService.cancel_reservation(self.reservation.id, actor=self.user)
+
+        response = self.client.get('/api/sync/', {'since': token, 'expand': 'car'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['reset'])
+        self.assertEqual([r['id'] for r in response.data['reservations']], [self.reservation.id])
+        self.assertEqual(response.data['reservations'][0]['status'], ReservationStatus.CANCELLED)
+        self.assertEqual(response.data['reservations'][0]['car_detail']['id'], self.car.id)
+        # L'annulation a recalculé l'état dénormalisé du véhicule
+        self.assertEqual([car['id'] for car in response.data['cars']], [self.car.id])
+
+        response = self.client.get('/api/sync/', {'since': self.token(seconds_ago=-60)})
+        self.assertEqual(response.data['cars'], [])
+        self.assertEqual(response.data['reservations'], [])
+
+    def test_overlap_window_returns_rows_again(self):
+        """Test: une ligne datée juste avant le jeton est renvoyée (recouvrement)."""
+        self.age(seconds=5)
+
+        response = self.client.get('/api/sync/', {'since': self.token()})
+
+        self.assertEqual([r['id'] for r in response.data['reservations']], [self.reservation.id])
+
+    @override_settings(REQUEST_BUDGETS={'default': {'TIMEOUT': 5}, 'reporting': {'TIMEOUT': 30}})
+    def test_overlap_follows_request_budgets(self):
+        """Test: le recouvrement couvre la plus longue transaction d'une requête."""
+        self.assertEqual(overlap_seconds(), 32)
+        with self.settings(SYNC={'OVERLAP_SECONDS': 120}):
+            self.assertEqual(overlap_seconds(), 120)
+
+        self.age(seconds=31)
+        response = self.client.get('/api/sync/', {'since': self.token()})
+        self.assertEqual([r['id'] for r in response.data['reservations']], [self.reservation.id])
+
+    def pull(self, params=None, during=None):
+        """Toutes les pages d'une lecture : (véhicules, réservations, nombre de pages, jeton)."""
+        cars, reservations, pages = [], [], 0
+        response = self.client.get('/api/sync/', params or {})
+        token = response.data['token']
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['token'], token)
+            cars += [car['id'] for car in response.data['cars']]
+            reservations += [r['id'] for r in response.data['reservations']]
+            pages += 1
+            if response.data['cursor'] is None:
+                return cars, reservations, pages, token
+            if during:
+                during()
+            response = self.client.get('/api/sync/', {'cursor': response.data['cursor']})
+
+    @override_settings(SYNC={'PAGE_SIZE': 1})
+    def test_snapshot_is_paginated(self):
+        """Test: instantané découpé en pages par curseur, sans perte ni doublon."""
+        extra = Car.objects.create(
+            registration_number='SYN-003', brand='Peugeot', model='208', year=2024, status=CarStatus.AVAILABLE
+        )
+        # Modifié pendant la lecture : renvoyé par l'appel suivant
+        cars, reservations, pages, token = self.pull(during=self.car.save)
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(sorted(cars), sorted([self.car.id, self.spare.id, extra.id]))
+        self.assertEqual(reservations, [self.reservation.id])
+
+        cars, _, _, _ = self.pull({'since': token})
+        self.assertIn(self.car.id, cars)
+
+    def test_cursor_bound_to_user(self):
+        """Test: un curseur d'un autre utilisateur ou altéré est refusé."""
+        with self.settings(SYNC={'PAGE_SIZE': 1}):
+            cursor = self.client.get('/api/sync/').data['cursor']
+            other = APIClient()
+            other.force_authenticate(user=self.other)
+
+            self.assertEqual(other.get('/api/sync/', {'cursor': cursor}).status_code, 400)
+            self.assertEqual(self.client.get('/api/sync/', {'cursor': cursor[:-1]}).status_code, 400)
+            self.assertEqual(self.client.get('/api/sync/', {'cursor': cursor}).status_code, 200)
+
+    @override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'sync_user': '1/min'},
+    })
+    def test_sync_throttled(self):
+        """Test: 429 au-delà du débit du scope sync."""
+        self.assertEqual(self.client.get('/api/sync/').status_code, 200)
+        self.assertEqual(self.client.get('/api/sync/').status_code, 429)
+
+    def test_deletions_return_tombstones(self):
+        """Test: les suppressions figurent dans `deleted`, limitées au propriétaire."""
+        token = self.token()
+        reservation_id, foreign_id, spare_id = self.reservation.id, self.foreign.id, self.spare.id
+        self.reservation.delete()
+        self.foreign.delete()
+        self.spare.delete()
+
+        response = self.client.get('/api/sync/', {'since': token})
+
+        self.assertEqual(response.data['deleted']['reservations'], [reservation_id])
+        self.assertNotIn(foreign_id, response.data['deleted']['reservations'])
+        self.assertEqual(response.data['deleted']['cars'], [spare_id])
+
+    def test_expired_token_resets(self):
+        """Test: un jeton plus ancien que la rétention des tombstones impose un reset."""
+        response = self.client.get('/api/sync/', {'since': self.token(seconds_ago=31 * 86400)})
+
+        self.assertTrue(response.data['reset'])
+        self.assertEqual(len(response.data['cars']), 2)
+
+    def test_invalid_token(self):
+        """Test: jeton illisible refusé."""
+        response = self.client.get('/api/sync/', {'since': 'abc'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.data)
+
+    def test_refresh_bumps_car_updated_at(self):
+        """Test: le recalcul groupé de l'état des véhicules met à jour updated_at."""
+        # Réservation retirée sans passer par le service : état du véhicule périmé
+        Reservation.objects.filter(id=self.foreign.id).update(status=ReservationStatus.CANCELLED)
+        self.age()
+        token = self.token()
+
+        CarStateService.refresh([self.car.id, self.spare.id])
+
+        response = self.client.get('/api/sync/', {'since': token})
+        self.assertEqual([car['id'] for car in response.data['cars']], [self.spare.id])
+
+    def test_purge_tombstones_command(self):
+        """Test: la commande supprime les tombstones hors rétention."""
+        Tombstone.objects.create(kind=SyncKind.CAR, object_id=1, deleted_at=timezone.now() - timedelta(days=40))
+        Tombstone.objects.create(kind=SyncKind.CAR, object_id=2, deleted_at=timezone.now())
+        out = StringIO()
+
+        call_command('purge_tombstones', stdout=out)
+
+        self.assertEqual(list(Tombstone.objects.values_list('object_id', flat=True)), [2])
+        self.assertIn('1 tombstone', out.getvalue())
@@ -0,0 +1,50 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.cars.serializers import CarSerializer
+from apps.core.throttling import bucket_throttles
+from apps.reservations.serializers import ReservationSerializer
+from .services import SyncService
+
+
+class SyncView(APIView):
+    """
+    Modifications depuis `?since=<jeton>` (sans jeton : état complet).
+
+    Réponse : {token, reset, cursor, cars, reservations, deleted: {cars,
+    reservations}}. Tant que `cursor` n'est pas nul, le client demande la
+    page suivante avec `?cursor=` ; il conserve ensuite `token` pour
+    l'appel suivant. Avec `reset`, il remplace son état par l'ensemble des
+    pages au lieu de le compléter. `?expand=car` et `?fields=`
+    s'appliquent aux réservations.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_throttles(self):
+        # Un instantané complet parcourt tout le parc : limité comme les disponibilités
+        return bucket_throttles('sync')
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        cursor = request.query_params.get('cursor')
+        try:
+            changes = SyncService.changes(
+                request.user,
+                SyncService.read_token(since) if since and not cursor else None,
+                cursor=cursor
+            )
+        except DjangoValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        reservations = ReservationSerializer.optimize_queryset(changes['reservations'], request)
+        return Response({
+            'token': changes['token'],
+            'reset': changes['reset'],
+            'cursor': changes['cursor'],
+            'cars': CarSerializer(changes['cars'], many=True).data,
+            'reservations': ReservationSerializer(reservations, many=True, context={'request': request}).data,
+            'deleted': changes['deleted'],
+        })
@@ -0,0 +1,62 @@
+"""
+Configuration Gunicorn (serveur de production).
+
+    gunicorn -c config/gunicorn.conf.py config.wsgi
+
+- L'application est chargée une fois dans le processus maître
+  (`preload_app`) puis partagée par fork avec les workers : démarrage
+  plus rapide et mémoire partagée en copy-on-write.
+- Rechargement sans coupure : `kill -HUP <maître>` relance les workers
+  un par un avec la configuration courante. Avec le préchargement, un
+  nouveau code nécessite `kill -USR2 <maître>` (nouveau maître) puis
+  `kill -QUIT <ancien maître>`.
+- Pour ASGI : `-k uvicorn.workers.UvicornWorker config.asgi` (uvicorn
+  n'est pas dans requirements.txt).
+"""
+import multiprocessing
+import os
+import time
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Requêtes majoritairement liées à la base : 2 workers par cœur + 1, chacun
+# avec plusieurs threads. Le délestage (LOAD_SHEDDING) compte les requêtes en
+# cours dans le worker et lit le même GUNICORN_THREADS pour ses limites.
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Recyclage progressif des workers (fuites mémoire), étalé dans le temps
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+
+# Fichier de heartbeat en mémoire plutôt que sur le disque du conteneur
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = '-'
+errorlog = '-'
+
+_started_at = time.monotonic()
+
+
+def when_ready(server):
+    # Avant le fork : URLconf et vues importées une seule fois, dans le
+    # maître, plutôt qu'à la première requête de chaque worker
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+
+    server.log.info(
+        "Application chargée en %.2fs, %s worker(s)", time.monotonic() - _started_at, server.cfg.workers
+    )
+
+
+def post_fork(server, worker):
+    # Les connexions ouvertes pendant le préchargement ne doivent pas être partagées
+    from django.db import connections
+    connections.close_all()
@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 import os
-from apps import users
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -29,6 +29,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = ["*"]
 
+# Exécution de la suite de tests (manage.py test)
+TESTING = sys.argv[1:2] == ['test']
+
 
 # Application definition
 
@@ -46,13 +49,19 @@ INSTALLED_APPS = [
     'corsheaders',
     
     # My Apps
+    'apps.core',
     'apps.users',
     'apps.cars',
     'apps.reservations',
+    'apps.notifications',
+    'apps.sync',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'apps.core.compression.CompressionMiddleware',
+    'apps.core.middleware.RequestBudgetMiddleware',
+    'apps.core.recorder.TrafficRecorderMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,6 +69,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # En dernier : la session est chargée, le profil couvre la vue
+    'apps.core.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -86,6 +97,28 @@ DATABASES = {
 #     }
 # }
 
+# Cache partagé par tous les processus (workers gunicorn, conteneurs de fond) :
+# les versions des caches du tableau de bord et des flux iCal, et les seaux
+# de THROTTLE_STORE='cache', n'ont de sens que vus par tous. Redis si
+# REDIS_URL est défini, sinon une table de la base (`createcachetable`) ;
+# mémoire du processus pendant les tests.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+elif TESTING:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+        }
+    }
+
 AUTH_USER_MODEL = 'users.User'
 
 # Password validation
@@ -113,8 +146,113 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Négociation par Accept : JSON par défaut, MessagePack et JSON en
+    # colonnes pour les clients mobiles (apps.core.renderers)
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'apps.core.renderers.MessagePackRenderer',
+        'apps.core.renderers.CompactJSONRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Seaux de jetons (apps.core.throttling) : `<scope>_<user|ip|car|global>`
+    'DEFAULT_THROTTLE_RATES': {
+        'booking_user': '30/min',
+        'booking_ip': '120/min',
+        'booking_car': '60/min',
+        'booking_global': '1000/min',
+        'availability_user': '120/min',
+        'availability_ip': '600/min',
+        'availability_car': '300/min',
+        'sync_user': '30/min',
+        'sync_ip': '120/min',
+    },
+}
+
+# 'cache' : compteurs dans le cache partagé (CACHES), limites globales à tous
+# les workers ; défaut dès que REDIS_URL est défini (incr() atomique).
+# 'local' : compteurs en mémoire de chaque processus, chaque worker gunicorn
+# applique alors les débits ci-dessus pour son compte (limite effective
+# multipliée par le nombre de workers) : développement et tests.
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', 'cache' if os.getenv('REDIS_URL') else 'local')
+
+# Budget de temps par classe de requête (apps.core.middleware), en secondes.
+# TIMEOUT devient statement_timeout (PostgreSQL) / l'échéance (SQLite),
+# LOCK_TIMEOUT devient lock_timeout (PostgreSQL) / busy_timeout (SQLite).
+REQUEST_BUDGETS = {
+    'booking': {'TIMEOUT': 5, 'LOCK_TIMEOUT': 2},
+    'default': {'TIMEOUT': 5, 'LOCK_TIMEOUT': 2},
+    'reporting': {'TIMEOUT': 10, 'LOCK_TIMEOUT': 2},
+}
+
+# Délestage : requêtes en cours par processus au-delà desquelles une requête de
+# la classe reçoit un 503. Un worker gunicorn traite au plus WORKER_THREADS
+# requêtes à la fois (config/gunicorn.conf.py) : les lectures sont refusées
+# avant que tous les threads soient occupés, les écritures jamais.
+WORKER_THREADS = int(os.getenv('GUNICORN_THREADS', 8))
+LOAD_SHEDDING = {
+    'MAX_IN_FLIGHT': {
+        'booking': WORKER_THREADS,
+        'default': max(1, WORKER_THREADS * 3 // 4),
+        'reporting': max(1, WORKER_THREADS // 4),
+    },
+    'RETRY_AFTER': 2,
+}
+
+# Enregistrement anonymisé du trafic pour `manage.py replay` (désactivé par défaut)
+TRAFFIC_RECORDER = {
+    'ENABLED': os.getenv('TRAFFIC_RECORDER', 'False') == 'True',
+    'DIRECTORY': os.getenv('TRAFFIC_RECORDER_DIR', BASE_DIR / 'traces'),
+    'MAX_BYTES': 50 * 1024 * 1024,
+    'BACKUP_COUNT': 5,
+}
+
+# Compression des réponses (apps.core.compression) : brotli ou gzip selon
+# Accept-Encoding, au-delà de MIN_SIZE octets
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': int(os.getenv('COMPRESSION_MIN_SIZE', 1024)),
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+}
+
+# Profilage à la demande (apps.core.profiling), réservé au staff : en-tête
+# `X-Profile: cprofile|sample` et échantillonneur de fond /api/profiling/sampler/
+PROFILING = {
+    'ENABLED': os.getenv('PROFILING_ENABLED', 'True') == 'True',
+    'DIRECTORY': os.getenv('PROFILING_DIR', BASE_DIR / 'profiles'),
+    'MAX_DUMPS': 50,
+    'SAMPLER_INTERVAL': 0.01,
+    'SAMPLER_MAX_DURATION': 600,
+}
+
+# Démarrage à froid (chargement + première requête) toléré, en secondes
+# (manage.py startup_profile, test de non-régression)
+STARTUP_BUDGET_SECONDS = float(os.getenv('STARTUP_BUDGET_SECONDS', 3.0))
+
+# Requêtes SQL journalisées avec leur plan au-delà de ce seuil (ms)
+SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', 500))
+
+# E-mails : console en développement (les tests utilisent locmem automatiquement)
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'reservations@togodatalab.tg')
+
+# File de notifications (apps.notifications)
+NOTIFICATIONS = {
+    'MAX_ATTEMPTS': 5,
+    # Délai avant la tentative n : BACKOFF_BASE * 2^(n-1) secondes
+    'BACKOFF_BASE': 30,
+    # Durée après laquelle un lot non terminé (worker arrêté) est repris
+    'LEASE_SECONDS': 300,
+}
+
+# Journal d'audit des réservations (apps.reservations.audit)
+RESERVATION_AUDIT = {
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 1.0,
+    'MAX_BUFFER': 10000,
+    # Les tests écrivent le tampon explicitement (flush)
+    'BACKGROUND': not TESTING,
 }
 
 SIMPLE_JWT = {
@@ -122,6 +260,30 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
 }
 
+# Réservations terminées depuis plus de N jours déplacées vers l'archive
+RESERVATION_ARCHIVE_AFTER_DAYS = int(os.getenv('RESERVATION_ARCHIVE_AFTER_DAYS', 90))
+
+# Durée de validité d'une option (réservation PENDING) avant sa libération
+RESERVATION_HOLD_SECONDS = int(os.getenv('RESERVATION_HOLD_SECONDS', 600))
+
+# Flux de synchronisation /api/sync/ (apps.sync) : le recouvrement entre deux
+# lectures vaut le plus long TIMEOUT de REQUEST_BUDGETS plus CLOCK_SKEW_SECONDS
+# (OVERLAP_SECONDS le fixe explicitement, ex. si des tâches de fond gardent des
+# transactions ouvertes plus longtemps) ; lignes par page et par table ; durée
+# de conservation des suppressions, au-delà de laquelle le client repart de zéro
+SYNC = {
+    'CLOCK_SKEW_SECONDS': 2,
+    'PAGE_SIZE': 500,
+    'TOMBSTONE_RETENTION_DAYS': 30,
+}
+
+# Liste d'attente (WaitlistService) : demandes en attente par utilisateur,
+# demandes examinées au plus par libération de créneau
+WAITLIST = {
+    'MAX_ENTRIES_PER_USER': 5,
+    'MATCH_LIMIT': 50,
+}
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
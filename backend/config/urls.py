@@ -18,6 +18,10 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from apps.core.views import liveness, profile_download, profile_list, readiness, sampler
+from apps.reservations.views import calendar_feed, dashboard
+from apps.sync.views import SyncView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -25,4 +29,12 @@ urlpatterns = [
     path('api/users/', include('apps.users.urls')),
     path('api/cars/', include('apps.cars.urls')),
     path('api/reservations/', include('apps.reservations.urls')),
+    path('api/dashboard/', dashboard, name='dashboard'),
+    path('api/sync/', SyncView.as_view(), name='sync'),
+    path('api/profiling/', profile_list, name='profile-list'),
+    path('api/profiling/sampler/', sampler, name='profile-sampler'),
+    path('api/profiling/<uuid:profile_id>/', profile_download, name='profile-download'),
+    path('calendar/<str:token>.ics', calendar_feed, name='calendar-feed'),
+    path('health/live/', liveness, name='liveness'),
+    path('health/ready/', readiness, name='readiness'),
 ]
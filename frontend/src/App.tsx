@@ -8,6 +8,7 @@ import ProtectedRoute from './components/ProtectedRoute';
 import Login from './features/auth/Login';
 import Register from './features/auth/Register';
 import CarList from './features/cars/CarList';
+import Dashboard from './features/dashboard/Dashboard';
 import ReservationForm from './features/reservations/ReservationForm';
 import ReservationList from './features/reservations/ReservationList';
 
@@ -38,6 +39,17 @@ function App() {
                         }
                     />
 
+                    <Route
+                        path="/dashboard"
+                        element={
+                            <Layout>
+                                <ProtectedRoute>
+                                    <Dashboard/>
+                                </ProtectedRoute>
+                            </Layout>
+                        }
+                    />
+
                     <Route
                         path="/cars"
                         element={
@@ -34,6 +34,12 @@ export default function Layout({ children }: LayoutProps) {
                         <div className="flex items-center space-x-4">
                             {isAuthenticated ? (
                                 <>
+                                    <Link
+                                        to="/dashboard"
+                                        className="text-gray-700 hover:text-primary-600 px-3 py-2 rounded-md text-sm font-medium"
+                                    >
+                                        Tableau de bord
+                                    </Link>
                                     <Link
                                         to="/cars"
                                         className="text-gray-700 hover:text-primary-600 px-3 py-2 rounded-md text-sm font-medium"
@@ -1,5 +1,6 @@
 import api from '../../utils/api';
 import type {LoginCredentials, RegisterData, User} from "../../types";
+import {syncService} from '../sync/syncService';
 
 interface AuthResponse {
     access: string;
@@ -31,6 +32,8 @@ export const authService = {
     logout(): void {
         localStorage.removeItem('access_token');
         localStorage.removeItem('refresh_token');
+        // L'état synchronisé appartient à l'utilisateur déconnecté
+        syncService.reset();
     },
 
     isAuthenticated(): boolean {
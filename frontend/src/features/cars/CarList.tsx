@@ -1,6 +1,6 @@
 import {useState, useEffect} from 'react';
 import {useNavigate} from 'react-router-dom';
-import {carService} from './carService';
+import {syncService} from '../sync/syncService';
 import type {Car} from '../../types';
 import LoadingSpinner from '../../components/LoadingSpinner';
 import ErrorMessage from '../../components/ErrorMessage';
@@ -21,7 +21,7 @@ export default function CarList() {
         setIsLoading(true);
         setError('');
         try {
-            const data = await carService.getAll(availableOnly);
+            const data = await syncService.getCars(availableOnly);
             setCars(data);
         } catch (err) {
             // Remplacement de 'any' par une vérification sécurisée
@@ -120,6 +120,15 @@ export default function CarList() {
                                     </svg>
                                     <span className="font-mono">{car.registration_number}</span>
                                 </div>
+                                {car.is_available && car.next_reservation_start && (
+                                    <p className="text-sm text-gray-600">
+                                        Libre jusqu'au{' '}
+                                        {new Date(car.next_reservation_start).toLocaleString('fr-FR', {
+                                            dateStyle: 'short',
+                                            timeStyle: 'short',
+                                        })}
+                                    </p>
+                                )}
                             </div>
 
                             {car.is_available && (
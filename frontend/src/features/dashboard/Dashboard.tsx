@@ -0,0 +1,96 @@
+import {useState, useEffect} from 'react';
+import {Link} from 'react-router-dom';
+import {dashboardService} from './dashboardService';
+import type {Dashboard as DashboardData} from '../../types';
+import LoadingSpinner from '../../components/LoadingSpinner';
+import ErrorMessage from '../../components/ErrorMessage';
+import axios from "axios";
+
+export default function Dashboard() {
+    const [data, setData] = useState<DashboardData | null>(null);
+    const [isLoading, setIsLoading] = useState(true);
+    const [error, setError] = useState('');
+
+    useEffect(() => {
+        fetchDashboard();
+    }, []);
+
+    const fetchDashboard = async () => {
+        setIsLoading(true);
+        setError('');
+        try {
+            // Compteurs calculés côté serveur : pas de téléchargement des listes complètes
+            setData(await dashboardService.get());
+        } catch (err) {
+            if (axios.isAxiosError(err)) {
+                setError(err.response?.data?.detail || 'Impossible de charger le tableau de bord.');
+            } else {
+                setError('Une erreur inattendue est survenue.');
+            }
+        } finally {
+            setIsLoading(false);
+        }
+    };
+
+    const formatDate = (dateString: string) => {
+        return new Date(dateString).toLocaleString('fr-FR', {
+            day: '2-digit',
+            month: '2-digit',
+            year: 'numeric',
+            hour: '2-digit',
+            minute: '2-digit',
+        });
+    };
+
+    if (isLoading) return <LoadingSpinner/>;
+
+    const stats = data ? [
+        {label: 'Réservations à venir', value: data.reservations.upcoming},
+        {label: 'Réservations en cours', value: data.reservations.active},
+        {label: 'Réservations annulées', value: data.reservations.cancelled},
+        {label: 'Véhicules disponibles maintenant', value: data.cars.available_now},
+    ] : [];
+
+    return (
+        <div className="space-y-6">
+            <h1 className="text-3xl font-bold text-gray-900">Tableau de bord</h1>
+
+            {error && <ErrorMessage message={error}/>}
+
+            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6">
+                {stats.map((stat) => (
+                    <div key={stat.label} className="card">
+                        <p className="text-sm text-gray-600">{stat.label}</p>
+                        <p className="text-3xl font-bold text-gray-900">{stat.value}</p>
+                    </div>
+                ))}
+            </div>
+
+            <div className="card">
+                <div className="flex justify-between items-center mb-4">
+                    <h2 className="text-xl font-bold text-gray-900">Prochaines réservations</h2>
+                    <Link to="/reservations" className="text-sm text-primary-600 hover:text-primary-700">
+                        Toutes mes réservations
+                    </Link>
+                </div>
+
+                {data?.next_reservations.length === 0 ? (
+                    <p className="text-gray-500">Aucune réservation à venir.</p>
+                ) : (
+                    <ul className="divide-y divide-gray-200">
+                        {data?.next_reservations.map((reservation) => (
+                            <li key={reservation.id} className="py-3 flex justify-between">
+                                <span className="font-medium text-gray-900">
+                                    {reservation.car_detail?.brand} {reservation.car_detail?.model}
+                                </span>
+                                <span className="text-sm text-gray-600">
+                                    {formatDate(reservation.start_date)} → {formatDate(reservation.end_date)}
+                                </span>
+                            </li>
+                        ))}
+                    </ul>
+                )}
+            </div>
+        </div>
+    );
+}
@@ -0,0 +1,9 @@
+import api from '../../utils/api';
+import type {Dashboard} from '../../types';
+
+export const dashboardService = {
+    async get(): Promise<Dashboard> {
+        const response = await api.get<Dashboard>('/dashboard/');
+        return response.data;
+    },
+};
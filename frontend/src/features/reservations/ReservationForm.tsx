@@ -1,8 +1,8 @@
-import {useState, useEffect, type FormEvent} from 'react';
+import {useState, useEffect, useRef, type FormEvent} from 'react';
 import {useParams, useNavigate} from 'react-router-dom';
 import {carService} from '../cars/carService';
 import {reservationService} from './reservationService';
-import type {Car} from '../../types';
+import type {Car, Reservation, WaitlistEntry} from '../../types';
 import LoadingSpinner from '../../components/LoadingSpinner';
 import ErrorMessage from '../../components/ErrorMessage';
 import axios from "axios";
@@ -16,6 +16,12 @@ export default function ReservationForm() {
     const [isSubmitting, setIsSubmitting] = useState(false);
     const [error, setError] = useState('');
     const [success, setSuccess] = useState(false);
+    // Option posée dès que les dates sont saisies ; confirmée à l'envoi
+    const [hold, setHold] = useState<Reservation | null>(null);
+    const holdRef = useRef<Reservation | null>(null);
+    // Créneau complet : inscription possible en liste d'attente
+    const [conflict, setConflict] = useState(false);
+    const [waitlistEntry, setWaitlistEntry] = useState<WaitlistEntry | null>(null);
 
     const [formData, setFormData] = useState({
         start_date: '',
@@ -29,6 +35,67 @@ export default function ReservationForm() {
         }
     }, [carId]);
 
+    // Libère l'option si l'utilisateur quitte le formulaire sans confirmer
+    useEffect(() => {
+        return () => {
+            if (holdRef.current && !isExpired(holdRef.current)) {
+                reservationService.cancel(holdRef.current.id).catch(() => undefined);
+            }
+        };
+    }, []);
+
+    useEffect(() => {
+        const {start_date, end_date} = formData;
+        if (!carId || !start_date || !end_date || start_date >= end_date) {
+            return;
+        }
+        const timer = setTimeout(() => placeHold(start_date, end_date), 500);
+        return () => clearTimeout(timer);
+    }, [carId, formData.start_date, formData.end_date]);
+
+    const isExpired = (reservation: Reservation) =>
+        !!reservation.hold_expires_at && new Date(reservation.hold_expires_at) <= new Date();
+
+    const placeHold = async (start: string, end: string) => {
+        const dates = {
+            start_date: new Date(start).toISOString(),
+            end_date: new Date(end).toISOString(),
+        };
+        try {
+            let placed: Reservation | null = null;
+            const current = holdRef.current;
+            // L'option existante est déplacée (un UPDATE versionné) plutôt
+            // qu'annulée puis reposée à chaque modification des dates
+            if (current && !isExpired(current)) {
+                try {
+                    placed = await reservationService.update(current.id, dates, current.version);
+                } catch (err) {
+                    // 409 / 410 : option modifiée ou expirée, une nouvelle est posée
+                    const status = axios.isAxiosError(err) ? err.response?.status : undefined;
+                    if (status !== 409 && status !== 410) {
+                        throw err;
+                    }
+                }
+            }
+            // Une option expirée n'est pas annulée : le balayage la libère
+            if (!placed) {
+                holdRef.current = null;
+                setHold(null);
+                placed = await reservationService.hold({car_id: Number(carId), ...dates});
+            }
+            holdRef.current = placed;
+            setHold(placed);
+            setError('');
+            setConflict(false);
+        } catch (err) {
+            // Conflit signalé dès la saisie ; la soumission refera les contrôles
+            if (axios.isAxiosError(err) && err.response?.data?.error) {
+                setError(err.response.data.error);
+                setConflict(err.response.data.code === 'overlap');
+            }
+        }
+    };
+
     const fetchCar = async () => {
         setIsLoading(true);
         setError(''); // Optionnel : réinitialise l'erreur avant de commencer
@@ -55,12 +122,22 @@ export default function ReservationForm() {
             const startDate = new Date(formData.start_date).toISOString();
             const endDate = new Date(formData.end_date).toISOString();
 
-            await reservationService.create({
-                car_id: Number(carId),
-                start_date: startDate,
-                end_date: endDate,
-                purpose: formData.purpose,
-            });
+            const current = holdRef.current;
+            const holdMatches = current !== null
+                && new Date(current.start_date).getTime() === new Date(startDate).getTime()
+                && new Date(current.end_date).getTime() === new Date(endDate).getTime();
+
+            if (current && holdMatches) {
+                await reservationService.confirm(current.id, formData.purpose);
+                holdRef.current = null;
+            } else {
+                await reservationService.create({
+                    car_id: Number(carId),
+                    start_date: startDate,
+                    end_date: endDate,
+                    purpose: formData.purpose,
+                });
+            }
 
             setSuccess(true);
             setTimeout(() => {
@@ -72,6 +149,7 @@ export default function ReservationForm() {
                     err.response?.data?.detail ||
                     'Une erreur est survenue lors de la réservation.';
                 setError(errorMsg);
+                setConflict(err.response?.data?.code === 'overlap');
             } else {
                 setError('Une erreur inattendue est survenue.');
             }
@@ -80,6 +158,27 @@ export default function ReservationForm() {
         }
     };
 
+    const handleJoinWaitlist = async () => {
+        setIsSubmitting(true);
+        try {
+            const entry = await reservationService.joinWaitlist({
+                car_id: Number(carId),
+                start_date: new Date(formData.start_date).toISOString(),
+                end_date: new Date(formData.end_date).toISOString(),
+                purpose: formData.purpose,
+            });
+            setWaitlistEntry(entry);
+            setError('');
+            setConflict(false);
+        } catch (err) {
+            if (axios.isAxiosError(err)) {
+                setError(err.response?.data?.error || 'Inscription en liste d\'attente impossible.');
+            }
+        } finally {
+            setIsSubmitting(false);
+        }
+    };
+
     const handleChange = (
         e: React.ChangeEvent<HTMLInputElement | HTMLTextAreaElement>
     ) => {
@@ -148,12 +247,50 @@ export default function ReservationForm() {
                     </div>
                 )}
 
+                {hold?.hold_expires_at && !success && (
+                    <div className="mb-6 bg-yellow-50 border border-yellow-200 rounded-lg p-4">
+                        <p className="text-yellow-800 text-sm">
+                            Créneau réservé pour vous jusqu'à{' '}
+                            {new Date(hold.hold_expires_at).toLocaleTimeString('fr-FR', {
+                                hour: '2-digit',
+                                minute: '2-digit',
+                            })}. Confirmez avant cette heure.
+                        </p>
+                    </div>
+                )}
+
                 {error && (
                     <div className="mb-6">
                         <ErrorMessage message={error}/>
                     </div>
                 )}
 
+                {conflict && !waitlistEntry && (
+                    <div className="mb-6 bg-blue-50 border border-blue-200 rounded-lg p-4 flex items-center justify-between">
+                        <p className="text-blue-800 text-sm">
+                            Créneau complet : le véhicule vous sera réservé automatiquement si une réservation est annulée.
+                        </p>
+                        <button
+                            type="button"
+                            onClick={handleJoinWaitlist}
+                            disabled={isSubmitting}
+                            className="btn btn-secondary ml-4"
+                        >
+                            Liste d'attente
+                        </button>
+                    </div>
+                )}
+
+                {waitlistEntry && (
+                    <div className="mb-6 bg-green-50 border border-green-200 rounded-lg p-4">
+                        <p className="text-green-800 text-sm">
+                            {waitlistEntry.status === 'BOOKED'
+                                ? '✅ Le créneau s\'est libéré : réservation créée.'
+                                : 'Vous êtes en liste d\'attente. Vous recevrez un e-mail dès que le créneau sera réservé pour vous.'}
+                        </p>
+                    </div>
+                )}
+
                 <form onSubmit={handleSubmit} className="space-y-6">
                     <div>
                         <label className="block text-sm font-medium text-gray-700 mb-1">
@@ -208,6 +345,7 @@ export default function ReservationForm() {
                             ℹ️ Informations importantes
                         </h3>
                         <ul className="text-sm text-blue-800 space-y-1 list-disc list-inside">
+                            <li>Le créneau est bloqué pour vous dès la saisie des dates</li>
                             <li>La réservation sera confirmée immédiatement</li>
                             <li>Assurez-vous que les dates ne chevauchent pas une réservation existante</li>
                             <li>Vous pourrez annuler votre réservation si nécessaire</li>
@@ -1,5 +1,6 @@
 import {useState, useEffect} from 'react';
 import {reservationService} from './reservationService';
+import {syncService} from '../sync/syncService';
 import type {Reservation} from '../../types';
 import {format} from 'date-fns';
 import {fr} from 'date-fns/locale';
@@ -11,16 +12,17 @@ export default function ReservationList() {
     const [reservations, setReservations] = useState<Reservation[]>([]);
     const [isLoading, setIsLoading] = useState(true);
     const [error, setError] = useState('');
+    const [upcomingOnly, setUpcomingOnly] = useState(false);
 
     useEffect(() => {
         fetchReservations();
-    }, []);
+    }, [upcomingOnly]);
 
     const fetchReservations = async () => {
         setIsLoading(true);
         setError('');
         try {
-            const data = await reservationService.getAll();
+            const data = await syncService.getReservations(upcomingOnly);
             setReservations(data);
         } catch (err) {
             if (axios.isAxiosError(err)) {
@@ -85,7 +87,21 @@ export default function ReservationList() {
 
     return (
         <div className="space-y-6">
-            <h1 className="text-3xl font-bold text-gray-900">Mes Réservations</h1>
+            <div className="flex justify-between items-center">
+                <h1 className="text-3xl font-bold text-gray-900">Mes Réservations</h1>
+                <div className="flex items-center space-x-2">
+                    <input
+                        type="checkbox"
+                        id="upcoming-only"
+                        checked={upcomingOnly}
+                        onChange={(e) => setUpcomingOnly(e.target.checked)}
+                        className="rounded border-gray-300 text-primary-600 focus:ring-primary-500"
+                    />
+                    <label htmlFor="upcoming-only" className="text-sm text-gray-700">
+                        À venir uniquement
+                    </label>
+                </div>
+            </div>
 
             {error && <ErrorMessage message={error}/>}
 
@@ -104,7 +120,11 @@ export default function ReservationList() {
                             d="M9 5H7a2 2 0 00-2 2v12a2 2 0 002 2h10a2 2 0 002-2V7a2 2 0 00-2-2h-2M9 5a2 2 0 002 2h2a2 2 0 002-2M9 5a2 2 0 012-2h2a2 2 0 012 2"
                         />
                     </svg>
-                    <p className="mt-4 text-gray-500">Vous n'avez aucune réservation.</p>
+                    <p className="mt-4 text-gray-500">
+                        {upcomingOnly
+                            ? 'Aucune réservation à venir.'
+                            : 'Vous n\'avez aucune réservation.'}
+                    </p>
                     <a href="/cars" className="btn btn-primary mt-4 inline-block">
                         Réserver un véhicule
                     </a>
@@ -117,7 +137,7 @@ export default function ReservationList() {
                                 <div className="flex-1">
                                     <div className="flex items-center space-x-3 mb-3">
                                         <h3 className="text-lg font-bold text-gray-900">
-                                            {reservation.car_detail.brand} {reservation.car_detail.model}
+                                            {reservation.car_detail?.brand} {reservation.car_detail?.model}
                                         </h3>
                                         <span
                                             className={`px-2 py-1 text-xs font-semibold rounded ${getStatusColor(
@@ -144,7 +164,7 @@ export default function ReservationList() {
                                                 />
                                             </svg>
                                             <span className="font-mono">
-                        {reservation.car_detail.registration_number}
+                        {reservation.car_detail?.registration_number}
                       </span>
                                         </div>
 
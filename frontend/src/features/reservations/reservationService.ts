@@ -1,5 +1,5 @@
 import api from '../../utils/api';
-import type {Reservation} from '../../types';
+import type {Reservation, WaitlistEntry} from '../../types';
 
 interface CreateReservationData {
     car_id: number;
@@ -8,9 +8,20 @@ interface CreateReservationData {
     purpose?: string;
 }
 
+export interface ReservationFilters {
+    start_after?: string;
+    end_before?: string;
+    status?: string;
+    car?: number;
+    active_now?: boolean;
+}
+
 export const reservationService = {
-    async getAll(): Promise<Reservation[]> {
-        const response = await api.get<Reservation[]>('/reservations/');
+    async getAll(filters: ReservationFilters = {}): Promise<Reservation[]> {
+        // car_detail n'est renvoyé que sur demande ; filtres appliqués côté serveur
+        const response = await api.get<Reservation[]>('/reservations/', {
+            params: {expand: 'car', ...filters},
+        });
         return response.data;
     },
 
@@ -24,8 +35,33 @@ export const reservationService = {
         return response.data;
     },
 
+    // Option temporaire : bloque le créneau pendant la saisie du formulaire
+    async hold(data: CreateReservationData): Promise<Reservation> {
+        const response = await api.post<Reservation>('/reservations/hold/', data);
+        return response.data;
+    },
+
+    async confirm(id: number, purpose?: string): Promise<Reservation> {
+        const response = await api.post<Reservation>(`/reservations/${id}/confirm/`, {purpose});
+        return response.data;
+    },
+
+    // Mise à jour versionnée (If-Match) : 409 si modifiée entre-temps, 410 si option expirée
+    async update(id: number, data: Partial<CreateReservationData>, version: number): Promise<Reservation> {
+        const response = await api.patch<Reservation>(`/reservations/${id}/`, data, {
+            headers: {'If-Match': `"${version}"`},
+        });
+        return response.data;
+    },
+
     async cancel(id: number): Promise<Reservation> {
         const response = await api.post<Reservation>(`/reservations/${id}/cancel/`);
         return response.data;
     },
+
+    // Créneau complet : réservé automatiquement dès qu'une annulation le libère
+    async joinWaitlist(data: CreateReservationData): Promise<WaitlistEntry> {
+        const response = await api.post<WaitlistEntry>('/reservations/waitlist/', data);
+        return response.data;
+    },
 };
\ No newline at end of file
@@ -0,0 +1,101 @@
+import axios from 'axios';
+import api from '../../utils/api';
+import type {Car, Reservation, SyncResponse} from '../../types';
+
+// État local alimenté par /sync/ : seules les modifications depuis le
+// dernier jeton sont téléchargées, puis appliquées comme des remplacements
+const store = {
+    token: null as string | null,
+    cars: new Map<number, Car>(),
+    reservations: new Map<number, Reservation>(),
+};
+
+let pending: Promise<void> | null = null;
+
+async function fetchPages(since: string | null): Promise<SyncResponse[]> {
+    // Une lecture = toutes ses pages (curseur), avant toute application
+    const pages: SyncResponse[] = [];
+    let cursor: string | null = null;
+    do {
+        const params: Record<string, string> = cursor
+            ? {expand: 'car', cursor}
+            : {expand: 'car', ...(since ? {since} : {})};
+        const response = await api.get<SyncResponse>('/sync/', {params});
+        pages.push(response.data);
+        cursor = response.data.cursor;
+    } while (cursor);
+    return pages;
+}
+
+function apply(pages: SyncResponse[]): void {
+    const [first] = pages;
+    // Instantané complet : remplace l'état une fois toutes les pages reçues
+    const cars = first.reset ? new Map<number, Car>() : store.cars;
+    const reservations = first.reset ? new Map<number, Reservation>() : store.reservations;
+    pages.forEach((page) => {
+        page.cars.forEach((car) => cars.set(car.id, car));
+        page.reservations.forEach((reservation) => reservations.set(reservation.id, reservation));
+    });
+    // Les suppressions ne figurent que sur la première page
+    first.deleted.cars.forEach((id) => cars.delete(id));
+    first.deleted.reservations.forEach((id) => reservations.delete(id));
+    store.cars = cars;
+    store.reservations = reservations;
+    store.token = first.token;
+}
+
+async function load(): Promise<void> {
+    try {
+        apply(await fetchPages(store.token));
+    } catch (err) {
+        // Jeton ou curseur refusé (expiré, autre utilisateur) : rechargement complet
+        const status = axios.isAxiosError(err) ? err.response?.status : undefined;
+        if (store.token === null || (status !== 410 && status !== 400)) {
+            throw err;
+        }
+        store.token = null;
+        apply(await fetchPages(null));
+    }
+}
+
+export const syncService = {
+    async pull(): Promise<void> {
+        // Un seul appel à la fois : deux écrans montés ensemble partagent le même
+        pending ??= load().finally(() => {
+            pending = null;
+        });
+        return pending;
+    },
+
+    async getCars(availableOnly?: boolean): Promise<Car[]> {
+        await this.pull();
+        const now = new Date();
+        // Même règle que ?available=true côté serveur ; tri des listes de l'API
+        return [...store.cars.values()]
+            .filter((car) => !availableOnly || (
+                car.status === 'AVAILABLE'
+                && (car.current_reservation_end === null || new Date(car.current_reservation_end) <= now)
+                && (car.next_reservation_start === null || new Date(car.next_reservation_start) > now)
+            ))
+            .sort((a, b) => b.created_at.localeCompare(a.created_at));
+    },
+
+    async getReservations(upcomingOnly?: boolean): Promise<Reservation[]> {
+        await this.pull();
+        const now = new Date();
+        const reservations = [...store.reservations.values()];
+        if (!upcomingOnly) {
+            return reservations.sort((a, b) => b.created_at.localeCompare(a.created_at));
+        }
+        // Même règle que ?start_after=<maintenant> : prochains trajets d'abord
+        return reservations
+            .filter((reservation) => new Date(reservation.start_date) >= now)
+            .sort((a, b) => new Date(a.start_date).getTime() - new Date(b.start_date).getTime());
+    },
+
+    reset(): void {
+        store.token = null;
+        store.cars = new Map();
+        store.reservations = new Map();
+    },
+};
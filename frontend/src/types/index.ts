@@ -17,6 +17,11 @@ export interface Car {
     status: 'AVAILABLE' | 'IN_USE' | 'MAINTENANCE' | 'UNAVAILABLE';
     status_display: string;
     is_available: boolean;
+    // Staff uniquement
+    current_reservation?: number | null;
+    current_reservation_end: string | null;
+    next_reservation_start: string | null;
+    free_until: string | null;
     created_at: string;
     updated_at: string;
 }
@@ -24,17 +29,45 @@ export interface Car {
 export interface Reservation {
     id: number;
     user: number;
-    user_detail: User;
+    user_detail?: User;
     car: number;
-    car_detail: Car;
+    car_detail?: Car;
     start_date: string;
     end_date: string;
     status: 'PENDING' | 'CONFIRMED' | 'CANCELLED' | 'COMPLETED';
     purpose: string;
+    version: number;
+    hold_expires_at?: string | null;
     created_at: string;
     updated_at: string;
 }
 
+export interface SyncResponse {
+    token: string;
+    reset: boolean;
+    // Page suivante de la même lecture ; null sur la dernière
+    cursor: string | null;
+    cars: Car[];
+    reservations: Reservation[];
+    deleted: { cars: number[]; reservations: number[] };
+}
+
+export interface WaitlistEntry {
+    id: number;
+    car: number | null;
+    brand: string;
+    model: string;
+    start_date: string;
+    end_date: string;
+    purpose: string;
+    auto_book: boolean;
+    status: 'WAITING' | 'BOOKED' | 'NOTIFIED' | 'CANCELLED' | 'EXPIRED';
+    matched_car: number | null;
+    reservation: number | null;
+    matched_at: string | null;
+    created_at: string;
+}
+
 export interface LoginCredentials {
     username: string;
     password: string;
@@ -49,3 +82,19 @@ export interface RegisterData {
     last_name: string;
     phone?: string;
 }
+
+export interface Dashboard {
+    reservations: {
+        upcoming: number;
+        active: number;
+        cancelled: number;
+    };
+    cars: {
+        total: number;
+        available_now: number;
+        in_use: number;
+        maintenance: number;
+        unavailable: number;
+    };
+    next_reservations: Reservation[];
+}